@@ -1,4 +1,26 @@
-from .plots import gplot
-from .smalltables import freq_tab, bivar, single_bivar
+__version__ = "0.0.1"
+
+from .plots import gplot, render_gplots
+from .smalltables import (
+    freq_tab,
+    bivar,
+    single_bivar,
+    collapse_counts,
+    gains_table,
+    vintage_table,
+)
 from .excel import TableWriter
-from .cleancut import cleancut
+from .cleancut import cleancut, cut_edges
+from .strategy import CutoffGrid
+from .screening import screen
+from .profiling import profile
+from .monitor import ScoreMonitor
+from .sampling import SampleEstimator
+from .parallel import PartitionExecutor
+from .scorecard import Scorecard
+from .report import run_report
+from .utils.sketch import QuantileSketch
+from .utils.codes import BinnedCodes
+from .utils.heavy_hitters import HeavyHitterSketch
+from .utils.cache import enable_bin_cache, disable_bin_cache, bin_cache_info
+from .utils.disk_cache import enable_disk_cache, disable_disk_cache, disk_cache_info
@@ -0,0 +1,434 @@
+import os
+import json
+import shutil
+import zipfile
+import tempfile
+import numpy as np
+from abc import ABC, abstractmethod
+import pandas as pd
+from xml.sax.saxutils import escape
+from xlsxwriter.format import Format
+from xlsxwriter.utility import xl_rowcol_to_cell
+from typing import IO, Optional, Dict, List
+
+
+class _BackendWorksheet:
+    """
+    Minimal stand in for an xlsxwriter Worksheet, so the worksheet
+    handling in TableWriter can be shared across backends.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.tables = []
+
+    def get_name(self) -> str:
+        return self.name
+
+
+class TableBackend(ABC):
+    """
+    Base class for the alternative TableWriter backends.
+
+    A backend mimics the small part of the xlsxwriter Workbook API that
+    TableWriter relies on (worksheets, formats, filename, close), and
+    receives whole tables through `write_frame` rather than single cells.
+    Subclasses must implement `write_frame`.
+
+    Parameters
+    ----------
+    filename: str.
+        Path to write the output to. Default is None, in which case a
+        temporary path is created.
+
+    overwrite: bool.
+        If a file exists at filename, should it be overwritten?
+        Default is set to False.
+    """
+
+    suffix = ""
+    is_directory = False
+
+    def __init__(self, filename: Optional[str] = None, overwrite: bool = False):
+        if filename is None:
+            if self.is_directory:
+                filename = tempfile.mkdtemp(prefix="TableWriter_Temp_")
+            else:
+                fd, filename = tempfile.mkstemp(
+                    prefix="TableWriter_Temp_", suffix=self.suffix
+                )
+                os.close(fd)
+        else:
+            assert (
+                True if overwrite else not os.path.exists(filename)
+            ), f"{filename} exists in directory, and overwrite = False"
+        self.filename = filename
+        self.fileclosed = False
+        self._worksheets: Dict[str, _BackendWorksheet] = {}
+
+    def add_format(self, properties: Optional[Dict] = None) -> Format:
+        return Format(properties)
+
+    def add_worksheet(self, name: Optional[str] = None) -> _BackendWorksheet:
+        if name is None:
+            name = f"Sheet{len(self._worksheets) + 1}"
+        assert name not in self._worksheets, f"Sheetname {name} is already in use."
+        worksheet = _BackendWorksheet(name)
+        self._worksheets[name] = worksheet
+        return worksheet
+
+    def worksheets(self) -> List[_BackendWorksheet]:
+        return list(self._worksheets.values())
+
+    def get_worksheet_by_name(self, name: str) -> Optional[_BackendWorksheet]:
+        return self._worksheets.get(name)
+
+    @abstractmethod
+    def write_frame(
+        self,
+        worksheet: _BackendWorksheet,
+        tbl: pd.DataFrame,
+        row: int,
+        col: int,
+        index: bool,
+        pct_idxs: np.ndarray,
+    ):
+        """
+        Write a whole table to the worksheet at the row and column given.
+        """
+
+    def close(self):
+        self.fileclosed = True
+
+
+def _flat_columns(tbl: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of tbl with string column names, as required by
+    columnar file formats.
+    """
+    tbl = tbl.copy(deep=False)
+    if tbl.columns.nlevels > 1:
+        tbl.columns = [" ".join(map(str, c)) for c in tbl.columns]
+    else:
+        tbl.columns = tbl.columns.map(str)
+    return tbl
+
+
+class _BundleBackend(TableBackend):
+    """
+    Write every table to its own file in a directory, along with a
+    manifest.json describing where each table was placed.
+    """
+
+    is_directory = True
+    extension = ""
+
+    def __init__(self, filename: Optional[str] = None, overwrite: bool = False):
+        super().__init__(filename=filename, overwrite=overwrite)
+        os.makedirs(self.filename, exist_ok=True)
+        self._manifest = []
+
+    @abstractmethod
+    def _write_file(self, tbl: pd.DataFrame, path: str, index: bool):
+        """
+        Write one table to path.
+        """
+
+    def write_frame(self, worksheet, tbl, row, col, index, pct_idxs):
+        worksheet.tables.append(tbl.shape)
+        fname = f"{worksheet.get_name()}_{len(worksheet.tables):03d}{self.extension}"
+        self._write_file(_flat_columns(tbl), os.path.join(self.filename, fname), index)
+        self._manifest.append(
+            {
+                "sheet": worksheet.get_name(),
+                "row": int(row),
+                "col": int(col),
+                "file": fname,
+                "index": bool(index),
+                "pct_columns": [str(tbl.columns[i]) for i in pct_idxs],
+            }
+        )
+
+    def close(self):
+        with open(os.path.join(self.filename, "manifest.json"), "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        super().close()
+
+
+class CSVBackend(_BundleBackend):
+    """
+    Write each table as a CSV file in a directory bundle.
+    """
+
+    extension = ".csv"
+
+    def _write_file(self, tbl, path, index):
+        tbl.to_csv(path, index=index)
+
+
+class ParquetBackend(_BundleBackend):
+    """
+    Write each table as a Parquet file in a directory bundle. Requires
+    one of pyarrow or fastparquet to be installed.
+    """
+
+    extension = ".parquet"
+
+    def _write_file(self, tbl, path, index):
+        if index:
+            tbl = tbl.reset_index()
+            tbl.columns = tbl.columns.map(str)
+        tbl.to_parquet(path, index=False)
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+body {{font-family: Calibri, Arial, sans-serif; font-size: 11pt;}}
+table {{border-collapse: collapse; margin-bottom: 2em;}}
+th, td {{border: 1px solid #999999; padding: 2px 6px;}}
+th {{background-color: #d3daea;}}
+td {{text-align: right;}}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+class HTMLBackend(TableBackend):
+    """
+    Write all tables to a single self-contained HTML report, with one
+    section per worksheet.
+    """
+
+    suffix = ".html"
+
+    def write_frame(self, worksheet, tbl, row, col, index, pct_idxs):
+        formatters = {
+            tbl.columns[i]: (lambda x: "" if pd.isna(x) else f"{x:.2%}")
+            for i in pct_idxs
+        }
+        worksheet.tables.append(
+            tbl.to_html(index=index, formatters=formatters, na_rep="", border=0)
+        )
+
+    def close(self):
+        body = "\n".join(
+            f"<h2>{escape(ws.get_name())}</h2>\n" + "\n".join(ws.tables)
+            for ws in self.worksheets()
+        )
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(_HTML_TEMPLATE.format(body=body))
+        super().close()
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "{sheets}"
+    "</Types>"
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+# Cell style 0 is the default, 1 is percent (built in num format 10),
+# 2 is the bold header.
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="10" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+
+
+def _xlsx_cell(row: int, col: int, value, style: int = 0) -> str:
+    """
+    Render a single cell as SpreadsheetML.
+    """
+    ref = xl_rowcol_to_cell(row, col)
+    s = f' s="{style}"' if style else ""
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"{s}><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if not np.isfinite(value):
+            return ""
+        return f'<c r="{ref}"{s}><v>{float(value)!r}</v></c>'
+    if value is None or value is pd.NaT or value is pd.NA:
+        return ""
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+class XlsxStreamBackend(TableBackend):
+    """
+    A lean xlsx writer for plain tables.
+
+    Cells are rendered straight to SpreadsheetML strings as tables are
+    written. The rows of a worksheet above a new table are final, so they
+    are appended to a temporary file of the worksheet's XML, and only the
+    rows of the tables still being written are held in memory. The sheet
+    files are copied into the zip archive on close.
+
+    Tables are written to a worksheet from the top down. A table can sit
+    beside the one before it, but can not start above a row already
+    written out. Only percent and header styles are supported,
+    conditional and custom formats are ignored.
+    """
+
+    suffix = ".xlsx"
+
+    def __init__(self, filename: Optional[str] = None, overwrite: bool = False):
+        super().__init__(filename=filename, overwrite=overwrite)
+        self._rows: Dict[str, Dict[int, Dict[int, str]]] = {}
+        self._streams: Dict[str, IO[bytes]] = {}
+        self._written: Dict[str, int] = {}
+
+    def add_worksheet(self, name=None):
+        worksheet = super().add_worksheet(name)
+        name = worksheet.get_name()
+        self._rows[name] = {}
+        self._written[name] = 0
+        self._streams[name] = tempfile.TemporaryFile(prefix="TableWriter_Sheet_")
+        self._streams[name].write(_SHEET_HEAD.encode("utf-8"))
+        return worksheet
+
+    def _flush(self, name: str, below: Optional[int] = None):
+        """
+        Append the held rows of a worksheet above row `below`, or all of
+        them, to its XML file.
+        """
+        rows = self._rows[name]
+        stream = self._streams[name]
+        for r in sorted(r for r in rows if below is None or r < below):
+            cells = rows.pop(r)
+            stream.write(
+                (
+                    f'<row r="{r + 1}">'
+                    + "".join(cells[c] for c in sorted(cells))
+                    + "</row>"
+                ).encode("utf-8")
+            )
+        if below is not None:
+            self._written[name] = max(self._written[name], below)
+
+    def write_frame(self, worksheet, tbl, row, col, index, pct_idxs):
+        name = worksheet.get_name()
+        assert row >= self._written[name], (
+            f"Rows of {name} above row {self._written[name]} are already written, "
+            "xlsx_stream writes tables from the top of a worksheet down"
+        )
+        self._flush(name, below=row)
+        rows = self._rows[name]
+
+        def put(r, c, value, style=0):
+            rows.setdefault(r, {})[c] = _xlsx_cell(r, c, value, style)
+
+        nlevels = tbl.index.nlevels if index else 0
+        if index:
+            for i, nm in enumerate(tbl.index.names):
+                put(row, col + i, nm, 2)
+            for rs, idx in enumerate(tbl.index):
+                idx = idx if nlevels > 1 else (idx,)
+                for i, v in enumerate(idx):
+                    put(row + rs + 1, col + i, v, 2)
+        for cs, d_col in enumerate(tbl.columns):
+            put(row, col + nlevels + cs, d_col, 2)
+        for cs in range(tbl.shape[1]):
+            style = 1 if cs in pct_idxs else 0
+            values = tbl.iloc[:, cs].tolist()
+            for rs, v in enumerate(values):
+                put(row + rs + 1, col + nlevels + cs, v, style)
+
+    def close(self):
+        names = list(self._rows)
+        with zipfile.ZipFile(self.filename, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(
+                "[Content_Types].xml",
+                _XLSX_CONTENT_TYPES.format(
+                    sheets="".join(
+                        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                        for i in range(1, len(names) + 1)
+                    )
+                ),
+            )
+            zf.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+            zf.writestr(
+                "xl/workbook.xml",
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+                + "".join(
+                    f'<sheet name="{escape(nm)}" sheetId="{i}" r:id="rId{i}"/>'
+                    for i, nm in enumerate(names, start=1)
+                )
+                + "</sheets></workbook>",
+            )
+            zf.writestr(
+                "xl/_rels/workbook.xml.rels",
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                + "".join(
+                    f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                    for i in range(1, len(names) + 1)
+                )
+                + f'<Relationship Id="rId{len(names) + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+                "</Relationships>",
+            )
+            zf.writestr("xl/styles.xml", _XLSX_STYLES)
+            for i, nm in enumerate(names, start=1):
+                self._flush(nm)
+                stream = self._streams.pop(nm)
+                with stream, zf.open(f"xl/worksheets/sheet{i}.xml", "w") as f:
+                    stream.write(b"</sheetData></worksheet>")
+                    stream.seek(0)
+                    shutil.copyfileobj(stream, f)
+        super().close()
+
+
+BACKENDS = {
+    "csv": CSVBackend,
+    "parquet": ParquetBackend,
+    "html": HTMLBackend,
+    "xlsx_stream": XlsxStreamBackend,
+}
+
+
+def _remove_path(path: str):
+    """
+    Remove a file or directory, ignoring it if it is already gone.
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
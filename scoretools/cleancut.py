@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
 from typing import Union, Iterable, List, Optional
+from .utils.sketch import QuantileSketch, as_sketch
+from .utils.cache import cached_binning
+from .utils.disk_cache import disk_cached
+from .utils.codes import BinnedCodes
 
 
 def _proc_cuts(cuts, divisor, threshold=10):
@@ -29,6 +33,110 @@ def _make_labels(breaks, digits):
     return labs
 
 
+def _weighted_quantile(values, weight, q) -> np.ndarray:
+    """
+    Quantiles of values with frequency weights, interpolated as the
+    quantiles of the values repeated by their weights would be.
+    """
+    values = np.asarray(values, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+    keep = ~np.isnan(values) & (weight > 0)
+    order = np.argsort(values[keep], kind="stable")
+    values, cuml_w = values[keep][order], np.cumsum(weight[keep][order])
+    if values.size == 0:
+        return np.full(np.shape(q), np.nan)
+    # Position of each quantile among the repeated values, and the values
+    # at the positions either side of it.
+    pos = np.asarray(q, dtype=float) * max(cuml_w[-1] - 1, 0)
+    low = np.floor(pos)
+    i_low = np.minimum(np.searchsorted(cuml_w, low, side="right"), values.size - 1)
+    i_high = np.minimum(np.searchsorted(cuml_w, low + 1, side="right"), values.size - 1)
+    return values[i_low] + (pos - low) * (values[i_high] - values[i_low])
+
+
+def _edges(
+    variable_le,
+    bins,
+    exceptions,
+    digits,
+    clean_cuts,
+    cuts_divisor,
+    cuts_threshold,
+    sketch,
+    weight=None,
+) -> np.ndarray:
+    """
+    The bin edges of a variable with its exceptions already removed.
+    """
+    if sketch is not None:
+        sketch = as_sketch(sketch, exceptions=exceptions)
+        var_min, var_max = sketch.min, sketch.max
+    else:
+        var_min, var_max = variable_le.min(), variable_le.max()
+
+    if isinstance(bins, int):
+        pctls = np.linspace(0, 1, bins + 1)
+        if sketch is not None:
+            bins = np.round(sketch.quantile(pctls))
+        elif weight is not None:
+            bins = np.round(_weighted_quantile(variable_le, weight, pctls))
+        else:
+            bins = variable_le.quantile(pctls).round()
+
+    if clean_cuts:
+        bins = _proc_cuts(cuts=bins, divisor=cuts_divisor, threshold=cuts_threshold)
+
+    bins = np.append(bins, [var_min, var_max])
+    return np.unique(np.round(bins, digits))
+
+
+def cut_edges(
+    variable,
+    bins: Union[Iterable[float], int],
+    exceptions: List = None,
+    digits: int = 0,
+    clean_cuts: bool = False,
+    cuts_divisor: int = 5,
+    cuts_threshold: int = 10,
+    sketch: Optional[Union[QuantileSketch, Iterable]] = None,
+    weight=None,
+) -> np.ndarray:
+    """
+    The bin edges `cleancut` cuts a variable at.
+
+    A bin holds the values above one edge up to and including the next,
+    and the first bin includes the lowest edge. Passing the edges back to
+    `cleancut` as `bins` gives the same bins, so they can be kept, for
+    example in a `Scorecard`, and applied to new data. Parameters are
+    those of `cleancut`, and
+
+    weight: array like.
+        Frequency weight of each value of variable. The quantiles of an
+        integer `bins` are those of the values repeated by their weights,
+        for example when variable is a column of collapsed counts.
+
+    Returns
+    -------
+    edges: numpy array
+    """
+    if exceptions is not None:
+        exceptions = np.unique(np.sort(exceptions))
+        variable = variable.where(~variable.isin(exceptions), np.nan)
+    return _edges(
+        variable,
+        bins,
+        exceptions,
+        digits,
+        clean_cuts,
+        cuts_divisor,
+        cuts_threshold,
+        sketch,
+        weight,
+    )
+
+
+@disk_cached()
+@cached_binning
 def cleancut(
     variable,
     bins: Union[Iterable[float], int],
@@ -40,6 +148,8 @@ def cleancut(
     clean_cuts: bool = False,
     cuts_divisor: int = 5,
     cuts_threshold: int = 10,
+    sketch: Optional[Union[QuantileSketch, Iterable]] = None,
+    codes: bool = False,
     **kwargs,
 ):
     """
@@ -81,7 +191,20 @@ def cleancut(
 
     cuts_threshold: int
         The minum value to apply the cuts_divisor to.
-    
+
+    sketch: QuantileSketch or iterable of chunks.
+        A quantile sketch of the full variable, or an iterable of chunks
+        to build one from. When supplied, the quantiles for an integer
+        `bins`, and the min and max of the variable, are taken from the
+        sketch rather than the variable. This allows chunks of a large
+        file to be cut with the same bins.
+
+    codes: bool
+        If True return a `BinnedCodes`, an int8 or int16 array of codes and
+        a separate table of labels in category order, instead of a
+        categorical Series. The tables in `smalltables` accept it in place
+        of a column.
+
     """
     if exceptions is not None:
         exceptions = np.unique(np.sort(exceptions))
@@ -89,14 +212,16 @@ def cleancut(
     else:
         variable_le = variable
 
-    if isinstance(bins, int):
-        bins = variable_le.quantile(np.linspace(0, 1, bins + 1)).round()
-
-    if clean_cuts:
-        bins = _proc_cuts(cuts=bins, divisor=cuts_divisor, threshold=cuts_threshold)
-
-    bins = np.append(bins, [variable_le.min(), variable_le.max()])
-    bins = np.round(np.sort(np.unique(bins)), digits)
+    bins = _edges(
+        variable_le,
+        bins,
+        exceptions,
+        digits,
+        clean_cuts,
+        cuts_divisor,
+        cuts_threshold,
+        sketch,
+    )
 
     labs = _make_labels(bins, digits)
 
@@ -127,4 +252,6 @@ def cleancut(
                 variable_cats[-1:].append(variable_cats[:-1])
             )
 
+    if codes:
+        return BinnedCodes.from_series(cut_variable)
     return cut_variable
@@ -0,0 +1,45 @@
+import sys
+import logging
+import argparse
+from .report import run_report
+
+
+def main(argv=None):
+    """
+    Entry point of the scoretools command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scoretools", description="Build score analysis reports."
+    )
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    run = sub.add_parser("run", help="Run a YAML or JSON report spec.")
+    run.add_argument("spec", help="Path to the report spec.")
+    run.add_argument("-o", "--output", default=None, help="Output file.")
+    run.add_argument(
+        "-w", "--workers", type=int, default=None, help="Number of worker threads."
+    )
+    run.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not log task timings."
+    )
+
+    sub.add_parser("serve", help="Start the local report server.", add_help=False)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "serve":
+        from .server import main as serve_main
+
+        return serve_main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(asctime)s %(message)s",
+        stream=sys.stderr,
+    )
+    results, _ = run_report(args.spec, output=args.output, workers=args.workers)
+    if "write" in results:
+        print(results["write"])
+    return 0
@@ -4,11 +4,33 @@ import sys
 import os
 import shlex
 import warnings
+import io
 import tempfile
-import atexit
+import weakref
+import asyncio
+import threading
 import numpy as np
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
 from typing import Optional, Iterable, Union, Dict, List
 from .utils import FormatHandler
+from .backends import BACKENDS, TableBackend, _remove_path
+from .plots import gains_curve, _prep_inputs_gplot
+
+# Thread that finalizes workbooks closed with `close_async`, started on
+# first use. Its thread is not a daemon, so pending workbooks are written
+# before the interpreter exits.
+_close_executor = None
+_close_executor_lock = threading.Lock()
+
+
+def _get_close_executor() -> Executor:
+    global _close_executor
+    with _close_executor_lock:
+        if _close_executor is None:
+            _close_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="TableWriter-close"
+            )
+    return _close_executor
 
 
 class TableWriter:
@@ -31,14 +53,41 @@ class TableWriter:
         class could be initialized with a pre-existing xlsxwriter 
         workbook object.
 
+    in_memory: bool.
+        If True the workbook is written to an in memory buffer instead of
+        a file, and `close` returns its bytes. No file is written, not
+        even a temporary one. Only for the xlsxwriter backend.
+        Default is set to False.
+
+    backend: str {'xlsxwriter', 'xlsx_stream', 'csv', 'parquet', 'html'}.
+        The output backend tables are written with. All backends share
+        the same `write_table` API.
+            * If `xlsxwriter` a fully formatted excel workbook is written.
+            * If `xlsx_stream` a lean excel workbook is written directly
+              as XML, only percent and header formats are kept. Rows
+              are written out as tables are added, so tables must be
+              written from the top of each worksheet down.
+            * If `csv` or `parquet` filename is a directory, each table
+              is written to its own file, along with a manifest.json
+              recording the sheet and position of every table.
+            * If `html` a single self-contained HTML report is written.
+        Default is set to "xlsxwriter".
+
     **kwargs: other arguments to be passed to xlsxwriter.Workbook.
 
     Examples
     --------
 
     If no filename is provided, a temporary file will be created to write to.
+    The file is removed on leaving a with block, when the TableWriter is
+    garbage collected, or with `cleanup`.
     >>> tab_wb = sts.TableWriter()
 
+    Write to memory, for example to return a workbook over HTTP
+    >>> with sts.TableWriter(in_memory=True) as tab_wb:
+    ...     tab_wb.write_table(df)
+    >>> content = tab_wb.close()
+
     Create a new workbook
     >>> tab_wb = sts.TableWriter("Example_file.xlsx")
 
@@ -53,6 +102,17 @@ class TableWriter:
 
     Open excel document
     >>> tab_wb.open_file()
+
+    Finalize a large workbook in the background while the next report
+    is computed
+    >>> future = tab_wb.close_async()
+    >>> ...
+    >>> future.result()
+
+    Write the same tables to a bundle of csv files for machine consumers
+    >>> csv_wb = sts.TableWriter("Example_dir", backend="csv")
+    >>> csv_wb.write_table(df, 1, 1)
+    >>> csv_wb.close()
     """
 
     def __init__(
@@ -60,24 +120,42 @@ class TableWriter:
         filename: Optional[str] = None,
         overwrite: bool = False,
         workbook: Optional[xlsx.Workbook] = None,
+        backend: str = "xlsxwriter",
+        in_memory: bool = False,
         **kwargs,
     ):
         self._is_temporary = False
-        if workbook is not None:
+        self._buffer = None
+        self._content = None
+        if in_memory:
+            assert (
+                filename is None and workbook is None and backend == "xlsxwriter"
+            ), "in_memory is only for a new xlsxwriter workbook without a filename"
+            self._buffer = io.BytesIO()
+            options = dict(kwargs.pop("options", {}), in_memory=True)
+            self._workbook = xlsx.Workbook(self._buffer, options, **kwargs)
+        elif workbook is not None:
             assert (
                 not workbook.fileclosed
             ), "Workbook supplied must not be closed."
             self._workbook = workbook
+        elif backend != "xlsxwriter":
+            assert (
+                backend in BACKENDS
+            ), f"backend must be 'xlsxwriter' or one of {list(BACKENDS)}"
+            self._is_temporary = filename is None
+            self._workbook = BACKENDS[backend](
+                filename=filename, overwrite=overwrite
+            )
         # Create temporary file if no filename is given
         else:
             if filename is None:
                 self._is_temporary = True
-                tmp_filename = tempfile.NamedTemporaryFile(
+                fd, tmp_filename = tempfile.mkstemp(
                     prefix="TableWriter_Temp_", suffix=".xlsx"
                 )
-                self._workbook = xlsx.Workbook(
-                    filename=tmp_filename.name, **kwargs
-                )
+                os.close(fd)
+                self._workbook = xlsx.Workbook(filename=tmp_filename, **kwargs)
             else:
                 assert (
                     True if overwrite else not os.path.isfile(filename)
@@ -98,6 +176,25 @@ class TableWriter:
         self.between = 2
         self.closed = False
         self.old_sheetname = None
+        self._chart_data = None
+        self._chart_data_col = 0
+        self._closing: Optional[Future] = None
+        # A temporary file is removed on leaving a with block, or when the
+        # writer is garbage collected, unless it was opened for viewing.
+        self._finalizer = (
+            weakref.finalize(self, _remove_path, self._workbook.filename)
+            if self._is_temporary
+            else None
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.closed:
+            self.close()
+        if self._finalizer is not None and self._finalizer.alive:
+            self._finalizer()
 
     def default_format(
         self,
@@ -377,6 +474,131 @@ class TableWriter:
 
         self.old_sheetname = worksheet.get_name()
 
+    def _write_chart_data(self, curve: pd.DataFrame, name: str) -> List:
+        """
+        Write the columns of a curve to the hidden chart data sheet,
+        returning the cell range of each column.
+        """
+        if self._chart_data is None:
+            self._chart_data = self._workbook.add_worksheet("ChartData")
+            self._chart_data.hide()
+        ws, col = self._chart_data, self._chart_data_col
+        ranges = []
+        for i, curve_col in enumerate(curve.columns):
+            ws.write(0, col + i, f"{name} {curve_col}")
+            ws.write_column(1, col + i, curve[curve_col].tolist())
+            ranges.append([ws.get_name(), 1, col + i, curve.shape[0], col + i])
+        self._chart_data_col += curve.shape[1]
+        return ranges
+
+    def write_gains_chart(
+        self,
+        data: pd.DataFrame,
+        performance,
+        score,
+        ascending=True,
+        kind: str = "gains",
+        exceptions: Optional[Iterable] = None,
+        dof: Optional[float] = None,
+        weight: Optional[str] = None,
+        points: int = 200,
+        row: Optional[int] = None,
+        col: Optional[int] = None,
+        sheetname: str = None,
+        title: Optional[str] = None,
+        size: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Write gains or KS curves as a native excel chart.
+
+        Each curve is decimated to `points` evenly spaced depths of file
+        and written to a hidden "ChartData" sheet, so the size of the
+        workbook does not depend on the number of rows in data.
+
+        Parameters
+        ----------
+        data, performance, score, ascending, exceptions, dof, weight:
+            See `gplot`. Several performance and score fields may be
+            given, one curve is drawn for each pair.
+
+        kind: string {'gains', 'ks'}.
+            If `gains` the cumulative share of bads is drawn against the
+            depth of file. If `ks` the cumulative shares of bads and
+            goods are both drawn for each pair. Default is "gains".
+
+        points: int.
+            The number of points in each curve. Default is 200.
+
+        row, col, sheetname:
+            Where to insert the chart, see `write_table`.
+
+        title: str.
+            Chart title. Default is None, no title.
+
+        size: dict.
+            Chart size in pixels, {"width": 480, "height": 288}.
+        """
+        assert not isinstance(
+            self._workbook, TableBackend
+        ), "Charts can only be written with the xlsxwriter backend"
+        worksheet = self._handle_worksheet(sheetname=sheetname)
+        row = self.row if row is None else row
+        col = self.col if col is None else col
+
+        chart = self._workbook.add_chart({"type": "scatter", "subtype": "straight"})
+        for perf, scr, asc in _prep_inputs_gplot(
+            data, performance, score, ascending, weight, low_memory=True
+        ):
+            curve = gains_curve(
+                data, perf, scr, asc, exceptions, dof, weight, points, kind
+            )
+            name = f"{scr}<>{perf}"
+            ranges = self._write_chart_data(curve, name)
+            chart.add_series(
+                {"name": name, "categories": ranges[0], "values": ranges[1]}
+            )
+            if kind == "ks":
+                chart.add_series(
+                    {
+                        "name": f"{name} good",
+                        "categories": ranges[0],
+                        "values": ranges[2],
+                        "line": {"dash_type": "dash"},
+                    }
+                )
+        if kind == "gains":
+            # Random selection for reference.
+            chart.add_series(
+                {
+                    "name": "Random",
+                    "categories": ranges[0],
+                    "values": ranges[0],
+                    "line": {"color": "gray", "dash_type": "round_dot"},
+                }
+            )
+        depth = 1 if dof is None else dof
+        chart.set_x_axis(
+            {"name": "Cuml % of File", "min": 0, "max": depth, "num_format": "0%"}
+        )
+        chart.set_y_axis(
+            {
+                "name": "Cuml % of Bad" if kind == "gains" else "Cuml %",
+                "min": 0,
+                "max": 1,
+                "num_format": "0%",
+            }
+        )
+        chart.set_legend({"position": "right"})
+        if title is not None:
+            chart.set_title({"name": title})
+        size = {"width": 480, "height": 288} if size is None else size
+        chart.set_size(size)
+        worksheet.insert_chart(row, col, chart)
+
+        self.col = col
+        self.row = row + -(-size["height"] // 20) + self.between
+        self.old_sheetname = worksheet.get_name()
+
     def _write_index(self, tbl, worksheet, row, col, frmt=None):
         """
         Write index as first column, if multi-index, write out
@@ -408,6 +630,19 @@ class TableWriter:
         data_fmt_pct,
     ):
         self.col = col
+        # Alternative backends take the whole table at once.
+        if isinstance(self._workbook, TableBackend):
+            self._workbook.write_frame(
+                worksheet=worksheet,
+                tbl=tbl,
+                row=row,
+                col=col,
+                index=index,
+                pct_idxs=self._get_percent_cols(tbl=tbl, pct_keys=pct_keys),
+            )
+            self.row = row + tbl.shape[0] + 1 + self.between
+            return
+
         if index:
             self._write_index(tbl, worksheet, row, col, header_fmt)
             col += tbl.index.nlevels
@@ -433,15 +668,14 @@ class TableWriter:
         pct_idxs = self._get_percent_cols(tbl=tbl, pct_keys=pct_keys)
         # Write out data
         for cs in range(len(tbl.columns)):
+            fmt = data_fmt_pct if cs in pct_idxs else data_fmt
             for rs in range(len(tbl.index)):
-                if cs in pct_idxs:
-                    worksheet.write(
-                        rs + row, cs + col, tbl.iat[rs, cs], data_fmt_pct
-                    )
+                value = tbl.iat[rs, cs]
+                # Missing values, such as those of a profile, are left blank.
+                if pd.api.types.is_scalar(value) and pd.isna(value):
+                    worksheet.write_blank(rs + row, cs + col, None, fmt)
                 else:
-                    worksheet.write(
-                        rs + row, cs + col, tbl.iat[rs, cs], data_fmt
-                    )
+                    worksheet.write(rs + row, cs + col, value, fmt)
 
         row += tbl.shape[0]
         self.row = row + self.between
@@ -450,6 +684,7 @@ class TableWriter:
         """
         Handle creation or selection of worksheet.
         """
+        assert not self.closed, "Tables can not be written to a closed TableWriter"
         if sheetname is None:
             try:
                 worksheet = self._workbook.worksheets()[0]
@@ -478,10 +713,15 @@ class TableWriter:
 
         If the workbook has not been closed it will be closed and 
         written by default. Currently supported for windows or macOS.
+        A temporary workbook that is opened is kept for the viewer, until
+        `cleanup` is called.
         """
-        if not self.closed:
-            self.close()
-            self.closed = True
+        assert self._content is None and self._buffer is None, (
+            "An in memory workbook can not be opened"
+        )
+        self.close()
+        if self._finalizer is not None:
+            self._finalizer.detach()
 
         sys_platform = sys.platform.lower()
 
@@ -494,11 +734,85 @@ class TableWriter:
         else:
             warnings.warn("open_file() not supported on this OS.")
 
-    def close(self):
+    def close(self) -> Optional[bytes]:
         """
         Close workbook, and output contents.
+
+        Returns
+        -------
+        content: bytes or None
+            The workbook file, if the TableWriter is in memory.
+        """
+        if self._closing is not None:
+            return self._closing.result()
+        if not self.closed:
+            self._finalize()
+            self.closed = True
+        return self._content
+
+    def _finalize(self) -> Optional[bytes]:
+        """
+        Serialize and write the workbook.
         """
         self._workbook.close()
+        if self._buffer is not None:
+            self._content = self._buffer.getvalue()
+            self._buffer = None
+        return self._content
+
+    def close_async(self, executor: Optional[Executor] = None) -> Future:
+        """
+        Close the workbook on a background thread.
+
+        The XML serialization and compression of the workbook run on the
+        background thread, and the caller can carry on with other work.
+        No more tables can be written once this is called. Any error
+        closing the workbook is raised when the result of the future is
+        taken, or by `close`, which waits for the background close.
+
+        Parameters
+        ----------
+        executor: concurrent.futures.Executor.
+            A thread pool to close the workbook on. The workbook can not
+            be sent to another process. Default is a single shared thread,
+            so workbooks are written one at a time.
+
+        Returns
+        -------
+        future: concurrent.futures.Future
+            The future of `close`, the workbook bytes if the TableWriter
+            is in memory, otherwise None.
+        """
+        if self._closing is None:
+            if self.closed:
+                self._closing = Future()
+                self._closing.set_result(self._content)
+            else:
+                self.closed = True
+                pool = _get_close_executor() if executor is None else executor
+                self._closing = pool.submit(self._finalize)
+        return self._closing
+
+    async def aclose(self) -> Optional[bytes]:
+        """
+        Close the workbook on a background thread, without blocking the
+        event loop. See `close_async`.
+
+        Examples
+        --------
+        >>> content = await tab_wb.aclose()
+        """
+        return await asyncio.wrap_future(self.close_async())
+
+    def cleanup(self):
+        """
+        Remove the temporary file now, rather than when the TableWriter
+        is garbage collected. This also removes a file kept for viewing
+        by `open_file`.
+        """
+        if self._closing is not None:
+            wait([self._closing])
         if self._is_temporary:
-            atexit.register(os.remove, self._workbook.filename)
-        self.closed = True
+            if self._finalizer is not None:
+                self._finalizer.detach()
+            _remove_path(self._workbook.filename)
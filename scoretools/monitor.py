@@ -0,0 +1,277 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+
+def _day_number(day) -> int:
+    return int(np.datetime64(pd.Timestamp(day).date(), "D").astype(np.int64))
+
+
+class ScoreMonitor:
+    """
+    Windowed score monitoring from per-day counts
+
+    Each day's batch is reduced to counts of goods and bads at each score
+    value, and kept in a ring buffer of one bucket per day. Running totals
+    over the window are updated as days are added and expire, so the KS,
+    gains and distribution of the window are computed from the counts at
+    each score value, without revisiting any rows.
+
+    Parameters
+    ----------
+    scores: iterable of numbers.
+        The score values to keep counts for, for example range(300, 851).
+        A score is counted at the largest value at or below it, scores
+        below the first value are counted at the first value.
+
+    window: int.
+        The number of days kept. Default is 90.
+
+    performance: string.
+        The name of the performance field, used to name table columns.
+        Default is "bad".
+
+    Examples
+    --------
+    >>> mon = sts.ScoreMonitor(range(300, 851), window=90)
+    >>> mon.update("2024-03-01", df["scr"], df["bad"])
+    >>> mon.ks(ascending=True)
+    >>> mon.distribution(bands=[300, 500, 600, 700, 850])
+    >>> mon.save("monitor.npz")
+    >>> mon = sts.ScoreMonitor.load("monitor.npz")
+    """
+
+    def __init__(
+        self, scores: Iterable[float], window: int = 90, performance: str = "bad"
+    ):
+        self.scores = np.unique(np.asarray(list(scores), dtype=float))
+        assert self.scores.size > 0, "scores must not be empty"
+        assert window > 0, "window must be positive"
+        self.window = window
+        self.performance = performance
+        shape = (window, self.scores.size)
+        self._goods = np.zeros(shape)
+        self._bads = np.zeros(shape)
+        # Day number held by each bucket, -1 for an empty bucket.
+        self._days = np.full(window, -1, dtype=np.int64)
+        self._good_tot = np.zeros(self.scores.size)
+        self._bad_tot = np.zeros(self.scores.size)
+        self.last_day: Optional[int] = None
+
+    @property
+    def days(self) -> pd.DatetimeIndex:
+        """
+        The days held in the window, in order.
+        """
+        held = np.sort(self._days[self._days >= 0])
+        return pd.DatetimeIndex(held.astype("datetime64[D]"))
+
+    def _evict(self, first_day: int):
+        """
+        Clear the buckets of days before first_day.
+        """
+        expired = (self._days >= 0) & (self._days < first_day)
+        if expired.any():
+            self._good_tot -= self._goods[expired].sum(axis=0)
+            self._bad_tot -= self._bads[expired].sum(axis=0)
+            self._goods[expired] = 0
+            self._bads[expired] = 0
+            self._days[expired] = -1
+
+    def update_counts(self, day, goods, bads):
+        """
+        Add counts of goods and bads at each score value for a day.
+
+        Parameters
+        ----------
+        day: date like.
+            The day of the batch. Days may arrive out of order, but not
+            before the start of the current window.
+
+        goods, bads: arrays aligned with `scores`.
+        """
+        goods = np.asarray(goods, dtype=float)
+        bads = np.asarray(bads, dtype=float)
+        assert goods.shape == bads.shape == self.scores.shape, (
+            "goods and bads must align with scores"
+        )
+        dnum = _day_number(day)
+        if self.last_day is None or dnum > self.last_day:
+            self.last_day = dnum
+            self._evict(dnum - self.window + 1)
+        assert dnum > self.last_day - self.window, (
+            f"{day} is before the start of the window"
+        )
+        slot = dnum % self.window
+        self._days[slot] = dnum
+        self._goods[slot] += goods
+        self._bads[slot] += bads
+        self._good_tot += goods
+        self._bad_tot += bads
+
+    def update(self, day, score, performance, weight=None):
+        """
+        Add a day's batch of scores and performance.
+
+        Parameters
+        ----------
+        day: date like.
+
+        score: array or pandas Series of scores.
+
+        performance: array or pandas Series.
+            Binary performance values where 1 is a bad. Rows with a
+            missing score or performance are not counted.
+
+        weight: array or pandas Series.
+            Frequency weight of each row. If None, each row has a weight
+            of one.
+        """
+        scr = np.asarray(score, dtype=float)
+        perf = np.asarray(performance, dtype=float)
+        wgt = np.ones(scr.size) if weight is None else np.asarray(weight, dtype=float)
+        keep = ~(np.isnan(scr) | np.isnan(perf))
+        idx = np.clip(np.searchsorted(self.scores, scr[keep], side="right") - 1, 0, None)
+        bad_w = perf[keep] * wgt[keep]
+        n = np.bincount(idx, wgt[keep], self.scores.size)
+        bads = np.bincount(idx, bad_w, self.scores.size)
+        self.update_counts(day, n - bads, bads)
+
+    def _counts(self, days: Optional[int]):
+        if days is None or days >= self.window:
+            return self._good_tot, self._bad_tot
+        if self.last_day is None:
+            return self._good_tot, self._bad_tot
+        recent = self._days > self.last_day - days
+        return self._goods[recent].sum(axis=0), self._bads[recent].sum(axis=0)
+
+    def counts(self, days: Optional[int] = None) -> pd.DataFrame:
+        """
+        Goods, bads and rows at each score value.
+
+        Parameters
+        ----------
+        days: int.
+            Only count the most recent days. Default is None, the whole
+            window.
+        """
+        goods, bads = self._counts(days)
+        return pd.DataFrame(
+            {"N": goods + bads, "Goods": goods, "Bads": bads},
+            index=pd.Index(self.scores, name="score"),
+        )
+
+    def ks(self, ascending: bool = True, days: Optional[int] = None) -> float:
+        """
+        The KS of the window, as `calc_ks` with the scores sorted by
+        `ascending`, taken at the boundaries between score values.
+        """
+        goods, bads = self._counts(days)
+        if not ascending:
+            goods, bads = goods[::-1], bads[::-1]
+        cuml_bd = np.cumsum(bads) / bads.sum()
+        cuml_gd = np.cumsum(goods) / goods.sum()
+        return (cuml_bd - cuml_gd).max()
+
+    def gains(self, ascending: bool = True, days: Optional[int] = None) -> pd.DataFrame:
+        """
+        The gains curve of the window, the cumulative share of the file
+        and of bads at each score value, as in `gplot`.
+        """
+        goods, bads = self._counts(days)
+        scores = self.scores
+        if not ascending:
+            goods, bads, scores = goods[::-1], bads[::-1], scores[::-1]
+        n = goods + bads
+        return pd.DataFrame(
+            {
+                "pct_file": np.cumsum(n) / n.sum(),
+                "cuml_perf": np.cumsum(bads) / bads.sum(),
+            },
+            index=pd.Index(scores, name="score"),
+        )
+
+    def distribution(
+        self, bands: Optional[Iterable[float]] = None, days: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        The distribution and bad rate of the window by score value, or by
+        score band.
+
+        Parameters
+        ----------
+        bands: iterable of numbers.
+            Band edges, a score value is in the band [edge, next edge).
+            Default is None, each score value is its own band.
+
+        days: int.
+            Only use the most recent days. Default is None, the whole
+            window.
+
+        Returns
+        -------
+        distribution: pandas DataFrame
+            Columns as in `freq_tab`, with the bads and bad rate of each
+            band.
+        """
+        goods, bads = self._counts(days)
+        if bands is None:
+            index = pd.Index(self.scores, name="score")
+        else:
+            edges = np.unique(np.asarray(list(bands), dtype=float))
+            band = np.clip(np.searchsorted(edges, self.scores, side="right") - 1, 0, None)
+            goods = np.bincount(band, goods, edges.size)
+            bads = np.bincount(band, bads, edges.size)
+            upper = np.append(edges[1:], np.inf)
+            index = pd.Index(
+                [f"{lo:g}-{hi:g}" for lo, hi in zip(edges, upper)], name="score"
+            )
+        n = goods + bads
+        tbl = pd.DataFrame({"Frequency": n}, index=index)
+        tbl["Percent"] = n / n.sum()
+        tbl["Cumulative Frequency"] = np.cumsum(n)
+        tbl["Cumulative Percent"] = tbl["Percent"].cumsum()
+        tbl[f"{self.performance} sum"] = bads
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tbl[f"{self.performance} Rate"] = bads / n
+        return tbl
+
+    def save(self, path: str):
+        """
+        Save the monitor to a compressed numpy file. Only the buckets of
+        days in the window are stored. The file is written to path as
+        given, with no .npz suffix added.
+        """
+        held = self._days >= 0
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                scores=self.scores,
+                window=self.window,
+                performance=self.performance,
+                last_day=-1 if self.last_day is None else self.last_day,
+                days=self._days[held],
+                goods=self._goods[held],
+                bads=self._bads[held],
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "ScoreMonitor":
+        """
+        Load a monitor saved with `save`.
+        """
+        with np.load(path) as state:
+            mon = cls(
+                state["scores"],
+                window=int(state["window"]),
+                performance=str(state["performance"]),
+            )
+            last_day = int(state["last_day"])
+            mon.last_day = None if last_day < 0 else last_day
+            slots = state["days"] % mon.window
+            mon._days[slots] = state["days"]
+            mon._goods[slots] = state["goods"]
+            mon._bads[slots] = state["bads"]
+        mon._good_tot = mon._goods.sum(axis=0)
+        mon._bad_tot = mon._bads.sum(axis=0)
+        return mon
@@ -0,0 +1,408 @@
+import os
+import functools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .cleancut import cleancut
+from .plots import calc_ks
+from .smalltables import freq_tab, single_bivar, collapse_counts
+from .utils import coerce_to_iterable
+from .utils.codes import BinnedCodes
+from .utils.sketch import QuantileSketch
+
+
+class SharedFrame:
+    """
+    Columns of a DataFrame placed in shared memory
+
+    Numeric columns are copied into shared memory once, and categorical
+    columns as their integer codes, with the categories kept alongside.
+    Worker processes attach to the blocks by name, and read the columns
+    as NumPy views without copying or pickling them.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+
+    columns: iterable of strings.
+        The columns to share. Default is every numeric and categorical
+        column.
+    """
+
+    def __init__(self, data: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+        if columns is None:
+            columns = [
+                c
+                for c, dt in data.dtypes.items()
+                if dt.name == "category" or (dt.kind in "biuf")
+            ]
+        self.n_rows = data.shape[0]
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.spec: Dict[str, Tuple] = {}
+        try:
+            for col in columns:
+                values = data[col]
+                dtype = None
+                if values.dtype.name == "category":
+                    dtype = values.dtype
+                    values = values.cat.codes
+                arr = values.to_numpy()
+                assert arr.dtype.kind in "biuf", f"{col} is not numeric or categorical"
+                shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+                self._blocks[col] = shm
+                np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[:] = arr
+                self.spec[col] = (shm.name, arr.dtype.str, arr.shape, dtype)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.spec)
+
+    def frame(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        A read only view of rows [start, stop) of the shared columns.
+        """
+        return _frame_from_blocks(
+            {c: self._array(c) for c in self.spec}, self.spec, start, stop
+        )
+
+    def _array(self, col: str) -> np.ndarray:
+        _, dtype, shape, _ = self.spec[col]
+        return np.ndarray(shape, np.dtype(dtype), buffer=self._blocks[col].buf)
+
+    def close(self):
+        """
+        Release and remove the shared memory blocks.
+        """
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _frame_from_blocks(arrays, spec, start, stop) -> pd.DataFrame:
+    cols = {}
+    for col, arr in arrays.items():
+        view = arr[start:stop]
+        view.flags.writeable = False
+        dtype = spec[col][3]
+        if dtype is not None:
+            view = pd.Categorical.from_codes(view, dtype=dtype, validate=False)
+        cols[col] = view
+    return pd.DataFrame(cols, copy=False)
+
+
+# Shared memory attached by each worker process, set once per worker.
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_spec: Dict[str, Tuple] = {}
+
+
+def _init_worker(spec: Dict[str, Tuple]):
+    global _worker_spec
+    _worker_spec = spec
+    for col, (name, dtype, shape, _) in spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(shm)
+        _worker_arrays[col] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+
+
+def _run_partition(func: Callable, start: int, stop: int, args: tuple):
+    frame = _frame_from_blocks(_worker_arrays, _worker_spec, start, stop)
+    return func(frame, *args)
+
+
+def _partial_counts(frame, by, weight, max_levels):
+    counts = collapse_counts(frame, by, weight=weight, name="_count")
+    assert max_levels is None or counts.shape[0] <= max_levels, (
+        f"{by} has more than {max_levels} levels in a partition, bin it first, "
+        "for example with PartitionExecutor.cleancut"
+    )
+    return counts
+
+
+def _bad_good(frame, performance, weight):
+    perf = frame[performance].to_numpy()
+    wgt = 1.0 if weight is None else frame[weight].to_numpy(dtype=float)
+    return (perf == 1) * wgt, (perf == 0) * wgt
+
+
+def _partial_ks_counts(frame, performance, score, weight, max_levels):
+    """
+    The bad and good counts at each score value, missing last, or None
+    if the partition has more than max_levels score values.
+    """
+    values, inverse = np.unique(frame[score].to_numpy(dtype=float), return_inverse=True)
+    if max_levels is not None and values.size > max_levels:
+        return None
+    bd, gd = _bad_good(frame, performance, weight)
+    inverse = inverse.ravel()
+    return (
+        values,
+        np.bincount(inverse, weights=bd, minlength=values.size),
+        np.bincount(inverse, weights=gd, minlength=values.size),
+    )
+
+
+def _partial_grid_counts(frame, performance, score, weight, edges):
+    """
+    The bad and good counts of the score in the cells of a grid of edges,
+    with a last cell for missing scores.
+    """
+    # A value is in the cell of the first edge at or above it, and a
+    # missing value past the last edge.
+    cell = np.searchsorted(edges, frame[score].to_numpy(dtype=float), side="left")
+    bd, gd = _bad_good(frame, performance, weight)
+    return (
+        np.bincount(cell, weights=bd, minlength=edges.size + 1),
+        np.bincount(cell, weights=gd, minlength=edges.size + 1),
+    )
+
+
+def _ks_from_counts(bd, gd, ascending) -> float:
+    """
+    KS from bad and good counts in ascending score order, missing last,
+    taken between cells so tied scores are never split.
+    """
+    if not ascending:
+        # Missing scores stay last, as in calc_ks.
+        bd = np.append(bd[:-1][::-1], bd[-1])
+        gd = np.append(gd[:-1][::-1], gd[-1])
+    return (np.cumsum(bd) / bd.sum() - np.cumsum(gd) / gd.sum()).max()
+
+
+def _partial_sketch(frame, variable, exceptions, k):
+    sketch = QuantileSketch(k=k)
+    sketch.update(frame[variable].to_numpy(), exceptions=exceptions)
+    return sketch
+
+
+def _partial_cut(frame, variable, bins, sketch, kwargs):
+    return cleancut(frame[variable], bins, sketch=sketch, codes=True, **kwargs)
+
+
+def _combine_counts(parts: List[pd.DataFrame], by) -> pd.DataFrame:
+    counts = pd.concat(parts, ignore_index=True)
+    grp = counts.groupby(by, dropna=False, observed=True, sort=True)
+    return grp["_count"].sum().reset_index()
+
+
+class PartitionExecutor:
+    """
+    Run tables and metrics over row partitions of a DataFrame in worker
+    processes
+
+    The columns are placed in shared memory once, see `SharedFrame`, and
+    each worker reads its partition as zero copy views, so no data is
+    pickled to the workers. Each partition is reduced to small counts,
+    which are combined and passed to the usual weighted functions, giving
+    the same results as running them on the whole DataFrame. The counts
+    sent back by a worker are bounded by `max_levels`, so high cardinality
+    columns are binned first, see `cleancut`, and the KS of a score with
+    many values is taken on a grid of its quantiles.
+
+    When the data is too small for the workers to pay for themselves,
+    every call runs serially in the calling process instead, and nothing
+    is placed in shared memory.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+
+    columns: iterable of strings.
+        The numeric and categorical columns to share. Default is every
+        numeric and categorical column.
+
+    n_workers: int or None.
+        Number of worker processes. Default is None, the number of CPUs.
+
+    min_rows: int.
+        The fewest rows given to a worker. The data is split into at most
+        len(data) // min_rows partitions, and runs serially if that is
+        one. Default is 1,000,000.
+
+    max_levels: int.
+        The most levels of counts a worker sends back. Default is 10,000.
+        There is no limit when the executor is serial.
+
+    Examples
+    --------
+    >>> with sts.PartitionExecutor(df, n_workers=8) as ex:
+    ...     ex.freq_tab("grade")
+    ...     ex.single_bivar("scr_bin", "bad")
+    ...     ex.calc_ks("bad", "scr", ascending=True)
+    ...     binned = ex.cleancut("scr", 10)
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        columns: Optional[Iterable[str]] = None,
+        n_workers: Optional[int] = None,
+        min_rows: int = 1_000_000,
+        max_levels: int = 10_000,
+    ):
+        self.max_levels = max_levels
+        n_workers = os.cpu_count() if n_workers is None else n_workers
+        self.n_workers = max(1, min(n_workers, data.shape[0] // max(min_rows, 1)))
+        self.serial = self.n_workers == 1
+        self._data = data
+        self._shared = None
+        self._pool = None
+        if not self.serial:
+            self._shared = SharedFrame(data, columns)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(self._shared.spec,),
+            )
+
+    @property
+    def _limit(self) -> Optional[int]:
+        # Nothing is sent between processes when serial.
+        return None if self.serial else self.max_levels
+
+    def map(self, func: Callable, *args) -> List:
+        """
+        Call func(partition, *args) on each partition, returning the
+        results in row order. func must be a module level function, as it
+        is sent to the workers.
+        """
+        if self.serial:
+            return [func(self._data, *args)]
+        bounds = np.linspace(0, self._shared.n_rows, self.n_workers + 1).astype(int)
+        futures = [
+            self._pool.submit(_run_partition, func, start, stop, args)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        return [f.result() for f in futures]
+
+    def collapse(self, by, weight: Optional[str] = None) -> pd.DataFrame:
+        """
+        `collapse_counts` of the data, with the weight column "_count".
+        Each partition may hold at most `max_levels` combinations of by.
+        """
+        by = coerce_to_iterable(by)
+        return _combine_counts(
+            self.map(_partial_counts, by, weight, self._limit), by
+        )
+
+    def freq_tab(self, variable: str, weight: Optional[str] = None, **kwargs):
+        """
+        `freq_tab` of a column, other arguments are passed to freq_tab.
+        """
+        counts = self.collapse(variable, weight)
+        return freq_tab(variable, data=counts, weight="_count", **kwargs)
+
+    def single_bivar(
+        self, main_var: str, bivar: str, weight: Optional[str] = None, **kwargs
+    ):
+        """
+        `single_bivar` of a column, other arguments are passed to
+        single_bivar.
+        """
+        counts = self.collapse([main_var, bivar], weight)
+        return single_bivar(counts, main_var, bivar, weight="_count", **kwargs)
+
+    def calc_ks(
+        self,
+        performance: str,
+        score: str,
+        ascending: bool,
+        weight: Optional[str] = None,
+        k: int = 200,
+    ) -> float:
+        """
+        `calc_ks` of a score, taken between score values so tied scores
+        are never split.
+
+        Each partition sends back its bad and good counts at each score
+        value. When a partition has more than `max_levels` score values,
+        the partitions instead count on a shared grid of quantiles of the
+        score, from merged quantile sketches with accuracy `k`, and the
+        KS is approximate, see `QuantileSketch`.
+        """
+        parts = self.map(
+            _partial_ks_counts, performance, score, weight, self._limit
+        )
+        if all(p is not None for p in parts):
+            values, inverse = np.unique(
+                np.concatenate([p[0] for p in parts]), return_inverse=True
+            )
+            inverse = inverse.ravel()
+            bd = np.bincount(inverse, np.concatenate([p[1] for p in parts]))
+            gd = np.bincount(inverse, np.concatenate([p[2] for p in parts]))
+            # A cell for missing scores, which np.unique puts last.
+            if values.size and np.isnan(values[-1]):
+                return _ks_from_counts(bd, gd, ascending)
+            return _ks_from_counts(np.append(bd, 0), np.append(gd, 0), ascending)
+        sketches = self.map(_partial_sketch, score, None, k)
+        sketch = functools.reduce(lambda a, b: a.merge(b), sketches)
+        edges = np.unique(sketch.quantile(np.linspace(0, 1, self.max_levels + 1)))
+        parts = self.map(_partial_grid_counts, performance, score, weight, edges)
+        return _ks_from_counts(
+            sum(p[0] for p in parts), sum(p[1] for p in parts), ascending
+        )
+
+    def cleancut(
+        self,
+        variable: str,
+        bins,
+        exceptions: Optional[List] = None,
+        k: int = 200,
+        **kwargs,
+    ) -> BinnedCodes:
+        """
+        `cleancut` a column into compact codes.
+
+        Each partition builds a quantile sketch of the column, the
+        sketches are merged, and every partition is cut with the merged
+        sketch, so all partitions share the same bins. The quantiles of
+        an integer `bins` are those of the sketch, see `QuantileSketch`,
+        unless the executor is serial, when they are exact.
+        """
+        if self.serial:
+            return cleancut(
+                self._data[variable], bins, exceptions=exceptions, codes=True, **kwargs
+            )
+        sketches = self.map(_partial_sketch, variable, exceptions, k)
+        sketch = functools.reduce(lambda a, b: a.merge(b), sketches)
+        parts = self.map(
+            _partial_cut, variable, bins, sketch, dict(kwargs, exceptions=exceptions)
+        )
+        assert all(
+            p.categories.equals(parts[0].categories) for p in parts
+        ), "Partitions were cut with different bins"
+        return BinnedCodes(
+            np.concatenate([p.codes for p in parts]),
+            parts[0].categories,
+            name=variable,
+            ordered=parts[0].ordered,
+        )
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
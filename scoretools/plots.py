@@ -3,27 +3,173 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
 from .utils import coerce_to_iterable
-from typing import Iterable, List, Any, Optional
+from .utils.disk_cache import disk_cached
+from typing import Iterable, List, Any, Optional, Dict, Tuple
 
 
+def _dof_rows(n: int, dof: float) -> int:
+    """
+    Number of rows k whose depth of file, k / n, is within dof.
+    """
+    assert (dof > 0) & (dof <= 1), "dof of file must be in range (0,1]"
+    k = int(dof * n)
+    while k < n and (k + 1) / n <= dof:
+        k += 1
+    while k > 0 and k / n > dof:
+        k -= 1
+    return k
+
+
+def _top_k(scr: np.ndarray, k: int, ascending: bool) -> np.ndarray:
+    """
+    Positions of the first k rows in score order, selected with a
+    partial sort so only those k rows are fully sorted.
+    """
+    key = scr.astype(float) if ascending else -scr.astype(float)
+    if k < key.size:
+        top = np.argpartition(key, k - 1)[:k] if k > 0 else np.arange(0)
+    else:
+        top = np.arange(key.size)
+    return top[np.argsort(key[top], kind="stable")]
+
+
+def _sort_positions(scr: np.ndarray, ascending: bool) -> np.ndarray:
+    """
+    Positions that sort scr, with missing scores last as in sort_values.
+    """
+    order = np.argsort(scr, kind="stable")
+    if not ascending:
+        order = order[::-1]
+        n_na = np.count_nonzero(np.isnan(scr)) if scr.dtype.kind == "f" else 0
+        if n_na:
+            order = np.concatenate([order[n_na:], order[n_na - 1 :: -1]])
+    return order
+
+
+def _calc_ks_low_memory(
+    data: pd.DataFrame,
+    performance: str,
+    score: str,
+    ascending: bool,
+    weight: Optional[str],
+    block: int = 2 ** 16,
+) -> float:
+    """
+    KS from the sort positions of the score, with the cumulative good
+    and bad counts accumulated one block of rows at a time.
+    """
+    perf = data[performance].to_numpy()
+    wgt = None if weight is None else data[weight].to_numpy()
+    order = _sort_positions(data[score].to_numpy(), ascending)
+    is_bd, is_gd = perf == 1, perf == 0
+    if wgt is None:
+        tot_bd, tot_gd = np.count_nonzero(is_bd), np.count_nonzero(is_gd)
+    else:
+        tot_bd, tot_gd = wgt[is_bd].sum(), wgt[is_gd].sum()
+    del is_bd, is_gd
+    cuml_bd, cuml_gd, ks = 0, 0, -np.inf
+    for start in range(0, order.size, block):
+        pos = order[start : start + block]
+        p = perf[pos]
+        bd, gd = p == 1, p == 0
+        if wgt is not None:
+            w = wgt[pos]
+            bd, gd = bd * w, gd * w
+        bd, gd = np.cumsum(bd) + cuml_bd, np.cumsum(gd) + cuml_gd
+        ks = max(ks, (bd / tot_bd - gd / tot_gd).max())
+        cuml_bd, cuml_gd = bd[-1], gd[-1]
+    return ks
+
+
+@disk_cached(data_arg="data", column_args=("performance", "score", "weight"))
 def calc_ks(
     data: pd.DataFrame,
     performance: pd.Series,
     score: pd.Series,
     ascending: bool,
+    weight: Optional[str] = None,
+    dof: Optional[float] = None,
+    low_memory: bool = False,
 ) -> float:
-    scr_dat = data[[score, performance]].sort_values(score, ascending=ascending)
-    tot_perf = scr_dat[performance].sum()
-    cuml_gd = (
-        scr_dat[performance].eq(0).cumsum() / scr_dat[performance].eq(0).sum()
-    )
-    cuml_bd = scr_dat[performance].eq(1).cumsum() / scr_dat[performance].sum()
+    if low_memory and dof is None:
+        return _calc_ks_low_memory(data, performance, score, ascending, weight)
+    if dof is not None and weight is None:
+        # KS within the top of the file only needs the top rows sorted.
+        perf = data[performance].to_numpy()
+        top = _top_k(data[score].to_numpy(), _dof_rows(perf.size, dof), ascending)
+        cuml_bd = np.cumsum(perf[top] == 1) / np.count_nonzero(perf == 1)
+        cuml_gd = np.cumsum(perf[top] == 0) / np.count_nonzero(perf == 0)
+        return (cuml_bd - cuml_gd).max(initial=-np.inf)
+    cols = [score, performance] if weight is None else [score, performance, weight]
+    scr_dat = data[cols].sort_values(score, ascending=ascending)
+    wgt = 1 if weight is None else scr_dat[weight]
+    gd = scr_dat[performance].eq(0) * wgt
+    bd = scr_dat[performance].eq(1) * wgt
+    cuml_gd = gd.cumsum() / gd.sum()
+    cuml_bd = bd.cumsum() / bd.sum()
+    if dof is not None:
+        keep = (scr_dat[weight].cumsum() / scr_dat[weight].sum() <= dof).to_numpy()
+        cuml_gd, cuml_bd = cuml_gd[keep], cuml_bd[keep]
     return (cuml_bd - cuml_gd).max()
 
 
+def calc_capture(
+    data: pd.DataFrame,
+    performance: str,
+    score: str,
+    ascending: bool,
+    dof: float,
+    exceptions: Optional[Iterable] = None,
+) -> float:
+    """
+    Share of the performance captured within the top `dof` of the file
+
+    Only the rows within the depth of file are selected, with a partial
+    sort, and the total performance comes from a single sum.
+
+    Parameters
+    ----------
+    data : pandas DataFrame.
+
+    performance : string.
+        The name of a binary performance field.
+
+    score : string.
+        The name of the score field.
+
+    ascending : bool.
+        Rank the file by the score in ascending order.
+
+    dof : float in range (0,1].
+        The depth of file.
+
+    exceptions : iterable, default None.
+        Exception values of the score to leave out, as in `gplot`.
+
+    Returns
+    -------
+    capture: float
+    """
+    scr = data[score].to_numpy()
+    perf = data[performance].to_numpy()
+    if exceptions is not None:
+        keep = ~np.isin(scr, exceptions)
+        scr, perf = scr[keep], perf[keep]
+    top = _top_k(scr, _dof_rows(scr.size, dof), ascending)
+    return perf[top].sum() / perf.sum()
+
+
 def _prep_inputs_gplot(
-    data: pd.DataFrame, perf: Any, score: Any, ascending: Any
+    data: pd.DataFrame,
+    perf: Any,
+    score: Any,
+    ascending: Any,
+    weight: Optional[str] = None,
+    low_memory: bool = False,
 ) -> List[tuple]:
     """
     Format score performance and ascending inputs for easy use in gplot function.
@@ -39,7 +185,9 @@ def _prep_inputs_gplot(
         ), "ascending must be the same length as score, or of length 1"
         scr_asc = zip(score, itertools.cycle(ascending))
     scr_perf = [(i, *j) for i, j in itertools.product(perf, scr_asc)]
-    ks_list = map(lambda x: calc_ks(data, *x), scr_perf)
+    ks_list = map(
+        lambda x: calc_ks(data, *x, weight=weight, low_memory=low_memory), scr_perf
+    )
     ks_order = [
         i
         for (v, i) in sorted(
@@ -56,19 +204,107 @@ def _prep_data_gplot(
     perf: Iterable,
     score: Iterable,
     ascending: Any,
+    weight: Optional[str] = None,
+    low_memory: bool = False,
 ) -> pd.DataFrame:
-    ps = data[[perf, score]]
+    if low_memory:
+        return _prep_data_gplot_low_memory(
+            data, dof, exceptions, perf, score, ascending, weight
+        )
+    ps = data[[perf, score] if weight is None else [perf, score, weight]]
     if exceptions is not None:
         ps = ps[~ps[score].isin(exceptions)]
+    if dof is not None and weight is None:
+        # Select the rows within the depth of file before sorting, so only
+        # those rows are sorted. The total performance is a single sum.
+        n = ps.shape[0]
+        top = _top_k(ps[score].to_numpy(), _dof_rows(n, dof), ascending)
+        tot_perf = ps[perf].sum()
+        ps = ps.iloc[top]
+        ps["pct_file"] = np.arange(1, top.size + 1) / n
+        ps["cuml_perf"] = ps[perf].cumsum() / tot_perf
+        return ps
     ps = ps.sort_values(score, ascending=ascending)
-    ps["pct_file"] = np.arange(1, ps.shape[0] + 1) / ps.shape[0]
-    ps["cuml_perf"] = ps[perf].cumsum() / ps[perf].sum()
+    if weight is None:
+        ps["pct_file"] = np.arange(1, ps.shape[0] + 1) / ps.shape[0]
+        ps["cuml_perf"] = ps[perf].cumsum() / ps[perf].sum()
+    else:
+        wperf = ps[perf] * ps[weight]
+        ps["pct_file"] = ps[weight].cumsum() / ps[weight].sum()
+        ps["cuml_perf"] = wperf.cumsum() / wperf.sum()
     if dof is not None:
         assert (dof > 0) & (dof <= 1), "dof of file must be in range (0,1]"
         ps = ps[ps["pct_file"] <= dof]
     return ps
 
 
+def _prep_data_gplot_low_memory(
+    data: pd.DataFrame,
+    dof: Optional[float],
+    exceptions: Optional[Iterable],
+    perf: Any,
+    score: Any,
+    ascending: Any,
+    weight: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Low memory version of _prep_data_gplot. The columns are read without
+    copying, the data is ordered through positional index arrays, the
+    cumulative performance is accumulated in integers where the
+    performance is integer, and the depth of file and capture rates are
+    stored as float32. The returned frame has a positional index.
+    """
+    scr = data[score].to_numpy()
+    pf = data[perf].to_numpy()
+    wgt = None if weight is None else data[weight].to_numpy()
+    pos = None
+    if exceptions is not None:
+        pos = np.flatnonzero(~np.isin(scr, exceptions))
+    n = scr.size if pos is None else pos.size
+    key = scr if pos is None else scr[pos]
+    partial = dof is not None and weight is None
+    if partial:
+        order = _top_k(key, _dof_rows(n, dof), ascending)
+    else:
+        order = _sort_positions(key, ascending)
+    del key
+    acc = np.int64 if pf.dtype.kind in "biu" else np.float64
+    if partial:
+        tot_perf = (pf if pos is None else pf[pos]).sum(dtype=acc)
+    if pos is not None:
+        order = pos[order]
+        del pos
+
+    p_sorted = pf[order]
+    if wgt is None:
+        cuml = np.cumsum(p_sorted, dtype=acc)
+        pct_file = np.arange(1, order.size + 1, dtype=np.int64)
+        pct_file = np.divide(pct_file, n, dtype=np.float32)
+    else:
+        w = wgt[order]
+        cuml = np.cumsum(p_sorted * w)
+        pct_file = np.cumsum(w)
+        pct_file = np.divide(pct_file, pct_file[-1], dtype=np.float32)
+        del w
+    if not partial:
+        tot_perf = cuml[-1]
+    cuml_perf = np.divide(cuml, tot_perf, dtype=np.float32)
+    del cuml
+    ps = pd.DataFrame(
+        {
+            perf: p_sorted,
+            score: scr[order],
+            "pct_file": pct_file,
+            "cuml_perf": cuml_perf,
+        },
+        copy=False,
+    )
+    if dof is not None and weight is not None:
+        assert (dof > 0) & (dof <= 1), "dof of file must be in range (0,1]"
+        ps = ps[ps["pct_file"] <= dof]
+    return ps
+
+
 def gplot(
     data: pd.DataFrame,
     performance: Any,
@@ -76,6 +312,9 @@ def gplot(
     ascending: Any = True,
     exceptions: List = None,
     dof: float = None,
+    weight: Optional[str] = None,
+    ax: Optional[plt.Axes] = None,
+    low_memory: bool = False,
 ):
     """
     Create a Gplot or Cumulative Gains chart
@@ -108,16 +347,33 @@ def gplot(
         Specify the maximum depth of file that should be displayed in the plot.
         The value None is the same as specifying a depth of file of 1.
 
+    weight : string or None, default None.
+        The name of a frequency weight field in data. The depth of file
+        and capture rates are weighted by it.
+
+    ax : matplotlib Axes or None, default None.
+        Axes to draw the plot onto. If None, a new figure is created
+        with pyplot.
+
+    low_memory : bool, default False.
+        If True, the curves are prepared from positional index arrays
+        without copying the data, and stored as float32.
+
     Returns
     -------
     ax: matplotlib Axes.  
         Returns the Axes object with the plot drawn onto it.
 
     """
-    inpts = _prep_inputs_gplot(data, performance, score, ascending)
-    fig, ax = plt.subplots()
+    inpts = _prep_inputs_gplot(
+        data, performance, score, ascending, weight, low_memory=low_memory
+    )
+    if ax is None:
+        fig, ax = plt.subplots()
     for inpt in inpts:
-        pdat = _prep_data_gplot(data, dof, exceptions, *inpt)
+        pdat = _prep_data_gplot(
+            data, dof, exceptions, *inpt, weight=weight, low_memory=low_memory
+        )
         ax.plot(
             "pct_file", "cuml_perf", data=pdat, label=f"{inpt[1]}<>{inpt[0]}"
         )
@@ -125,11 +381,212 @@ def gplot(
     ax.legend(loc="center left", bbox_to_anchor=(1, 0.5), frameon=False)
     ax.xaxis.set_major_formatter(mtick.PercentFormatter(1.0))
     ax.yaxis.set_major_formatter(mtick.PercentFormatter(1.0))
-    plt.xlabel("Cuml % of File")
-    plt.ylabel("Cuml % of Bad")
+    ax.set_xlabel("Cuml % of File")
+    ax.set_ylabel("Cuml % of Bad")
     if dof is not None:
-        plt.gca().set_aspect("auto", adjustable="box")
+        ax.set_aspect("auto", adjustable="box")
     else:
-        plt.gca().set_aspect("equal", adjustable="box")
-    plt.grid(True, alpha=0.40)
+        ax.set_aspect("equal", adjustable="box")
+    ax.grid(True, alpha=0.40)
     return ax
+
+
+def gains_curve(
+    data: pd.DataFrame,
+    performance: str,
+    score: str,
+    ascending: bool = True,
+    exceptions: Optional[Iterable] = None,
+    dof: Optional[float] = None,
+    weight: Optional[str] = None,
+    points: int = 200,
+    kind: str = "gains",
+) -> pd.DataFrame:
+    """
+    A gains or KS curve, decimated to a fixed number of points
+
+    The curve is prepared as in `gplot`, and then sampled at `points`
+    evenly spaced depths of file, so its size does not depend on the
+    number of rows.
+
+    Parameters
+    ----------
+    data, performance, score, ascending, exceptions, dof, weight:
+        See `gplot`. A single performance and score field are used.
+
+    points: int, default 200.
+        The number of depths of file the curve is sampled at.
+
+    kind: string {'gains', 'ks'}, default 'gains'.
+        If `ks` the cumulative share of goods is added, the KS is the
+        largest gap between the two curves.
+
+    Returns
+    -------
+    curve: pandas DataFrame
+        Columns pct_file and cuml_perf, and cuml_good for a KS curve,
+        starting from the origin.
+    """
+    assert kind in ("gains", "ks"), "kind must be 'gains' or 'ks'"
+    assert points > 0, "points must be positive"
+    pdat = _prep_data_gplot(
+        data,
+        None if kind == "ks" else dof,
+        exceptions,
+        performance,
+        score,
+        ascending,
+        weight=weight,
+        low_memory=True,
+    )
+    pct_file = pdat["pct_file"].to_numpy(dtype=float)
+    cuml_perf = pdat["cuml_perf"].to_numpy(dtype=float)
+    depth = 1 if dof is None else dof
+    # The last row at or before each depth of file on the grid.
+    grid = np.linspace(0, depth, points + 1)[1:]
+    idx = np.searchsorted(pct_file, grid, side="right") - 1
+    idx = np.unique(idx[idx >= 0])
+    curve = {"pct_file": pct_file[idx], "cuml_perf": cuml_perf[idx]}
+    if kind == "ks":
+        # Goods to date are the rows to date less the bads to date.
+        pf = data[performance].to_numpy(dtype=float)
+        wgt = np.ones(pf.size) if weight is None else data[weight].to_numpy(dtype=float)
+        if exceptions is not None:
+            keep = ~data[score].isin(exceptions).to_numpy()
+            pf, wgt = pf[keep], wgt[keep]
+        tot, tot_perf = wgt.sum(), (pf * wgt).sum()
+        curve["cuml_good"] = (
+            curve["pct_file"] * tot - curve["cuml_perf"] * tot_perf
+        ) / (tot - tot_perf)
+    curve = pd.DataFrame(curve)
+    curve = curve[curve["pct_file"] <= depth + 1e-6]
+    origin = pd.DataFrame(0.0, index=[0], columns=curve.columns)
+    return pd.concat([origin, curve], ignore_index=True)
+
+
+# Data shared by the rendering worker processes, set once per worker.
+_render_data = None
+
+
+def _init_render_worker(data: pd.DataFrame):
+    global _render_data
+    _render_data = data
+
+
+def _render_page(
+    specs: List[Dict],
+    filename: str,
+    layout: Tuple[int, int],
+    figsize: Tuple[float, float],
+    dpi: int,
+    data: Optional[pd.DataFrame] = None,
+) -> str:
+    """
+    Render one or more gplot specs onto a single page, using the object
+    oriented matplotlib API so no pyplot state is touched. The data is
+    the worker's shared data unless given.
+    """
+    if data is None:
+        data = _render_data
+    nrows, ncols = layout
+    fig = Figure(figsize=(figsize[0] * ncols, figsize[1] * nrows), dpi=dpi)
+    axes = fig.subplots(nrows, ncols, squeeze=False).ravel()
+    for ax, spec in zip(axes, specs):
+        spec = dict(spec)
+        spec.pop("filename", None)
+        title = spec.pop("title", None)
+        query = spec.pop("query", None)
+        gplot(data if query is None else data.query(query), ax=ax, **spec)
+        if title is not None:
+            ax.set_title(title)
+    for ax in axes[len(specs) :]:
+        ax.set_visible(False)
+    fig.savefig(filename, bbox_inches="tight")
+    return filename
+
+
+def render_gplots(
+    data: pd.DataFrame,
+    specs: Iterable[Dict],
+    path: str = ".",
+    fmt: str = "png",
+    layout: Optional[Tuple[int, int]] = None,
+    n_jobs: Optional[int] = None,
+    figsize: Tuple[float, float] = (6.4, 4.8),
+    dpi: int = 100,
+) -> List[str]:
+    """
+    Render many gplots to files in parallel
+
+    Each chart is drawn with the matplotlib Agg and PDF canvases
+    directly, with no pyplot state, so charts can be rendered in a
+    process pool. The data is sent to each worker process once.
+
+    Parameters
+    ----------
+    data : pandas DataFrame.
+        A dataframe that contains the fields used by all the specs.
+
+    specs : iterable of dicts.
+        One dict per chart, holding the keyword arguments of `gplot`
+        (performance, score, ascending, exceptions, dof, weight). A spec
+        may also have the keys:
+            * `query` a pandas query string selecting the rows of data
+              to plot, for example a segment.
+            * `title` the title of the chart.
+            * `filename` the file name to write the chart to, used when
+              layout is None.
+
+    path : string, default ".".
+        The directory to write the files to. It is created if it does
+        not exist.
+
+    fmt : string {'png', 'pdf', 'svg'}, default "png".
+        The file format to write.
+
+    layout : tuple of (rows, cols) or None, default None.
+        If None each chart is written to its own file, otherwise the
+        charts are written rows x cols to a page, one file per page.
+
+    n_jobs : int or None, default None.
+        Number of worker processes. If None, the number of CPUs is used.
+        If 1, charts are rendered in the calling process.
+
+    figsize : tuple of floats, default (6.4, 4.8).
+        The size of each chart in inches.
+
+    dpi : int, default 100.
+        Resolution of raster formats.
+
+    Returns
+    -------
+    filenames: list of strings.
+        The paths of the files written, in the order of the specs or
+        pages.
+    """
+    specs = list(specs)
+    os.makedirs(path, exist_ok=True)
+    if layout is None:
+        layout = (1, 1)
+        pages = [[spec] for spec in specs]
+        names = [
+            spec.get("filename", f"gplot_{i:04d}.{fmt}") for i, spec in enumerate(specs)
+        ]
+    else:
+        per_page = layout[0] * layout[1]
+        pages = [specs[i : i + per_page] for i in range(0, len(specs), per_page)]
+        names = [f"gplot_page_{i:04d}.{fmt}" for i in range(len(pages))]
+    filenames = [os.path.join(path, name) for name in names]
+    args = [(page, fn, layout, figsize, dpi) for page, fn in zip(pages, filenames)]
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1 or len(pages) <= 1:
+        # Rendered in this process, which may be rendering other charts
+        # on other threads, so the data is passed rather than shared.
+        return [_render_page(*a, data=data) for a in args]
+    with ProcessPoolExecutor(
+        max_workers=min(n_jobs, len(pages)),
+        initializer=_init_render_worker,
+        initargs=(data,),
+    ) as pool:
+        return list(pool.map(_render_page, *zip(*args)))
@@ -0,0 +1,355 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+# Codes commonly used for special values, such as no record or not
+# applicable, in bureau and application data.
+_NINES = [10 ** d - 1 for d in range(2, 10)]
+EXCEPTION_CODES = sorted(
+    _NINES
+    + [v - i for v in _NINES if v > 99 for i in (1, 2, 3)]
+    + [-1, -9, -99, -999, -9999]
+)
+
+# Most bytes held at once while profiling a block of rows by columns.
+_BLOCK_BYTES = 512 * 2 ** 20
+# Bytes held per value of a block at its peak: the block itself, its
+# sorted copy, the masks of `_exact_distinct` and the missing mask.
+_BYTES_PER_VALUE = 20
+# Rows of a block reduced at a time, so other temporaries stay small.
+_CHUNK_ROWS = 2 ** 16
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """
+    Spread the bits of 64 bit keys, the finalizer of splitmix64.
+    """
+    x = x.astype(np.uint64, copy=True)
+    with np.errstate(over="ignore"):
+        x ^= x >> np.uint64(30)
+        x *= np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(27)
+        x *= np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    return x
+
+
+def _hll_update(registers: np.ndarray, hashes: np.ndarray, valid: np.ndarray, p: int = 12):
+    """
+    Add hashes to HyperLogLog registers, 2**p per column, held flat.
+    """
+    m = 1 << p
+    n_cols = hashes.shape[1]
+    bucket = (hashes >> np.uint64(64 - p)).astype(np.intp)
+    rest = (hashes << np.uint64(p)).astype(float)
+    # One more than the leading zero bits of the rest of the hash.
+    with np.errstate(divide="ignore"):
+        rank = np.where(rest > 0, 64 - np.floor(np.log2(rest)), 65 - p)
+    rank = np.minimum(rank, 65 - p).astype(np.uint8)
+    slot = bucket + np.arange(n_cols, dtype=np.intp) * m
+    np.maximum.at(registers, slot[valid], rank[valid])
+
+
+def _hll_estimate(registers: np.ndarray, p: int = 12) -> np.ndarray:
+    """
+    Distinct count estimate of each column from its registers.
+    """
+    m = 1 << p
+    registers = registers.reshape(-1, m)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    est = alpha * m * m / np.sum(2.0 ** -registers.astype(float), axis=1)
+    empty = (registers == 0).sum(axis=1)
+    with np.errstate(divide="ignore"):
+        small = m * np.log(m / np.maximum(empty, 1))
+    return np.round(np.where((est <= 2.5 * m) & (empty > 0), small, est))
+
+
+def _approx_distinct(hashes: np.ndarray, valid: np.ndarray, p: int = 12) -> np.ndarray:
+    """
+    HyperLogLog estimate of the distinct hashes in each column, using 2**p
+    registers per column, a relative error of about 1.04 / sqrt(2**p).
+    """
+    registers = np.zeros(hashes.shape[1] << p, dtype=np.uint8)
+    _hll_update(registers, hashes, valid, p)
+    return _hll_estimate(registers, p)
+
+
+def _exact_distinct(sorted_block: np.ndarray, n_valid: np.ndarray) -> np.ndarray:
+    """
+    Distinct values in each column of a block sorted down its columns,
+    with the missing values of each column at its end.
+    """
+    if sorted_block.shape[0] == 0:
+        return np.zeros(sorted_block.shape[1])
+    change = sorted_block[1:] != sorted_block[:-1]
+    inside = np.arange(1, sorted_block.shape[0])[:, None] < n_valid
+    return ((change & inside).sum(axis=0) + (n_valid > 0)).astype(float)
+
+
+def _sorted_quantiles(sorted_block, n_valid, q) -> np.ndarray:
+    """
+    Quantiles of each column of a sorted block, interpolated linearly as
+    in numpy.quantile. Rows are quantiles, columns are the columns.
+    """
+    pos = np.asarray(q)[:, None] * np.maximum(n_valid - 1, 0)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, np.maximum(n_valid - 1, 0))
+    if sorted_block.shape[0] == 0:
+        return np.full(pos.shape, np.nan)
+    lo_val = np.take_along_axis(sorted_block, lo, axis=0)
+    hi_val = np.take_along_axis(sorted_block, hi, axis=0)
+    res = lo_val + (pos - lo) * (hi_val - lo_val)
+    return np.where(n_valid > 0, res, np.nan)
+
+
+def _batches(columns: List[str], n_rows: int) -> Iterable[List[str]]:
+    size = max(1, _BLOCK_BYTES // max(_BYTES_PER_VALUE * n_rows, 1))
+    for i in range(0, len(columns), size):
+        yield columns[i : i + size]
+
+
+def _profile_numeric(block, quantiles, exact_limit, codes, min_share, rng, p=12):
+    """
+    Profile a block of numeric columns, one column per column of block.
+
+    The counts, moments, extremes and exception code hits are reduced in
+    one pass over chunks of rows. Only exact distinct counts and
+    quantiles need a sorted copy of the block.
+    """
+    n_rows, n_cols = block.shape
+    n_codes = codes.size
+    n_valid = np.zeros(n_cols, dtype=np.int64)
+    zeros = np.zeros(n_cols, dtype=np.int64)
+    mean = np.zeros(n_cols)
+    m2 = np.zeros(n_cols)
+    vmin = np.full(n_cols, np.inf)
+    vmax = np.full(n_cols, -np.inf)
+    # Hits of each code in each column, and the range of the other values.
+    hits = np.zeros(n_cols * n_codes, dtype=np.int64)
+    rest_n = np.zeros(n_cols, dtype=np.int64)
+    rest_min = np.full(n_cols, np.inf)
+    rest_max = np.full(n_cols, -np.inf)
+    code_offset = np.arange(n_cols) * n_codes
+    registers = None if n_rows <= exact_limit else np.zeros(n_cols << p, np.uint8)
+    for start in range(0, n_rows, _CHUNK_ROWS):
+        chunk = block[start : start + _CHUNK_ROWS]
+        valid = ~np.isnan(chunk)
+        n_chunk = valid.sum(axis=0)
+        # Mean and sum of squared deviations, merged across chunks.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            c_mean = np.sum(chunk, axis=0, where=valid) / n_chunk
+            c_m2 = np.sum((chunk - c_mean) ** 2, axis=0, where=valid)
+            total = n_valid + n_chunk
+            delta = np.where(n_chunk > 0, c_mean - mean, 0)
+            mean = np.where(n_chunk > 0, mean + delta * n_chunk / total, mean)
+            m2 = (
+                m2
+                + np.where(n_chunk > 0, c_m2, 0)
+                + delta ** 2 * n_valid * n_chunk / np.maximum(total, 1)
+            )
+        n_valid = total
+        zeros += (chunk == 0).sum(axis=0)
+        vmin = np.fmin(vmin, np.fmin.reduce(chunk, axis=0, initial=np.inf))
+        vmax = np.fmax(vmax, np.fmax.reduce(chunk, axis=0, initial=-np.inf))
+
+        is_code = np.isin(chunk, codes)
+        slot = np.searchsorted(codes, chunk) + code_offset
+        hits += np.bincount(slot[is_code], minlength=hits.size)
+        rest = valid & ~is_code
+        rest_n += rest.sum(axis=0)
+        rest_min = np.fmin(rest_min, np.min(chunk, axis=0, where=rest, initial=np.inf))
+        rest_max = np.fmax(rest_max, np.max(chunk, axis=0, where=rest, initial=-np.inf))
+        if registers is not None:
+            bits = np.where(chunk == 0, 0.0, chunk).view(np.uint64)
+            _hll_update(registers, _mix64(bits), valid, p)
+
+    has_valid = n_valid > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats = {
+            "Min": np.where(has_valid, vmin, np.nan),
+            "Max": np.where(has_valid, vmax, np.nan),
+            "Mean": np.where(has_valid, mean, np.nan),
+            "Std": np.sqrt(m2 / np.maximum(n_valid - 1, 0)),
+            "Zeros": zeros,
+        }
+
+    if registers is None:
+        srt = np.sort(block, axis=0)
+        stats["Distinct"] = _exact_distinct(srt, n_valid)
+        qvals = _sorted_quantiles(srt, n_valid, quantiles)
+        del srt
+    else:
+        stats["Distinct"] = _hll_estimate(registers, p)
+        rows = np.sort(rng.choice(n_rows, exact_limit, replace=False))
+        sample = block[rows]
+        sample.sort(axis=0)
+        qvals = _sorted_quantiles(sample, (~np.isnan(sample)).sum(axis=0), quantiles)
+    for q, vals in zip(quantiles, qvals):
+        stats[f"P{q * 100:g}"] = vals
+
+    # A special value code is a candidate exception if it is held by
+    # enough rows, sits outside the range of the other values, and is
+    # either well clear of them or holds far more rows than a typical
+    # value, so the top values of a plain 0 to 999 column are not codes.
+    # Rows are columns and columns are codes.
+    hits = hits.reshape(n_cols, n_codes)
+    has_rest = (rest_n > 0)[:, None]
+    rest_min = np.where(has_rest, rest_min[:, None], np.nan)
+    rest_max = np.where(has_rest, rest_max[:, None], np.nan)
+    typical = (n_valid / np.maximum(stats["Distinct"], 1))[:, None]
+    gap = np.fmax(codes - rest_max, rest_min - codes)
+    clear = (gap > 0.1 * (rest_max - rest_min)) | (hits > 5 * typical)
+    flag = (hits > 0) & (hits >= min_share * n_valid[:, None]) & (gap > 0) & clear
+    found = [
+        [int(c) if c.is_integer() else float(c) for c in codes[row]] for row in flag
+    ]
+    n_found = np.where(flag, hits, 0).sum(axis=1)
+    stats["Pct Exceptions"] = np.where(has_valid, n_found / np.maximum(n_valid, 1), 0.0)
+    return stats, found
+
+
+def _profile_other(data, columns, exact_limit):
+    """
+    Profile columns that are not numeric, from hashes of their values.
+    """
+    hashes = np.empty((data.shape[0], len(columns)), dtype=np.uint64)
+    valid = np.empty(hashes.shape, dtype=bool)
+    for j, col in enumerate(columns):
+        values = data[col]
+        valid[:, j] = values.notna().to_numpy()
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            hashes[:, j] = _mix64(values.cat.codes.to_numpy().astype(np.int64))
+        else:
+            hashes[:, j] = pd.util.hash_array(values.to_numpy(dtype=object))
+    n_valid = valid.sum(axis=0)
+    if data.shape[0] <= exact_limit:
+        # Missing values sort last, at the largest hash.
+        srt = np.sort(np.where(valid, hashes, np.iinfo(np.uint64).max), axis=0)
+        distinct = _exact_distinct(srt, n_valid)
+    else:
+        distinct = _approx_distinct(hashes, valid)
+    return {"Distinct": distinct}
+
+
+def profile(
+    data: pd.DataFrame,
+    columns: Optional[Iterable[str]] = None,
+    quantiles: Iterable[float] = (0.01, 0.25, 0.5, 0.75, 0.99),
+    exceptions: Optional[Iterable[float]] = None,
+    min_share: float = 0.001,
+    exact_limit: int = 1_000_000,
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Profile the columns of a DataFrame
+
+    Columns are grouped into blocks by type, and every statistic of a
+    block is computed in one vectorized pass over a two dimensional
+    array, rather than a pandas call per statistic per column. Numeric
+    and boolean columns get the missing count, distinct count, minimum,
+    maximum, mean, standard deviation, quantiles and count of zeros. Other
+    columns get the missing and distinct counts.
+
+    When there are more than `exact_limit` rows, distinct counts are
+    HyperLogLog estimates, with a relative error of about 1.6%, and
+    quantiles are those of a random sample of `exact_limit` rows. The
+    other statistics are always exact.
+
+    Special value codes, such as 9999 or -1, are flagged as exception
+    candidates for `cleancut` when they are held by at least `min_share`
+    of the non missing rows and lie outside the range of all other
+    values of the column.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+
+    columns: iterable of strings.
+        The columns to profile. Default is every column.
+
+    quantiles: iterable of floats in the range [0,1].
+        The quantiles reported, in columns named P1, P25 and so on.
+        Default is (0.01, 0.25, 0.5, 0.75, 0.99).
+
+    exceptions: iterable of numbers.
+        The special value codes to look for. Default is
+        `EXCEPTION_CODES`, runs of nines such as 99, 9999 and 9998, and
+        -1, -9, -99, -999 and -9999.
+
+    min_share: float.
+        The smallest share of the non missing rows a code must hold to
+        be flagged. Default is 0.001.
+
+    exact_limit: int.
+        The most rows for which distinct counts and quantiles are exact.
+        Default is 1,000,000.
+
+    seed: int.
+        Seed of the row sample used for quantiles of large data.
+
+    Returns
+    -------
+    summary: pandas DataFrame
+        One row per column, indexed by "Variable", ready for
+        `TableWriter.write_table`. The exception candidates of each
+        column are listed in the "Exception Candidates" column, and kept
+        as a dict of column name to codes in summary.attrs["exceptions"],
+        which can be passed to `screen`.
+
+    Examples
+    --------
+    >>> summary = sts.profile(df)
+    >>> summary.attrs["exceptions"]
+    {'months_since_delinq': [9999.0]}
+    >>> sts.screen(df, "bad", exceptions=summary.attrs["exceptions"])
+    """
+    columns = list(data.columns if columns is None else columns)
+    quantiles = [float(q) for q in quantiles]
+    assert all(0 <= q <= 1 for q in quantiles), "quantiles must be in range [0,1]"
+    codes = np.unique(
+        np.asarray(EXCEPTION_CODES if exceptions is None else list(exceptions), dtype=float)
+    )
+    rng = np.random.default_rng(seed)
+    n_rows = data.shape[0]
+
+    numeric = [
+        c
+        for c in columns
+        if pd.api.types.is_numeric_dtype(data[c])
+        and not isinstance(data[c].dtype, pd.CategoricalDtype)
+    ]
+    other = [c for c in columns if c not in numeric]
+
+    results: Dict[str, dict] = {}
+    found_codes: Dict[str, List[float]] = {}
+    for batch in _batches(numeric, n_rows):
+        block = data[batch].to_numpy(dtype=float, na_value=np.nan)
+        stats, found = _profile_numeric(
+            block, quantiles, exact_limit, codes, min_share, rng
+        )
+        for j, col in enumerate(batch):
+            results[col] = {name: vals[j] for name, vals in stats.items()}
+            results[col]["Exception Candidates"] = ", ".join(f"{c:g}" for c in found[j])
+            if found[j]:
+                found_codes[col] = found[j]
+    for batch in _batches(other, n_rows):
+        stats = _profile_other(data, batch, exact_limit)
+        for j, col in enumerate(batch):
+            results[col] = {name: vals[j] for name, vals in stats.items()}
+
+    summary = pd.DataFrame.from_dict(results, orient="index")
+    missing = data[columns].isna().sum().to_numpy()
+    summary = summary.reindex(columns)
+    summary.insert(0, "Type", [str(data[c].dtype) for c in columns])
+    summary.insert(1, "N", n_rows)
+    summary.insert(2, "Missing", missing)
+    summary.insert(3, "Pct Missing", missing / max(n_rows, 1))
+    q_cols = [f"P{q * 100:g}" for q in quantiles]
+    order = ["Type", "N", "Missing", "Pct Missing", "Distinct", "Min", "Max"]
+    order += ["Mean", "Std"] + q_cols + ["Zeros", "Exception Candidates"]
+    order += ["Pct Exceptions"]
+    summary = summary.reindex(columns=order)
+    summary["Exception Candidates"] = summary["Exception Candidates"].fillna("")
+    summary.index.name = "Variable"
+    summary.attrs["exceptions"] = found_codes
+    return summary
@@ -0,0 +1,184 @@
+import os
+import json
+import pandas as pd
+from typing import Dict, Optional, Tuple, Union, Any
+from .cleancut import cleancut
+from .excel import TableWriter
+from .plots import render_gplots
+from .smalltables import freq_tab, single_bivar, gains_table
+from .utils import break_methods
+from .utils.scheduler import TaskGraph
+
+BINNINGS = {
+    "cleancut": cleancut,
+    "bins": break_methods.bins,
+    "percentile": break_methods.percentile,
+    "breaks": break_methods.breaks,
+    "optimal": break_methods.optimal,
+}
+
+TABLES = {
+    "freq_tab": freq_tab,
+    "single_bivar": single_bivar,
+    "gains_table": gains_table,
+}
+
+
+def load_spec(path: str) -> Dict:
+    """
+    Read a report spec from a JSON or YAML file.
+    """
+    with open(path) as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required to read YAML report specs")
+        return yaml.safe_load(f)
+
+
+def _read_dataset(spec: Dict) -> pd.DataFrame:
+    read_args = spec.get("read_args", {})
+    if spec["path"].endswith(".parquet"):
+        return pd.read_parquet(spec["path"], **read_args)
+    return pd.read_csv(spec["path"], **read_args)
+
+
+def _bin_column(spec: Dict, data: pd.DataFrame) -> pd.Series:
+    args = dict(spec.get("args", {}))
+    if spec.get("method", "cleancut") == "optimal":
+        args["y"] = data[args["y"]]
+    return BINNINGS[spec.get("method", "cleancut")](data[spec["column"]], **args)
+
+
+def _make_table(spec: Dict, data: pd.DataFrame, *binned: pd.Series) -> pd.DataFrame:
+    """
+    Build a table, adding the shared binned columns to a shallow copy of
+    the dataset under their binning names.
+    """
+    if binned:
+        data = data.copy(deep=False)
+        for name, col in zip(spec.get("binnings", []), binned):
+            data[name] = col
+    return TABLES[spec["kind"]](data=data, **spec.get("args", {}))
+
+
+def build_graph(spec: Dict, output: Optional[str] = None) -> TaskGraph:
+    """
+    Build the task graph of a report spec.
+
+    Every dataset, binning, table and chart is a task, and writing the
+    workbook is a final task that depends on all tables. A binning is
+    computed once and shared by every table that uses it.
+    """
+    graph = TaskGraph()
+    for name, ds in spec.get("datasets", {}).items():
+        graph.add(f"dataset:{name}", lambda ds=ds: _read_dataset(ds))
+    for name, bn in spec.get("binnings", {}).items():
+        graph.add(
+            f"binning:{name}",
+            lambda data, bn=bn: _bin_column(bn, data),
+            [f"dataset:{bn['dataset']}"],
+        )
+    for name, tb in spec.get("tables", {}).items():
+        graph.add(
+            f"table:{name}",
+            lambda data, *binned, tb=tb: _make_table(tb, data, *binned),
+            [f"dataset:{tb['dataset']}"]
+            + [f"binning:{b}" for b in tb.get("binnings", [])],
+        )
+    for name, ch in spec.get("charts", {}).items():
+        path = ch.get("path", f"{name}.png")
+        graph.add(
+            f"chart:{name}",
+            lambda data, ch=ch, path=path: render_gplots(
+                data,
+                [dict(ch.get("args", {}), filename=os.path.basename(path))],
+                path=os.path.dirname(path) or ".",
+                n_jobs=1,
+            )[0],
+            [f"dataset:{ch['dataset']}"],
+        )
+
+    output = spec.get("output") if output is None else output
+    if output is not None or spec.get("sheets"):
+        assert output is not None, "An output file is required to write sheets"
+        sheets = spec.get("sheets", {})
+        entries = [
+            (sheet, item if isinstance(item, dict) else {"table": item})
+            for sheet, items in sheets.items()
+            for item in items
+        ]
+        deps = [f"table:{e['table']}" for _, e in entries]
+
+        def write(*tables):
+            wb = TableWriter(
+                output, overwrite=True, backend=spec.get("backend", "xlsxwriter")
+            )
+            for (sheet, entry), tbl in zip(entries, tables):
+                kwargs = {k: v for k, v in entry.items() if k != "table"}
+                wb.write_table(tbl, sheetname=sheet, **kwargs)
+            wb.close()
+            return output
+
+        graph.add("write", write, deps)
+    return graph
+
+
+def run_report(
+    spec: Union[str, Dict], output: Optional[str] = None, workers: Optional[int] = None
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run a report spec
+
+    The spec is a dict, or a path to a JSON or YAML file, with the
+    sections below. Independent tasks run concurrently on a pool of
+    worker threads, and the time of every task is logged to the
+    "scoretools" logger.
+
+    datasets: {name: {path, read_args}}
+        Files read with pandas read_csv, or read_parquet for .parquet.
+    binnings: {name: {dataset, column, method, args}}
+        A column binned with one of cleancut, bins, percentile, breaks
+        or optimal. For optimal, args["y"] names the performance field.
+    tables: {name: {dataset, kind, binnings, args}}
+        A freq_tab, single_bivar or gains_table. The binnings listed are
+        added to the dataset as columns named after the binning, so args
+        can refer to them.
+    charts: {name: {dataset, path, args}}
+        A gplot written to path, args are the gplot arguments. Each
+        chart is its own task, rendered in its worker thread with
+        render_gplots and n_jobs=1, so charts run alongside each other
+        and the tables rather than in a separate process pool.
+    sheets: {sheetname: [table name, or dict of table and write_table args]}
+        The tables written to each worksheet, in order.
+    output, backend, workers:
+        The file written with TableWriter, its backend, and the number
+        of worker threads. An output is required when there are sheets.
+
+    Parameters
+    ----------
+    spec: dict or str.
+
+    output: str.
+        Overrides the output of the spec.
+
+    workers: int.
+        Overrides the workers of the spec.
+
+    Returns
+    -------
+    results: dict
+        The result of every task, keyed by task name, for example
+        "table:scr1_bivar".
+
+    timings: dict
+        The seconds taken by every task, keyed by task name.
+    """
+    if isinstance(spec, str):
+        spec = load_spec(spec)
+    graph = build_graph(spec, output=output)
+    workers = spec.get("workers") if workers is None else workers
+    results = graph.run(max_workers=workers)
+    return results, graph.timings
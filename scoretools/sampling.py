@@ -0,0 +1,301 @@
+import time
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Callable, Iterable, Optional, Union
+from .plots import calc_ks, gains_curve
+from .smalltables import single_bivar, gains_table
+from .utils import coerce_to_iterable
+
+_WEIGHT = "_sample_weight"
+
+
+def _allocate(sizes: np.ndarray, n: int) -> np.ndarray:
+    """
+    Split a sample of n rows equally across strata, giving rows a small
+    stratum can not use to the others.
+    """
+    alloc = np.zeros(sizes.size, dtype=np.int64)
+    left = min(n, sizes.sum())
+    while left > 0:
+        open_ = alloc < sizes
+        share = max(left // open_.sum(), 1)
+        add = np.where(open_, np.minimum(share, sizes - alloc), 0)
+        # Trim the last strata so no more than the rows left are added.
+        add = np.clip(np.minimum(add, left - (np.cumsum(add) - add)), 0, None)
+        alloc += add
+        left -= add.sum()
+    return alloc
+
+
+class Estimate:
+    """
+    A metric or table estimated from a sample
+
+    Attributes
+    ----------
+    value: float or pandas DataFrame
+        The estimate, computed with the sample weights.
+
+    se: float or pandas DataFrame
+        The standard error of the estimate, from bootstrap replicates.
+
+    lower, upper: float or pandas DataFrame
+        The normal confidence interval of the estimate.
+
+    n: int
+        The number of sampled rows.
+
+    seconds: float
+        The time taken by the final sample.
+    """
+
+    def __init__(self, value, se, confidence: float, n: int, seconds: float):
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.value = value
+        self.se = se
+        self.lower = value - z * se
+        self.upper = value + z * se
+        self.confidence = confidence
+        self.n = n
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        if np.isscalar(self.value):
+            return (
+                f"Estimate(value={self.value:.6g}, se={self.se:.3g}, "
+                f"{self.confidence:.0%} CI=({self.lower:.6g}, {self.upper:.6g}), "
+                f"n={self.n})"
+            )
+        return f"Estimate(table={self.value.shape}, n={self.n})"
+
+
+class SampleEstimator:
+    """
+    Estimate tables and metrics from a stratified sample
+
+    Rows are stratified by the performance field and, optionally, segment
+    fields, and an equal number of rows is drawn from each stratum, so
+    rare bads are well represented. Each sampled row carries an inverse
+    probability weight, the stratum size over its sample size, and
+    metrics are computed on the sample with the existing weighted
+    functions. Standard errors come from Poisson bootstrap replicates of
+    the sample weights.
+
+    Samples are nested, a larger sample adds rows to a smaller one, so
+    the sample can grow until a time or accuracy budget is met.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+        The full data.
+
+    performance: string.
+        The name of the performance field to stratify on.
+
+    strata: string or iterable of strings.
+        Names of additional segment fields to stratify on.
+
+    weight: string.
+        The name of a frequency weight field in data, multiplied into the
+        sample weights.
+
+    replicates: int.
+        The number of bootstrap replicates used for standard errors.
+        Default is 50.
+
+    confidence: float.
+        The confidence level of the intervals. Default is 0.95.
+
+    seed: int.
+        Seed of the random sample and replicates.
+
+    Examples
+    --------
+    >>> est = sts.SampleEstimator(df, "bad", strata="segment", seed=1)
+    >>> est.ks("scr", ascending=True, target_se=0.002)
+    >>> est.bivar("scr_bin", time_budget=10).value
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        performance: str,
+        strata: Optional[Union[str, Iterable[str]]] = None,
+        weight: Optional[str] = None,
+        replicates: int = 50,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+    ):
+        assert 0 < confidence < 1, "confidence must be in (0, 1)"
+        self.data = data
+        self.performance = performance
+        self.weight = weight
+        self.replicates = replicates
+        self.confidence = confidence
+        self._rng = np.random.default_rng(seed)
+        keys = [performance] + (
+            [] if strata is None else list(coerce_to_iterable(strata))
+        )
+        codes = data.groupby(keys, dropna=False, sort=True).ngroup().to_numpy()
+        # Rows of each stratum in a random order. A sample of k rows from a
+        # stratum is its first k rows, so samples are nested.
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        self._strata = [self._rng.permutation(s) for s in np.split(order, bounds)]
+        self._sizes = np.array([s.size for s in self._strata])
+
+    @property
+    def n_rows(self) -> int:
+        return int(self._sizes.sum())
+
+    def sample(self, n: int) -> pd.DataFrame:
+        """
+        A stratified sample of about n rows, with its inverse probability
+        weights in the column "_sample_weight".
+        """
+        alloc = _allocate(self._sizes, n)
+        pos = np.concatenate([s[:k] for s, k in zip(self._strata, alloc)])
+        ipw = np.repeat(self._sizes / np.maximum(alloc, 1), alloc).astype(float)
+        sample = self.data.iloc[pos].copy()
+        if self.weight is not None:
+            ipw = ipw * sample[self.weight].to_numpy(dtype=float)
+        sample[_WEIGHT] = ipw
+        return sample
+
+    def _run(self, func: Callable, n: int) -> Estimate:
+        start = time.perf_counter()
+        sample = self.sample(n)
+        ipw = sample[_WEIGHT].to_numpy()
+        value = func(sample, _WEIGHT)
+        reps = []
+        for _ in range(self.replicates):
+            sample[_WEIGHT] = ipw * self._rng.poisson(1.0, ipw.size)
+            rep = func(sample, _WEIGHT)
+            if isinstance(value, pd.DataFrame):
+                rep = rep.reindex(index=value.index, columns=value.columns)
+                rep = rep.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+            reps.append(rep)
+        if isinstance(value, pd.DataFrame):
+            se = pd.DataFrame(
+                np.nanstd(np.stack(reps), axis=0, ddof=1),
+                index=value.index,
+                columns=value.columns,
+            )
+        else:
+            se = float(np.std(reps, ddof=1))
+        return Estimate(
+            value, se, self.confidence, sample.shape[0], time.perf_counter() - start
+        )
+
+    def estimate(
+        self,
+        func: Callable,
+        sample_size: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        target_se: Optional[float] = None,
+        initial_size: int = 20_000,
+        max_rounds: int = 5,
+    ) -> Estimate:
+        """
+        Estimate a metric or table within a budget.
+
+        Parameters
+        ----------
+        func: callable.
+            Called as func(sample, weight) where weight is the name of
+            the sample weight field, returning a float or a DataFrame.
+
+        sample_size: int.
+            A fixed number of rows to sample.
+
+        time_budget: float.
+            Seconds to spend. A pilot sample times the metric, and the
+            sample is then grown to the size expected to fill the budget.
+
+        target_se: float.
+            The largest standard error accepted, the largest over all
+            cells for a table. The sample grows until it is met, or the
+            whole data is used.
+
+        initial_size: int.
+            Rows in the pilot sample. Default is 20,000.
+
+        max_rounds: int.
+            The most samples drawn for a target_se. Default is 5.
+
+        Returns
+        -------
+        estimate: Estimate
+        """
+        assert (
+            sum(b is not None for b in (sample_size, time_budget, target_se)) == 1
+        ), "Specify one of sample_size, time_budget or target_se"
+        if sample_size is not None:
+            return self._run(func, sample_size)
+
+        n = min(initial_size, self.n_rows)
+        result = self._run(func, n)
+        if time_budget is not None:
+            per_row = result.seconds / result.n
+            n_next = int(0.8 * (time_budget - result.seconds) / per_row)
+            if n_next > n:
+                result = self._run(func, min(n_next, self.n_rows))
+            return result
+
+        for _ in range(max_rounds - 1):
+            se = np.nanmax(np.asarray(result.se, dtype=float))
+            if se <= target_se or result.n >= self.n_rows:
+                break
+            # Standard errors shrink with the square root of the sample.
+            n = int(result.n * 1.1 * (se / target_se) ** 2)
+            result = self._run(func, min(n, self.n_rows))
+        return result
+
+    def ks(self, score: str, ascending: bool = True, **budget) -> Estimate:
+        """
+        Estimate the KS of a score, see `calc_ks`. Budget arguments are
+        those of `estimate`.
+        """
+        return self.estimate(
+            lambda d, w: calc_ks(d, self.performance, score, ascending, weight=w),
+            **budget,
+        )
+
+    def bivar(self, main_var: str, **budget) -> Estimate:
+        """
+        Estimate a `single_bivar` of the performance along main_var.
+        """
+        return self.estimate(
+            lambda d, w: single_bivar(d, main_var, self.performance, weight=w),
+            **budget,
+        )
+
+    def gains(self, score: str, ascending: bool = True, groups: int = 10, **budget):
+        """
+        Estimate a `gains_table` of a score.
+        """
+        return self.estimate(
+            lambda d, w: gains_table(
+                d, self.performance, score, ascending, groups=groups, weight=w
+            ),
+            **budget,
+        )
+
+    def curve(
+        self, score: str, ascending: bool = True, points: int = 100, **budget
+    ) -> Estimate:
+        """
+        Estimate the gains curve of a score at `points` depths of file,
+        with confidence bands, see `gplot`.
+        """
+        grid = np.linspace(0, 1, points + 1)
+
+        def func(d, w):
+            curve = gains_curve(
+                d, self.performance, score, ascending, weight=w, points=points
+            )
+            cuml = np.interp(grid, curve["pct_file"], curve["cuml_perf"])
+            return pd.DataFrame({"cuml_perf": cuml}, index=pd.Index(grid, name="pct_file"))
+
+        return self.estimate(func, **budget)
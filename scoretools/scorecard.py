@@ -0,0 +1,409 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .cleancut import _make_labels
+
+
+class _Numeric:
+    """
+    Points of a numeric characteristic binned at fixed edges.
+    """
+
+    def __init__(self, name, edges, points, exceptions, missing, digits):
+        self.name = name
+        self.edges = np.asarray(edges, dtype=float)
+        self.points = np.asarray(points, dtype=float)
+        assert self.edges.size >= 2 and (np.diff(self.edges) > 0).all(), (
+            f"edges of {name} must be at least two increasing values"
+        )
+        assert self.points.size == self.edges.size - 1, (
+            f"{name} needs one point value per bin, {self.edges.size - 1}"
+        )
+        exceptions = {} if exceptions is None else dict(exceptions)
+        self.exc_values = np.asarray(sorted(exceptions), dtype=float)
+        self.exc_points = np.asarray(
+            [exceptions[v] for v in sorted(exceptions)], dtype=float
+        )
+        self.missing = float(missing)
+        self.digits = digits
+
+    def apply(self, values) -> np.ndarray:
+        x = np.asarray(values, dtype=float)
+        # Bins hold (edge, next edge], as in cleancut, and values outside
+        # the edges fall in the first or last bin.
+        idx = np.searchsorted(self.edges, x, side="left") - 1
+        pts = self.points[np.clip(idx, 0, self.points.size - 1)]
+        if self.exc_values.size:
+            pos = np.clip(np.searchsorted(self.exc_values, x), 0, self.exc_values.size - 1)
+            is_exc = self.exc_values[pos] == x
+            pts = np.where(is_exc, self.exc_points[pos], pts)
+        return np.where(np.isnan(x), self.missing, pts)
+
+    def rows(self) -> List[Tuple]:
+        labels = _make_labels(self.edges, self.digits)
+        rows = [(self.name, lab, p) for lab, p in zip(labels, self.points)]
+        rows += [(self.name, f"{v:g}", p) for v, p in zip(self.exc_values, self.exc_points)]
+        return rows + [(self.name, "Missing", self.missing)]
+
+    def all_points(self) -> np.ndarray:
+        return np.concatenate([self.points, self.exc_points, [self.missing]])
+
+
+class _Levels:
+    """
+    Points of a categorical characteristic by level.
+    """
+
+    def __init__(self, name, points, missing, other):
+        self.name = name
+        self.levels = pd.Index(list(points))
+        self.points = np.asarray(list(points.values()), dtype=float)
+        self.missing = float(missing)
+        self.other = float(other)
+
+    def apply(self, values) -> np.ndarray:
+        values = pd.Series(values) if not isinstance(values, pd.Series) else values
+        lookup = np.append(self.points, self.other)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Only the categories are looked up, then indexed by code.
+            pos = self.levels.get_indexer(values.cat.categories)
+            lookup = lookup[np.where(pos < 0, self.points.size, pos)]
+            pos = values.cat.codes.to_numpy()
+        else:
+            pos = self.levels.get_indexer(values)
+            pos = np.where(pos < 0, self.points.size, pos)
+        pts = lookup[np.clip(pos, 0, None)]
+        return np.where(values.isna().to_numpy(), self.missing, pts)
+
+    def rows(self) -> List[Tuple]:
+        rows = [(self.name, str(lev), p) for lev, p in zip(self.levels, self.points)]
+        return rows + [(self.name, "Other", self.other), (self.name, "Missing", self.missing)]
+
+    def all_points(self) -> np.ndarray:
+        return np.concatenate([self.points, [self.other, self.missing]])
+
+
+class Scorecard:
+    """
+    A points based scorecard
+
+    Each characteristic is binned, numeric characteristics at fixed bin
+    edges with `cleancut` semantics, categorical ones by level, and each
+    bin is worth a number of points. The score of a record is the sum of
+    its points and `base_points`, optionally rescaled. Bins are looked up
+    with vectorized searchsorted, so records are scored a chunk at a time
+    without a Python loop over rows, and files are scored as a stream of
+    chunks with `score_file`.
+
+    Parameters
+    ----------
+    base_points: float.
+        Points every record starts with. Default is 0.
+
+    scale: str {'range', 'odds'} or None.
+        How the total points are turned into a score.
+            * If None the score is the total points.
+            * If `range` the lowest and highest total points the
+              scorecard can give are mapped linearly onto `score_range`,
+              as `scale_dat` does, but fixed by the scorecard rather than
+              by the data, so every chunk is scaled the same.
+            * If `odds` the total points are taken as the log odds of a
+              good, and scaled so `base_odds` scores `base_score` and
+              doubling the odds adds `pdo` points.
+        Default is None.
+
+    score_range: tuple of two numbers.
+        The lowest and highest score, for scale="range". Default is
+        (300, 999).
+
+    base_score, base_odds, pdo: floats.
+        The scaling for scale="odds". Default is 600 at odds of 50, with
+        20 points to double the odds.
+
+    digits: int.
+        Digits the score is rounded to, integer scores if zero. Only used
+        when the score is scaled. Default is 0.
+
+    Examples
+    --------
+    >>> sc = sts.Scorecard(scale="range", score_range=(300, 850))
+    >>> sc.add("age", sts.cut_edges(df["age"], 5), [-10, 0, 5, 10, 20])
+    >>> sc.add("util", [0, 30, 60, 100], [25, 10, -15], exceptions={9999: 0})
+    >>> sc.add_levels("grade", {"A": 30, "B": 15, "C": 0}, other=-10)
+    >>> df["score"] = sc.score(df)
+    >>> sc.score_file("applications.csv", "scored.csv", id_cols=["app_id"])
+    """
+
+    def __init__(
+        self,
+        base_points: float = 0.0,
+        scale: Optional[str] = None,
+        score_range: Tuple[float, float] = (300, 999),
+        base_score: float = 600.0,
+        base_odds: float = 50.0,
+        pdo: float = 20.0,
+        digits: int = 0,
+    ):
+        assert scale in (None, "range", "odds"), "scale must be None, 'range' or 'odds'"
+        self.base_points = base_points
+        self.scale = scale
+        self.score_range = score_range
+        self.base_score = base_score
+        self.base_odds = base_odds
+        self.pdo = pdo
+        self.digits = digits
+        self._characteristics: Dict[str, object] = {}
+
+    @property
+    def characteristics(self) -> List[str]:
+        return list(self._characteristics)
+
+    def add(
+        self,
+        name: str,
+        edges: Iterable[float],
+        points: Iterable[float],
+        exceptions: Optional[Dict[float, float]] = None,
+        missing: float = 0.0,
+        digits: int = 0,
+    ):
+        """
+        Add a numeric characteristic.
+
+        Parameters
+        ----------
+        name: str.
+            The name of the column.
+
+        edges: iterable of floats.
+            Increasing bin edges, for example from `cut_edges`. A bin
+            holds the values above one edge up to and including the next,
+            and the first bin includes the lowest edge. Values outside
+            the edges are given the points of the first or last bin.
+
+        points: iterable of floats.
+            The points of each bin, one fewer than the edges.
+
+        exceptions: dict.
+            Points of exception values held out of the bins, as with the
+            `exceptions` of `cleancut`.
+
+        missing: float.
+            Points of a missing value. Default is 0.
+
+        digits: int.
+            Digits of the bin labels in `table`, as in `cleancut`.
+        """
+        self._characteristics[name] = _Numeric(
+            name, edges, points, exceptions, missing, digits
+        )
+        return self
+
+    def add_levels(
+        self,
+        name: str,
+        points: Dict,
+        missing: float = 0.0,
+        other: float = 0.0,
+    ):
+        """
+        Add a categorical characteristic.
+
+        Parameters
+        ----------
+        name: str.
+            The name of the column.
+
+        points: dict.
+            The points of each level.
+
+        missing: float.
+            Points of a missing value. Default is 0.
+
+        other: float.
+            Points of a level not in `points`. Default is 0.
+        """
+        self._characteristics[name] = _Levels(name, points, missing, other)
+        return self
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """
+        The points of every bin, ready for `TableWriter.write_table`.
+        """
+        rows = [row for char in self._characteristics.values() for row in char.rows()]
+        return pd.DataFrame(rows, columns=["Characteristic", "Bin", "Points"]).set_index(
+            ["Characteristic", "Bin"]
+        )
+
+    def _points_range(self) -> Tuple[float, float]:
+        pts = [char.all_points() for char in self._characteristics.values()]
+        low = self.base_points + sum(p.min() for p in pts)
+        high = self.base_points + sum(p.max() for p in pts)
+        return low, high
+
+    def points(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        The points each record gets from each characteristic, for
+        example to find reason codes.
+        """
+        return pd.DataFrame(
+            {name: char.apply(data[name]) for name, char in self._characteristics.items()},
+            index=data.index,
+        )
+
+    def score(self, data: pd.DataFrame) -> pd.Series:
+        """
+        Score the records of a DataFrame.
+        """
+        assert self._characteristics, "The scorecard has no characteristics"
+        total = np.full(data.shape[0], float(self.base_points))
+        for name, char in self._characteristics.items():
+            total += char.apply(data[name])
+        return pd.Series(self._scale(total), index=data.index, name="score")
+
+    def _scale(self, total: np.ndarray) -> np.ndarray:
+        if self.scale is None:
+            return total
+        if self.scale == "range":
+            low, high = self._points_range()
+            vmin, vmax = self.score_range
+            span = high - low if high > low else 1.0
+            scr = (total - low) / span * (vmax - vmin) + vmin
+        else:
+            factor = self.pdo / np.log(2)
+            scr = self.base_score + factor * (total - np.log(self.base_odds))
+        scr = np.around(scr, decimals=self.digits)
+        return scr.astype(int) if self.digits == 0 else scr
+
+    def score_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        id_cols: Optional[Iterable[str]] = None,
+        score_name: str = "score",
+        keep_points: bool = False,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Score an iterable of DataFrame chunks, yielding one scored chunk
+        at a time.
+
+        Parameters
+        ----------
+        chunks: iterable of pandas DataFrame.
+
+        id_cols: iterable of str.
+            Columns passed through to the output, such as record ids.
+            Default is None, every column of the chunk is kept.
+
+        score_name: str.
+            The name of the score column. Default is "score".
+
+        keep_points: bool.
+            Also output the points of each characteristic, in columns
+            named "<characteristic>_points". Default is False.
+        """
+        for chunk in chunks:
+            out = chunk if id_cols is None else chunk[list(id_cols)]
+            out = out.copy()
+            if keep_points:
+                pts = self.points(chunk).add_suffix("_points")
+                out[pts.columns] = pts
+            out[score_name] = self.score(chunk)
+            yield out
+
+    def score_file(
+        self,
+        path: str,
+        out_path: str,
+        id_cols: Optional[Iterable[str]] = None,
+        chunksize: int = 1_000_000,
+        score_name: str = "score",
+        keep_points: bool = False,
+        **read_args,
+    ) -> int:
+        """
+        Score a CSV or Parquet file in chunks, streaming the scored
+        records to a CSV or Parquet file, so the whole file is never
+        held in memory.
+
+        Only the characteristic and id columns are read. Parquet files
+        are read and written by row group with pyarrow, which must be
+        installed for them.
+
+        Parameters
+        ----------
+        path: str.
+            The file to score, read as Parquet if it ends in .parquet,
+            and otherwise with pandas read_csv.
+
+        out_path: str.
+            The file to write, Parquet if it ends in .parquet, otherwise
+            CSV.
+
+        id_cols: iterable of str.
+            Columns passed through to the output. Default is None, only
+            the score is written.
+
+        chunksize: int.
+            Rows read at a time. Default is 1,000,000.
+
+        score_name, keep_points:
+            See `score_chunks`.
+
+        **read_args:
+            Other arguments passed to read_csv, for example sep.
+
+        Returns
+        -------
+        rows: int
+            The number of records scored.
+        """
+        id_cols = [] if id_cols is None else list(id_cols)
+        usecols = id_cols + [c for c in self._characteristics if c not in id_cols]
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            source = pq.ParquetFile(path)
+            chunks = (
+                batch.to_pandas()
+                for batch in source.iter_batches(batch_size=chunksize, columns=usecols)
+            )
+        else:
+            # Levels keyed by strings are read as categories, so each is
+            # looked up once. Other levels, for example numeric codes, are
+            # read as read_csv infers them, as the category values would
+            # be strings that never match their keys.
+            dtype = {
+                name: "category"
+                for name, char in self._characteristics.items()
+                if isinstance(char, _Levels)
+                and all(isinstance(lev, str) for lev in char.levels)
+            }
+            dtype.update(read_args.pop("dtype", {}))
+            chunks = pd.read_csv(
+                path, usecols=usecols, chunksize=chunksize, dtype=dtype, **read_args
+            )
+        scored = self.score_chunks(chunks, id_cols, score_name, keep_points)
+
+        rows = 0
+        if out_path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            writer = None
+            try:
+                for out in scored:
+                    tbl = pa.Table.from_pandas(out, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(out_path, tbl.schema)
+                    writer.write_table(tbl)
+                    rows += out.shape[0]
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(out_path, "w", newline="") as f:
+                for out in scored:
+                    out.to_csv(f, header=rows == 0, index=False)
+                    rows += out.shape[0]
+        return rows
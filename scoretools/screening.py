@@ -0,0 +1,253 @@
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from .cleancut import cleancut, cut_edges
+from .utils import get_weight
+from .utils.codes import BinnedCodes
+
+logger = logging.getLogger("scoretools")
+
+
+def _column_codes(
+    variable, bins, exceptions, missing, cut_args, weight=None
+) -> BinnedCodes:
+    """
+    Bin a numeric column with `cleancut`, or take the levels of any other
+    column, as compact codes with missing values in their own level. The
+    quantiles of an integer bins are weighted by weight, if given.
+    """
+    if pd.api.types.is_numeric_dtype(variable) and not pd.api.types.is_bool_dtype(
+        variable
+    ):
+        if isinstance(bins, int) and weight is not None:
+            edge_args = {
+                k: v
+                for k, v in cut_args.items()
+                if k in ("digits", "clean_cuts", "cuts_divisor", "cuts_threshold")
+            }
+            bins = cut_edges(variable, bins, exceptions, weight=weight, **edge_args)
+            cut_args = dict(cut_args, clean_cuts=False)
+        return cleancut(
+            variable, bins, exceptions=exceptions, missing=missing, codes=True, **cut_args
+        )
+    binned = BinnedCodes.from_series(variable.astype("category"))
+    if missing is not None and (binned.codes < 0).any():
+        nlev = len(binned.categories)
+        binned = BinnedCodes(
+            np.where(binned.codes < 0, nlev, binned.codes),
+            binned.categories.append(pd.Index([missing])),
+            name=binned.name,
+            ordered=False,
+        )
+    return binned
+
+
+def _woe_table(
+    binned: BinnedCodes,
+    wgt: np.ndarray,
+    bad_wgt: np.ndarray,
+    performance: str,
+    missing: Optional[str],
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """
+    The WOE detail table and IV, KS and Gini of one binned column, from
+    bincounts of its codes. KS and Gini are those of the column scored by
+    its WOE, so they do not depend on the order of the bins.
+    """
+    n = binned.counts(wgt)
+    bd = binned.counts(bad_wgt)
+    labels = binned.categories
+    n_missing = n[labels == missing].sum() if missing is not None else 0
+    keep = n > 0
+    if not keep.any():
+        raise ValueError("no rows fall in any bin")
+    n, bd, labels = n[keep], bd[keep], labels[keep]
+    gd = n - bd
+    tot_n, tot_gd, tot_bd = n.sum(), gd.sum(), bd.sum()
+    pct_gd = gd / tot_gd
+    pct_bd = bd / tot_bd
+    # A half count is added to every cell so empty cells have a finite WOE.
+    adj_gd = (gd + 0.5) / tot_gd
+    adj_bd = (bd + 0.5) / tot_bd
+    woe = np.log(adj_gd / adj_bd)
+    iv = (adj_gd - adj_bd) * woe
+
+    order = np.argsort(woe, kind="stable")
+    cuml_gd = np.cumsum(pct_gd[order])
+    cuml_bd = np.cumsum(pct_bd[order])
+    ks = np.abs(cuml_bd - cuml_gd).max()
+    # Chance a bad is ranked ahead of a good, with ties in a bin split evenly.
+    auc = (pct_bd[order] * (1 - cuml_gd + 0.5 * pct_gd[order])).sum()
+
+    detail = pd.DataFrame(
+        {
+            "N": n,
+            "Pct N": n / tot_n,
+            f"{performance} sum": bd,
+            f"{performance} Rate": bd / n,
+            "Pct Good": pct_gd,
+            "Pct Bad": pct_bd,
+            "WOE": woe,
+            "IV": iv,
+        },
+        index=pd.Index(labels, name=binned.name),
+    )
+    total = detail.sum().to_frame().T.rename(index={0: "Total"})
+    total[f"{performance} Rate"] = tot_bd / tot_n
+    total["WOE"] = np.nan
+    detail = pd.concat([detail, total])
+    detail.index.name = binned.name
+
+    stats = {
+        "Bins": int(keep.sum()),
+        "IV": iv.sum(),
+        "KS": ks,
+        "Gini": 2 * auc - 1,
+        "Pct Missing": n_missing / tot_n,
+    }
+    return detail, stats
+
+
+def screen(
+    data: pd.DataFrame,
+    performance: str,
+    columns: Optional[Iterable[str]] = None,
+    bins: Union[int, Dict[str, Iterable[float]]] = 10,
+    exceptions: Optional[Union[List, Dict[str, List]]] = None,
+    missing: Optional[str] = "Missing",
+    weight=None,
+    rank_by: str = "IV",
+    n_jobs: Optional[int] = None,
+    **kwargs,
+) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Screen many characteristics against a performance flag
+
+    Every column is binned once with `cleancut`, as compact integer
+    codes, and the counts and bads of each bin are tallied with
+    bincount. The WOE of each bin, and the information value, KS and Gini
+    of each column, are computed from those counts. Columns are screened
+    on a pool of worker threads, which share the frame without copying
+    it. Only the numpy partition and searchsorted calls of the binning,
+    a little under half the time of a numeric column, run without the
+    GIL, so threads speed screening up by less than two times.
+
+    Columns that are not numeric are not binned, each level is a bin.
+    Rows with a missing performance value are left out of the counts.
+    Columns that can not be screened, for example constant columns, are
+    logged and listed last in the summary with the error, and have no
+    detail table.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+        A DataFrame that contains the characteristics and performance
+        field.
+
+    performance: string.
+        The name of the performance field. This should be a binary
+        variable where 1 is a bad.
+
+    columns: iterable of strings.
+        The characteristics to screen. Default is every column other
+        than the performance and weight fields.
+
+    bins: int, iterable of floats, or dict.
+        The `bins` argument of `cleancut`, or a dict of column name to
+        `bins` for columns that should not use the default of 10. With a
+        weight, the quantiles of an integer bins are weighted.
+
+    exceptions: list or dict.
+        Exception values held out of the binning of every column, or a
+        dict of column name to exception values.
+
+    missing: str or None.
+        The label of missing values. If None missing values are left out.
+        Default is "Missing".
+
+    weight: string, or pandas Series.
+        The name of a frequency weight field in data, or a Series aligned
+        with data. If None, each row has a weight of one.
+
+    rank_by: string {'IV', 'KS', 'Gini'}.
+        The statistic the summary is ranked on. Default is "IV".
+
+    n_jobs: int or None.
+        Number of worker threads. If 1, columns are screened one after
+        another.
+
+    **kwargs:
+        Additional arguments passed to `cleancut`, for example digits.
+
+    Returns
+    -------
+    summary: pandas DataFrame
+        The bins, IV, KS, Gini and missing share of each column, ranked
+        best first, and the error of any column that could not be
+        screened.
+
+    details: dict of pandas DataFrame
+        The WOE table of each column, keyed by column name, in the order
+        of the summary. Both can be written with TableWriter.
+
+    Examples
+    --------
+    >>> summary, details = sts.screen(df, "bad", exceptions=[9999], n_jobs=8)
+    >>> tw = sts.TableWriter("screening.xlsx")
+    >>> tw.write_table(summary, sheetname="Summary")
+    >>> for tbl in details.values():
+    ...     tw.write_table(tbl, sheetname="Detail")
+    >>> tw.close()
+    """
+    assert rank_by in ("IV", "KS", "Gini"), "rank_by must be 'IV', 'KS' or 'Gini'"
+    weight_name = weight if isinstance(weight, str) else None
+    if columns is None:
+        columns = [c for c in data.columns if c not in (performance, weight_name)]
+    columns = list(columns)
+
+    perf = data[performance].to_numpy(dtype=float)
+    cut_wgt = None if weight is None else get_weight(weight, data).to_numpy(dtype=float)
+    wgt = np.ones(perf.size) if cut_wgt is None else cut_wgt
+    # Rows with a missing performance get no weight, rather than being
+    # dropped from every column.
+    wgt = np.where(np.isnan(perf), 0, wgt)
+    bad_wgt = np.nan_to_num(perf) * wgt
+
+    def screen_column(col):
+        col_bins = bins.get(col, 10) if isinstance(bins, dict) else bins
+        col_excp = (
+            exceptions.get(col) if isinstance(exceptions, dict) else exceptions
+        )
+        try:
+            binned = _column_codes(
+                data[col], col_bins, col_excp, missing, kwargs, cut_wgt
+            )
+            return _woe_table(binned, wgt, bad_wgt, performance, missing)
+        except Exception as e:
+            logger.warning("Screening of %s failed: %s", col, e)
+            return f"{type(e).__name__}: {e}"
+
+    if n_jobs == 1:
+        results = list(map(screen_column, columns))
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(screen_column, columns))
+
+    done = {col: res for col, res in zip(columns, results) if not isinstance(res, str)}
+    failed = {col: res for col, res in zip(columns, results) if isinstance(res, str)}
+    summary = pd.DataFrame.from_dict(
+        {col: stats for col, (_, stats) in done.items()},
+        orient="index",
+        columns=["Bins", "IV", "KS", "Gini", "Pct Missing"],
+    )
+    summary = summary.sort_values(rank_by, ascending=False, kind="stable")
+    details = {col: done[col][0] for col in summary.index}
+    if failed:
+        summary["Error"] = None
+        summary = pd.concat(
+            [summary, pd.DataFrame({"Bins": 0, "Error": pd.Series(failed)})]
+        )
+    summary.index.name = "Variable"
+    return summary, details
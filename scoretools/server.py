@@ -0,0 +1,380 @@
+import io
+import json
+import time
+import asyncio
+import argparse
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from typing import Optional, Dict, Any
+from .cleancut import cleancut
+from .smalltables import freq_tab, single_bivar, gains_table
+from .plots import gplot, calc_ks
+
+
+class _Dataset:
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.nbytes = int(frame.memory_usage(deep=True).sum())
+        self.last_used = time.monotonic()
+        self.in_use = 0
+
+
+class DatasetStore:
+    """
+    Named pandas DataFrames kept in memory
+
+    When the memory held goes over `max_memory`, the least recently used
+    datasets that are not serving a request are evicted. Datasets idle
+    for longer than `idle_timeout` seconds are evicted by `evict_idle`.
+
+    Parameters
+    ----------
+    max_memory: int or None.
+        Maximum bytes of datasets to hold. Default is None, no limit.
+
+    idle_timeout: float or None.
+        Seconds a dataset may go unused before it is evicted.
+        Default is None, datasets are only evicted for memory.
+    """
+
+    def __init__(
+        self, max_memory: Optional[int] = None, idle_timeout: Optional[float] = None
+    ):
+        self.max_memory = max_memory
+        self.idle_timeout = idle_timeout
+        self._datasets: Dict[str, _Dataset] = {}
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        frame: Optional[pd.DataFrame] = None,
+        read_args: Optional[Dict] = None,
+        prebin: Optional[Dict[str, Any]] = None,
+    ) -> Dict:
+        """
+        Load a dataset from a csv or parquet file, or register a frame.
+
+        Columns named in `prebin` are binned once with `cleancut`, and
+        kept alongside as `<column>_bin`. The values of prebin are the
+        `bins` argument, or a dict of `cleancut` arguments.
+        """
+        assert (path is None) != (frame is None), "Specify one of path or frame"
+        if frame is None:
+            read_args = {} if read_args is None else read_args
+            if str(path).endswith(".parquet"):
+                frame = pd.read_parquet(path, **read_args)
+            else:
+                frame = pd.read_csv(path, **read_args)
+        if prebin:
+            frame = frame.copy(deep=False)
+            for col, args in prebin.items():
+                args = args if isinstance(args, dict) else {"bins": args}
+                frame[f"{col}_bin"] = cleancut(frame[col], **args)
+        with self._lock:
+            self._datasets[name] = _Dataset(frame)
+            self._evict_memory(keep=name)
+        return self.describe()[name]
+
+    def drop(self, name: str):
+        with self._lock:
+            del self._datasets[name]
+
+    def acquire(self, name: str) -> pd.DataFrame:
+        with self._lock:
+            ds = self._datasets[name]
+            ds.in_use += 1
+            ds.last_used = time.monotonic()
+            return ds.frame
+
+    def release(self, name: str):
+        with self._lock:
+            ds = self._datasets.get(name)
+            if ds is not None:
+                ds.in_use -= 1
+                ds.last_used = time.monotonic()
+            self._evict_memory()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ds.nbytes for ds in self._datasets.values())
+
+    def _evict_memory(self, keep: Optional[str] = None):
+        if self.max_memory is None:
+            return
+        idle = sorted(
+            (ds.last_used, name)
+            for name, ds in self._datasets.items()
+            if ds.in_use == 0 and name != keep
+        )
+        for _, name in idle:
+            if self.nbytes <= self.max_memory:
+                break
+            del self._datasets[name]
+
+    def evict_idle(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for name, ds in list(self._datasets.items()):
+                if ds.in_use == 0 and now - ds.last_used > self.idle_timeout:
+                    del self._datasets[name]
+
+    def describe(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {
+                    "rows": ds.frame.shape[0],
+                    "columns": list(map(str, ds.frame.columns)),
+                    "bytes": ds.nbytes,
+                    "idle_seconds": round(time.monotonic() - ds.last_used, 3),
+                }
+                for name, ds in self._datasets.items()
+            }
+
+
+def _table_json(tbl: pd.DataFrame) -> Dict:
+    tbl = tbl.copy()
+    tbl.index = tbl.index.map(str)
+    tbl.columns = tbl.columns.map(str)
+    out = json.loads(tbl.to_json(orient="split"))
+    out["index_name"] = tbl.index.name
+    return out
+
+
+def _gplot_png(data: pd.DataFrame, args: Dict) -> bytes:
+    fig = Figure(figsize=args.pop("figsize", (6.4, 4.8)))
+    gplot(data, ax=fig.add_subplot(), **args)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
+
+
+_TABLES = {
+    "freq_tab": freq_tab,
+    "single_bivar": single_bivar,
+    "gains_table": gains_table,
+}
+
+
+class ReportServer:
+    """
+    Local HTTP service answering table, metric and chart requests
+    against datasets kept warm in memory
+
+    Requests and responses are JSON, apart from charts which are
+    returned as PNG images. CPU heavy work runs on a bounded pool of
+    worker threads, so the event loop stays responsive.
+
+    Endpoints
+    ---------
+    GET /datasets
+        Describe the loaded datasets.
+    POST /datasets
+        {"name", "path", "read_args", "prebin"} load a dataset.
+    DELETE /datasets/<name>
+        Drop a dataset.
+    POST /table
+        {"dataset", "kind", "args"} where kind is one of freq_tab,
+        single_bivar or gains_table, returns the table in split orient.
+    POST /metric
+        {"dataset", "kind": "ks", "args"} returns {"value"}.
+    POST /chart
+        {"dataset", "args"} returns a gplot as a PNG image.
+
+    Parameters
+    ----------
+    host: str.
+        Default is "127.0.0.1".
+
+    port: int.
+        Default is 8765. Use 0 to pick a free port.
+
+    max_workers: int.
+        Number of worker threads for requests. Default is 4.
+
+    max_memory: int or None.
+        Maximum bytes of datasets to hold, see `DatasetStore`.
+
+    idle_timeout: float or None.
+        Seconds before an unused dataset is evicted, see `DatasetStore`.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        max_workers: int = 4,
+        max_memory: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.store = DatasetStore(max_memory=max_memory, idle_timeout=idle_timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._server = None
+        self._evictor = None
+
+    def _run_on_dataset(self, name: str, func, *args):
+        data = self.store.acquire(name)
+        try:
+            return func(data, *args)
+        finally:
+            self.store.release(name)
+
+    def _dispatch(self, method: str, path: str, body: Dict):
+        """
+        Handle a request in a worker thread, returning a status and a
+        payload, which is bytes for an image or otherwise JSON data.
+        """
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        route = parts[0] if parts else ""
+        if route == "datasets":
+            if method == "GET":
+                return 200, self.store.describe()
+            if method == "POST":
+                return 200, self.store.load(
+                    body["name"],
+                    path=body["path"],
+                    read_args=body.get("read_args"),
+                    prebin=body.get("prebin"),
+                )
+            if method == "DELETE" and len(parts) == 2:
+                self.store.drop(parts[1])
+                return 200, {"dropped": parts[1]}
+        elif method == "POST" and route == "table":
+            func = _TABLES[body["kind"]]
+            tbl = self._run_on_dataset(
+                body["dataset"], lambda d: func(data=d, **body.get("args", {}))
+            )
+            return 200, _table_json(tbl)
+        elif method == "POST" and route == "metric":
+            assert body.get("kind", "ks") == "ks", "Only the ks metric is served"
+            value = self._run_on_dataset(
+                body["dataset"], lambda d: calc_ks(d, **body.get("args", {}))
+            )
+            return 200, {"value": float(value)}
+        elif method == "POST" and route == "chart":
+            png = self._run_on_dataset(
+                body["dataset"], _gplot_png, dict(body.get("args", {}))
+            )
+            return 200, png
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """
+        Read the method, path and JSON body of a request.
+        """
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        assert len(request_line) >= 2, "Malformed request line"
+        length = int(headers.get("content-length", 0))
+        assert length >= 0, "Content-Length must not be negative"
+        raw = await reader.readexactly(length) if length else b""
+        body = json.loads(raw) if raw else {}
+        return request_line[0], request_line[1], body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # A request that can not be read is answered as a bad request.
+            try:
+                method, path, body = await self._read_request(reader)
+                loop = asyncio.get_running_loop()
+                status, payload = await loop.run_in_executor(
+                    self._executor, self._dispatch, method, path, body
+                )
+            except KeyError as e:
+                status, payload = 404, {"error": f"Not found: {e}"}
+            except Exception as e:
+                status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+            if isinstance(payload, bytes):
+                ctype = "image/png"
+            else:
+                ctype = "application/json"
+                payload = json.dumps(payload, default=str).encode("utf-8")
+            reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}[status]
+            writer.write(
+                (
+                    f"HTTP/1.1 {status} {reason}\r\n"
+                    f"Content-Type: {ctype}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("latin-1")
+                + payload
+            )
+            try:
+                await writer.drain()
+            except ConnectionError:
+                # The client went away before the response was sent.
+                pass
+        finally:
+            writer.close()
+
+    async def _evict_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.store.evict_idle()
+
+    async def start(self):
+        """
+        Start listening. The port actually bound is set on `port`.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.store.idle_timeout is not None:
+            self._evictor = asyncio.ensure_future(
+                self._evict_loop(min(self.store.idle_timeout, 60))
+            )
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._evictor is not None:
+            self._evictor.cancel()
+        if self._server is not None:
+            self._server.close()
+        self._executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve scoretools tables and charts from warm datasets."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--max-memory", type=float, default=None, help="Maximum GB of datasets."
+    )
+    parser.add_argument(
+        "--idle-timeout", type=float, default=None, help="Seconds before eviction."
+    )
+    args = parser.parse_args(argv)
+    server = ReportServer(
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers,
+        max_memory=None if args.max_memory is None else int(args.max_memory * 2 ** 30),
+        idle_timeout=args.idle_timeout,
+    )
+    print(f"Serving on http://{args.host}:{args.port}")
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
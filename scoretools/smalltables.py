@@ -1,13 +1,34 @@
+import numpy as np
 import pandas as pd
+from typing import Optional
+from .utils import get_weight, coerce_to_iterable
+from .utils.codes import BinnedCodes
+from .utils.heavy_hitters import HeavyHitterSketch
+from .utils.disk_cache import disk_cached
 
 
-def freq_tab(variable, data=None, fillna="Missing", na_last=False, use_name=True):
+@disk_cached(data_arg="data", column_args=("variable", "weight"))
+def freq_tab(
+    variable,
+    data=None,
+    fillna="Missing",
+    na_last=False,
+    use_name=True,
+    weight=None,
+    top=None,
+    other="Other",
+    sort_by="level",
+):
     """
     Create a Simple Frequency table
 
     Parameters
     ----------
-    variable: names of variables in data or pandas Series.
+    variable: names of variables in data, pandas Series, BinnedCodes, or
+        HeavyHitterSketch.
+        BinnedCodes are counted directly from their codes. The levels of
+        a HeavyHitterSketch are those it kept, with the rest of its rows
+        in the `other` row.
 
     data: pandas Series.
         If variable is a name of a variable, data must be supplied.
@@ -24,23 +45,64 @@ def freq_tab(variable, data=None, fillna="Missing", na_last=False, use_name=True
     use_name: bool.
         Use the name of the series to name the table.
 
+    weight: name of a variable in data, or pandas Series.
+        Frequency weight of each row, for example the counts of a
+        frame created with `collapse_counts`. If None, each row has a
+        weight of one.
+
+    top: int or None.
+        Only keep the `top` most frequent levels, with the rows of all
+        other levels counted in a single `other` row. Missing values keep
+        their own row. Default is None, every level is kept.
+
+    other: string.
+        The label of the row of levels not kept. Default is "Other".
+
+    sort_by: string {'level', 'frequency'}.
+        Order the levels by their value, or most frequent first. The
+        `other` row follows the levels. Default is "level".
+
     Returns
     -------
     freq_tab: pandas DataFrame
+
+    Examples
+    --------
+    >>> sts.freq_tab("zip", data=df, top=50, sort_by="frequency")
     """
-    if data is None:
-        var_series = variable
-        variable = variable.name
-    else:
-        var_series = data[variable]
+    assert sort_by in ("level", "frequency"), "sort_by must be 'level' or 'frequency'"
     na_last = "last" if na_last else "first"
     dropna = True if fillna is None else False
-    freq_tab = (
-        var_series.value_counts(dropna=dropna)
-        .rename("Frequency")
-        .sort_index(na_position=na_last)
-        .to_frame()
-    )
+    n_other = 0
+    if isinstance(variable, HeavyHitterSketch):
+        counts = variable.counts()
+        n_other = variable.n - variable.n_missing - counts.sum()
+        if not dropna and variable.n_missing:
+            counts = pd.concat([counts, pd.Series([variable.n_missing], index=[np.nan])])
+        variable = variable.name
+    elif isinstance(variable, BinnedCodes):
+        counts = _code_counts(variable, dropna, weight, data)
+        variable = variable.name
+    else:
+        if data is None:
+            var_series = variable
+            variable = variable.name
+        else:
+            var_series = data[variable]
+        if weight is None:
+            counts = var_series.value_counts(dropna=dropna)
+        else:
+            counts = pd.Series(
+                get_weight(weight, data).to_numpy(), index=var_series.index
+            ).groupby(var_series, dropna=dropna, observed=False).sum()
+    if top is None and sort_by == "level" and not n_other:
+        freq_tab = (
+            counts.rename("Frequency")
+            .sort_index(na_position=na_last)
+            .to_frame()
+        )
+    else:
+        freq_tab = _top_counts(counts, n_other, top, other, sort_by, na_last).to_frame()
     freq_tab["Percent"] = freq_tab["Frequency"] / freq_tab["Frequency"].sum()
     freq_tab["Cumulative Frequency"] = freq_tab["Frequency"].cumsum()
     freq_tab["Cumulative Percent"] = freq_tab["Percent"].cumsum()
@@ -51,6 +113,55 @@ def freq_tab(variable, data=None, fillna="Missing", na_last=False, use_name=True
     return freq_tab
 
 
+def _top_counts(counts, n_other, top, other, sort_by, na_last):
+    """
+    Keep the top most frequent levels of counts, in sort_by order, with
+    the other levels, and n_other rows not in counts, in an `other` row.
+    """
+    missing = counts.index.isna()
+    n_missing = counts[missing]
+    counts = counts[~missing]
+    if top is not None and counts.size > top:
+        kept = counts.nlargest(top, keep="first")
+        n_other += counts.sum() - kept.sum()
+        counts = kept
+    if sort_by == "level":
+        counts = counts.sort_index()
+    else:
+        counts = counts.sort_values(ascending=False, kind="stable")
+    counts = pd.Series(counts.to_numpy(), index=pd.Index(counts.index, dtype=object))
+    parts = [counts]
+    if n_other:
+        parts.append(pd.Series([n_other], index=[other]))
+    if n_missing.size:
+        missing = pd.Series(n_missing.to_numpy(), index=[np.nan])
+        parts = parts + [missing] if na_last == "last" else [missing] + parts
+    counts = pd.concat(parts) if len(parts) > 1 else counts
+    return counts.rename("Frequency")
+
+
+def _code_counts(binned, dropna, weight, data):
+    """
+    Counts of each category of BinnedCodes, in the form value_counts gives
+    for a categorical, with a missing entry only if rows are missing.
+    """
+    wgt = None if weight is None else get_weight(weight, data).to_numpy()
+    counts = binned.counts(wgt)
+    levels = list(binned.categories)
+    n_missing = 0
+    if not dropna:
+        missing = binned.codes < 0
+        if missing.any():
+            n_missing = missing.sum() if wgt is None else wgt[missing].sum()
+    if n_missing:
+        counts = np.append(counts, n_missing)
+        levels.append(np.nan)
+    if wgt is None or wgt.dtype.kind in "biu":
+        counts = counts.astype(np.int64)
+    index = pd.CategoricalIndex(levels, dtype=binned.dtype)
+    return pd.Series(counts, index=index, name="count")
+
+
 def bivar(
     data,
     main_var,
@@ -96,6 +207,8 @@ def bivar(
               percentiles.
             * If `breaks` the `main_var` will be broken at the cut points
               specified.
+            * If `optimal` the `main_var` will be broken into supervised
+              bins that maximize information value or KS.
     
     break_args: `break_method` parameters, default None.
         The parameters that will be passed into the `break_method` function.
@@ -111,13 +224,23 @@ def bivar(
               must be in the range [0,1]
             * If `breaks` (iterable[scalars]): Specify an iterable of scalar values
               that define the bin edges of the `main_var` to break on.
+            * If `optimal` (pandas Series): The binary performance field to
+              bin against, see `break_methods.optimal` for further options.
 
     """
     ...
 
 
+@disk_cached(data_arg="data", column_args=("main_var", "bivar", "weight"))
 def single_bivar(
-    data: pd.DataFrame, main_var, bivar, fillna="Missing", na_last=False, use_name=True,
+    data: pd.DataFrame,
+    main_var,
+    bivar,
+    fillna="Missing",
+    na_last=False,
+    use_name=True,
+    weight=None,
+    low_memory=False,
 ):
     """
     Single Bivar function
@@ -129,8 +252,10 @@ def single_bivar(
     data: pandas DataFrame.
         A DataFrame that contains the variable, and bivar.
 
-    main_var: string.
-        The variable which to distribute the bivar along.
+    main_var: string, or BinnedCodes.
+        The variable which to distribute the bivar along. BinnedCodes,
+        aligned with the rows of data, are counted directly from their
+        codes as with `low_memory`.
     
     bivars: string or iterable of strings.
         The name of a binary variable to distribute along
@@ -149,14 +274,41 @@ def single_bivar(
     use_name: bool.
         Use the name of the series to name the table.
 
+    weight: string, or pandas Series.
+        The name of a frequency weight field in data, or a Series aligned
+        with data. Counts, sums and rates are weighted by it. If None,
+        each row has a weight of one.
+
+    low_memory: bool.
+        If True the table is built from integer codes of the main_var with
+        bincount, without copying the data. Default is False.
+
     Returns
     -------
 
     """
+    if low_memory or isinstance(main_var, BinnedCodes):
+        bdat, tot_rate = _bivar_low_memory(data, main_var, bivar, fillna, weight)
+        if isinstance(main_var, BinnedCodes):
+            main_var = main_var.name
+        return _finish_bivar(bdat, tot_rate, main_var, bivar, fillna, na_last, use_name)
+
     gdat = data[[main_var, bivar]].copy()
+    if weight is not None:
+        gdat["_weight"] = get_weight(weight, data)
+        gdat["_bivar_w"] = gdat[bivar] * gdat["_weight"]
+        # Weight of the rows where the bivar is present, for the rates.
+        gdat["_rate_w"] = gdat["_weight"].where(gdat[bivar].notna())
+        tot_rate = gdat["_bivar_w"].sum() / gdat["_rate_w"].sum()
+    else:
+        tot_rate = data[bivar].mean()
     if fillna is not None:
         if gdat[main_var].dtype.name == "category":
-            gdat[main_var] = gdat[main_var].cat.add_categories(new_categories=fillna)
+            # cleancut output already holds a Missing category.
+            if fillna not in gdat[main_var].cat.categories:
+                gdat[main_var] = gdat[main_var].cat.add_categories(
+                    new_categories=fillna
+                )
             gdat = gdat.fillna(value={main_var: fillna})
             gdat[main_var] = gdat[main_var].cat.remove_unused_categories()
         else:
@@ -164,24 +316,407 @@ def single_bivar(
     else:
         gdat = gdat.dropna(subset=[main_var]).copy()
 
-    r_cnt = gdat[main_var].count()
-    b_cnt = gdat[bivar].sum()
-    gdat = gdat.groupby(main_var)
-    bdat = gdat[main_var].count().rename("N").to_frame()
-    bdat[f"Pct N"] = bdat["N"] / r_cnt
-    bdat[f"{bivar} sum"] = gdat[bivar].sum()
-    bdat[f"{bivar} Rate"] = gdat[bivar].mean()
+    if weight is None:
+        r_cnt = gdat[main_var].count()
+        b_cnt = gdat[bivar].sum()
+        gdat = gdat.groupby(main_var)
+        bdat = gdat[main_var].count().rename("N").to_frame()
+        bdat[f"Pct N"] = bdat["N"] / r_cnt
+        bdat[f"{bivar} sum"] = gdat[bivar].sum()
+        bdat[f"{bivar} Rate"] = gdat[bivar].mean()
+    else:
+        r_cnt = gdat["_weight"].sum()
+        b_cnt = gdat["_bivar_w"].sum()
+        gdat = gdat.groupby(main_var)
+        bdat = gdat["_weight"].sum().rename("N").to_frame()
+        bdat[f"Pct N"] = bdat["N"] / r_cnt
+        bdat[f"{bivar} sum"] = gdat["_bivar_w"].sum()
+        bdat[f"{bivar} Rate"] = bdat[f"{bivar} sum"] / gdat["_rate_w"].sum()
     bdat[f"{bivar} Pct"] = bdat[f"{bivar} sum"] / b_cnt
-    # Adjust and Sort for Missing value
+    return _finish_bivar(bdat, tot_rate, main_var, bivar, fillna, na_last, use_name)
+
+
+def _finish_bivar(bdat, tot_rate, main_var, bivar, fillna, na_last, use_name):
+    """
+    Sort the bivar levels, placing the missing level, and add the total.
+    """
+    # Sort the levels, in category order for a categorical, and place the
+    # missing level. Sorting a categorical index keeps mixed exception and
+    # label categories comparable.
+    is_na = bdat.index.isna()
     if fillna is not None:
-        bdat = bdat.rename(index={fillna: None})
-    # Sort data
-    na_last = "last" if na_last else "first"
-    bdat = bdat.sort_index(na_position=na_last)
-    bdat.index = bdat.index.fillna(fillna)
+        is_na = is_na | (bdat.index == fillna)
+    na_rows = bdat[is_na]
+    na_rows.index = na_rows.index.fillna(fillna)
+    parts = [bdat[~is_na].sort_index(), na_rows]
+    bdat = pd.concat(parts if na_last else parts[::-1])
     tab_tot = bdat.sum().to_frame().T.rename(index={0: "Total"})
-    tab_tot[f"{bivar} Rate"] = data[bivar].mean()
+    tab_tot[f"{bivar} Rate"] = tot_rate
     bdat_f = pd.concat([bdat, tab_tot])
     if use_name:
         bdat_f.index = bdat_f.index.rename(main_var)
     return bdat_f
+
+
+def _bivar_low_memory(data, main_var, bivar, fillna, weight, block=2 ** 20):
+    """
+    Counts of a single bivar from integer codes of the main_var with
+    bincount, a block of rows at a time. The data is not copied: the
+    codes are passed to bincount as they are stored, counts are kept as
+    integers unless weighted, and a 0/1 or integer bivar is tallied
+    without a float copy. The only full length array made is the codes
+    of a main_var that is not categorical.
+    """
+    if isinstance(main_var, BinnedCodes):
+        assert len(main_var) == data.shape[0], "BinnedCodes must align with data"
+        codes = main_var.codes
+        levels = list(main_var.categories)
+        dtype = main_var.dtype
+        main_var = main_var.name
+    elif data[main_var].dtype.name == "category":
+        var = data[main_var]
+        codes = var.cat.codes.to_numpy()
+        levels = list(var.cat.categories)
+        dtype = var.dtype
+    else:
+        codes, uniques = pd.factorize(data[main_var], sort=True)
+        levels = list(uniques)
+        dtype = None
+    # Missing values go to the fill value level, or an extra level dropped
+    # from the table if fillna is None.
+    if fillna is not None and fillna in levels:
+        miss_code = levels.index(fillna)
+    else:
+        miss_code = len(levels)
+        levels.append(fillna)
+    nlev = len(levels)
+
+    bcol = data[bivar]
+    if bcol.dtype.kind in "biu":
+        bvals = bcol.to_numpy()
+        binary = bcol.dtype.kind == "b" or (
+            bvals.size == 0 or (bvals.min() >= 0 and bvals.max() <= 1)
+        )
+    else:
+        bvals = bcol.to_numpy(dtype=float, na_value=np.nan)
+        binary = False
+    wgt = None if weight is None else get_weight(weight, data).to_numpy(dtype=float)
+
+    rows = np.zeros(nlev, dtype=np.int64)
+    cnt = rows if wgt is None else np.zeros(nlev)
+    bsum = np.zeros(nlev, dtype=np.int64 if binary and wgt is None else float)
+    # Weight of the rows with a missing bivar, left out of the rates.
+    na_n = np.zeros(nlev)
+    for start in range(0, codes.size, block):
+        idx = codes[start : start + block]
+        if (idx < 0).any():
+            idx = np.where(idx < 0, miss_code, idx)
+        bv = bvals[start : start + block]
+        w = None if wgt is None else wgt[start : start + block]
+        rows += np.bincount(idx, minlength=nlev)
+        if w is not None:
+            cnt += np.bincount(idx, w, nlev)
+        if binary:
+            is_bad = bv != 0
+            bad_w = None if w is None else w[is_bad]
+            bsum += np.bincount(idx[is_bad], bad_w, nlev).astype(bsum.dtype, copy=False)
+            continue
+        if bv.dtype.kind == "f":
+            b_na = np.isnan(bv)
+            if b_na.any():
+                na_n += np.bincount(idx[b_na], None if w is None else w[b_na], nlev)
+                b_ok = ~b_na
+                idx, bv = idx[b_ok], bv[b_ok]
+                w = None if w is None else w[b_ok]
+        bsum += np.bincount(idx, bv if w is None else bv * w, nlev)
+    rate_n = cnt - na_n if na_n.any() else cnt
+    tot_rate = bsum.sum() / rate_n.sum()
+
+    keep = rows > 0
+    if fillna is None:
+        keep[miss_code] = False
+    labels = [lev for lev, k in zip(levels, keep) if k]
+    if dtype is not None:
+        index = pd.CategoricalIndex(
+            labels,
+            categories=[lev for lev in levels if lev in labels],
+            ordered=dtype.ordered,
+            name=main_var,
+        )
+    else:
+        index = pd.Index(labels, name=main_var)
+    bdat = pd.DataFrame({"N": cnt[keep]}, index=index)
+    bdat["Pct N"] = bdat["N"] / bdat["N"].sum()
+    bdat[f"{bivar} sum"] = bsum[keep]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bdat[f"{bivar} Rate"] = bsum[keep] / rate_n[keep]
+    bdat[f"{bivar} Pct"] = bdat[f"{bivar} sum"] / bsum[keep].sum()
+    return bdat, tot_rate
+
+
+def collapse_counts(data: pd.DataFrame, by, weight=None, name="count"):
+    """
+    Collapse data to one row per unique combination of key fields
+
+    The returned frame holds the unique rows of the `by` fields along
+    with a frequency weight column. It can be passed to the tables and
+    metrics in the package with `weight=name`, giving the same results
+    as the raw data on a much smaller frame.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+
+    by: string or iterable of strings.
+        The key fields to collapse on, for example the score,
+        performance flag and segment fields.
+
+    weight: string or None.
+        The name of an existing frequency weight field in data, whose
+        values will be summed. If None, rows are counted.
+
+    name: string.
+        The name of the weight column in the returned frame.
+        Default is "count".
+
+    Returns
+    -------
+    collapsed: pandas DataFrame
+    """
+    by = coerce_to_iterable(by)
+    grp = data.groupby(by, dropna=False, observed=True, sort=True)
+    counts = grp.size() if weight is None else grp[weight].sum()
+    return counts.rename(name).reset_index()
+
+
+def vintage_table(
+    data: pd.DataFrame,
+    cohort: str,
+    mob: str,
+    performance: str,
+    account: Optional[str] = None,
+    first_bad_only: bool = True,
+    cumulative: bool = True,
+    max_mob: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Create a vintage table of bad rates by cohort and months on book
+
+    The cohort and months on book are factorized to integer codes once,
+    and the bad events are tallied into a cohort by months on book grid
+    with a single bincount, then cumulated along months on book.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+        A monthly panel with a row per account and month on book.
+
+    cohort: string.
+        The name of the origination cohort field, for example the
+        origination month.
+
+    mob: string.
+        The name of the months on book field. When its values are whole
+        numbers, every month in its range is a column, even months with
+        no rows.
+
+    performance: string.
+        The name of the performance field. This should be a binary
+        variable where 1 is a bad in that month.
+
+    account: string or None.
+        The name of the account id field. If given, the accounts of each
+        cohort are counted once, and with `first_bad_only` only the first
+        bad month of an account is an event. If None, the accounts of a
+        cohort are the rows at its first month on book, and every bad row
+        is an event.
+
+    first_bad_only: bool.
+        Count only the first bad month of each account. Default is True.
+
+    cumulative: bool.
+        If True the rates are cumulated along months on book, otherwise
+        they are the rate of bads in each month. Default is True.
+
+    max_mob: int or None.
+        Leave out months on book after this one.
+
+    Returns
+    -------
+    vintage: pandas DataFrame
+        One row per cohort, with the number of accounts and a "MOB <m>
+        Rate" column per month on book, so TableWriter formats the rates
+        as percents. Months on book a cohort has not reached are missing.
+    """
+    keep = data[cohort].notna() & data[mob].notna()
+    if max_mob is not None:
+        keep &= data[mob] <= max_mob
+    if not keep.all():
+        data = data[keep]
+    c_codes, cohorts = pd.factorize(data[cohort], sort=True)
+    mob_vals = data[mob].to_numpy()
+    if mob_vals.dtype.kind == "f" and np.all(mob_vals == np.round(mob_vals)):
+        # Whole months held as floats, for example a column that had NaN.
+        mob_vals = mob_vals.astype(np.int64)
+    if mob_vals.dtype.kind in "iu":
+        # Keep every month in the range, even those with no rows.
+        m_min = mob_vals.min()
+        m_codes = (mob_vals - m_min).astype(np.intp)
+        mobs = np.arange(m_min, mob_vals.max() + 1)
+    else:
+        m_codes, mobs = pd.factorize(mob_vals, sort=True)
+    n_coh, n_mob = len(cohorts), len(mobs)
+    cell = c_codes.astype(np.intp) * n_mob + m_codes
+    rows = np.bincount(cell, minlength=n_coh * n_mob).reshape(n_coh, n_mob)
+
+    bad = data[performance].to_numpy() == 1
+    if account is not None:
+        a_codes, _ = pd.factorize(data[account])
+        # The cohort of each account is that of its first row.
+        _, first_row = np.unique(a_codes, return_index=True)
+        accounts = np.bincount(c_codes[first_row], minlength=n_coh)
+        if first_bad_only:
+            bad_pos = np.flatnonzero(bad)
+            order = np.lexsort((m_codes[bad_pos], a_codes[bad_pos]))
+            bad_pos = bad_pos[order]
+            first = np.ones(bad_pos.size, dtype=bool)
+            first[1:] = a_codes[bad_pos[1:]] != a_codes[bad_pos[:-1]]
+            bad = bad_pos[first]
+    else:
+        first_mob = np.argmax(rows > 0, axis=1)
+        accounts = rows[np.arange(n_coh), first_mob]
+    events = np.bincount(cell[bad], minlength=n_coh * n_mob).reshape(n_coh, n_mob)
+
+    if cumulative:
+        events = np.cumsum(events, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = events / accounts[:, None]
+    # Months after the last one observed for a cohort are not reached yet.
+    last_mob = n_mob - 1 - np.argmax(rows[:, ::-1] > 0, axis=1)
+    rates[np.arange(n_mob)[None, :] > last_mob[:, None]] = np.nan
+
+    vintage = pd.DataFrame(
+        rates,
+        index=pd.Index(cohorts, name=cohort),
+        columns=[f"MOB {m} Rate" for m in mobs],
+    )
+    vintage.insert(0, "Accounts", accounts)
+    return vintage
+
+
+def gains_table(
+    data: pd.DataFrame,
+    performance,
+    score,
+    ascending=True,
+    groups=10,
+    exceptions=None,
+    weight=None,
+):
+    """
+    Create a gains table
+
+    The data is ranked on the score with a single argsort, split into
+    even depth of file bands, and the counts of every performance field
+    are tallied by band with bincount.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+        A DataFrame that contains the performance and score fields.
+
+    performance: string or iterable of strings.
+        The names of the performance fields. These should be binary
+        variables where 1 is the target label.
+
+    score: string.
+        The name of the score field to rank the data on.
+
+    ascending: bool.
+        Rank the data by the score in ascending order, so the first band
+        holds the lowest scores. Default is True.
+
+    groups: int.
+        The number of depth of file bands. Default is 10.
+
+    exceptions: iterable.
+        Exception values of the score, which are left out of the table,
+        as in `gplot`. Missing scores are also left out.
+
+    weight: string, or pandas Series.
+        The name of a frequency weight field in data, or a Series aligned
+        with data. If None, each row has a weight of one.
+
+    Returns
+    -------
+    gains_tab: pandas DataFrame
+        For each band, the count, share and cumulative share of the
+        file, and for each performance field the sum, rate, cumulative
+        capture, lift and cumulative KS. The KS Pct of a band is the
+        cumulative share of bads less that of goods at its end, and of
+        the Total row the largest such gap over all rows, as `calc_ks`.
+        Rows with a missing performance value count towards N, but are
+        neither bads nor goods, and are left out of the rates.
+    """
+    performance = coerce_to_iterable(performance)
+    scr = data[score].to_numpy()
+    keep = pd.notna(scr)
+    if exceptions is not None:
+        keep &= ~np.isin(scr, exceptions)
+    scr = scr[keep]
+    wgt = (
+        np.ones(scr.size)
+        if weight is None
+        else get_weight(weight, data).to_numpy(dtype=float)[keep]
+    )
+
+    order = np.argsort(scr, kind="stable")
+    if not ascending:
+        order = order[::-1]
+    wgt = wgt[order]
+    tot_w = wgt.sum()
+    # Band of each row from the depth of file at which the row starts.
+    band = np.minimum(
+        ((np.cumsum(wgt) - wgt) / tot_w * groups).astype(int), groups - 1
+    )
+    cnt = np.bincount(band, weights=wgt, minlength=groups)
+
+    gtab = pd.DataFrame(
+        {"N": cnt, "Pct N": cnt / tot_w, "Cuml Pct N": np.cumsum(cnt) / tot_w},
+        index=pd.Index(
+            [f"{(i + 1) / groups:.0%}" for i in range(groups)], name="Depth"
+        ),
+    )
+    tot = {"N": tot_w, "Pct N": 1.0, "Cuml Pct N": 1.0}
+    for perf in performance:
+        perf_v = data[perf].to_numpy(dtype=float)[keep][order]
+        # Rows with a missing performance are neither bads nor goods.
+        known_w = np.where(np.isnan(perf_v), 0.0, wgt)
+        perf_w = np.nan_to_num(perf_v) * wgt
+        known = np.bincount(band, weights=known_w, minlength=groups)
+        bd = np.bincount(band, weights=perf_w, minlength=groups)
+        gd = known - bd
+        tot_bd = bd.sum()
+        tot_rate = tot_bd / known.sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = bd / known
+        cuml_bd = np.cumsum(bd) / tot_bd
+        cuml_gd = np.cumsum(gd) / gd.sum()
+        gtab[f"{perf} sum"] = bd
+        gtab[f"{perf} Rate"] = rate
+        gtab[f"{perf} Cuml Pct"] = cuml_bd
+        gtab[f"{perf} Lift"] = rate / tot_rate
+        gtab[f"{perf} KS Pct"] = cuml_bd - cuml_gd
+        # The KS of the score, from the gap after every row.
+        ks = (np.cumsum(perf_w) / tot_bd - np.cumsum(known_w - perf_w) / gd.sum()).max()
+        tot.update(
+            {
+                f"{perf} sum": tot_bd,
+                f"{perf} Rate": tot_rate,
+                f"{perf} Cuml Pct": 1.0,
+                f"{perf} Lift": 1.0,
+                f"{perf} KS Pct": ks,
+            }
+        )
+    gtab.loc["Total"] = pd.Series(tot)
+    return gtab
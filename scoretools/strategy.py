@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+from typing import Union, Iterable, Optional, Tuple
+from .utils import get_weight
+
+
+def _candidate_cutoffs(x: np.ndarray, cutoffs: Union[int, Iterable]) -> np.ndarray:
+    if isinstance(cutoffs, int):
+        return np.unique(np.nanpercentile(x, np.linspace(0, 100, cutoffs + 1)))
+    return np.unique(np.asarray(cutoffs, dtype=float))
+
+
+def _cumulate(grid: np.ndarray, axis: int, above: bool) -> np.ndarray:
+    """
+    Turn counts by score bin into counts approved at each cutoff along
+    one axis of the grid.
+    """
+    k = grid.shape[axis] - 1
+    if above:
+        # Approved at cutoff j if the bin code is j + 1 or higher.
+        cml = np.flip(np.cumsum(np.flip(grid, axis), axis=axis), axis)
+        return np.take(cml, np.arange(1, k + 1), axis=axis)
+    # Approved at cutoff j if the bin code is j or lower.
+    return np.take(np.cumsum(grid, axis=axis), np.arange(k), axis=axis)
+
+
+class CutoffGrid:
+    """
+    Approval and bad rates for every pair of cutoffs on two scores
+
+    Both scores are binned on their candidate cutoffs once, and the
+    counts and bads are tallied into a 2-D grid with a single bincount.
+    Cumulative sums over the grid then give the approved count and bads
+    of every cutoff pair, so the full grid costs O(n + grid) rather
+    than a pass over the data per pair.
+
+    A row is approved when it passes the cutoff on both scores. Rows
+    with a missing score are never approved, but count towards the
+    approval rate.
+
+    Parameters
+    ----------
+    data: pandas DataFrame.
+        A DataFrame that contains the scores and performance field.
+
+    score1, score2: string.
+        The names of the two score fields.
+
+    performance: string.
+        The name of the performance field. This should be a binary
+        variable where 1 is a bad.
+
+    cutoffs1, cutoffs2: int or iterable of floats.
+        The candidate cutoffs for each score. If an int, that many
+        quantiles of the score are used. Default is 100.
+
+    approve_above: bool or tuple of two bools.
+        If True a row passes a cutoff when its score is at or above it,
+        otherwise when it is at or below it. Default is True.
+
+    weight: string, or pandas Series.
+        The name of a frequency weight field in data, or a Series aligned
+        with data. If None, each row has a weight of one.
+
+    Examples
+    --------
+    >>> grid = sts.CutoffGrid(df, "bureau_scr", "custom_scr", "bad")
+    >>> grid.approval_rate
+    >>> grid.solve(target_approval=0.6)
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        score1: str,
+        score2: str,
+        performance: str,
+        cutoffs1: Union[int, Iterable] = 100,
+        cutoffs2: Union[int, Iterable] = 100,
+        approve_above: Union[bool, Tuple[bool, bool]] = True,
+        weight=None,
+    ):
+        if isinstance(approve_above, bool):
+            approve_above = (approve_above, approve_above)
+        self.score1 = score1
+        self.score2 = score2
+        self.approve_above = approve_above
+
+        s1 = data[score1].to_numpy(dtype=float)
+        s2 = data[score2].to_numpy(dtype=float)
+        perf = np.nan_to_num(data[performance].to_numpy(dtype=float))
+        wgt = (
+            np.ones(s1.size)
+            if weight is None
+            else get_weight(weight, data).to_numpy(dtype=float)
+        )
+        self.cutoffs1 = _candidate_cutoffs(s1, cutoffs1)
+        self.cutoffs2 = _candidate_cutoffs(s2, cutoffs2)
+        self.total = wgt.sum()
+        self.total_bads = (perf * wgt).sum()
+
+        keep = ~(np.isnan(s1) | np.isnan(s2))
+        side1 = "right" if approve_above[0] else "left"
+        side2 = "right" if approve_above[1] else "left"
+        code1 = np.searchsorted(self.cutoffs1, s1[keep], side=side1)
+        code2 = np.searchsorted(self.cutoffs2, s2[keep], side=side2)
+        shape = (self.cutoffs1.size + 1, self.cutoffs2.size + 1)
+        flat = code1 * shape[1] + code2
+        size = shape[0] * shape[1]
+        counts = np.bincount(flat, weights=wgt[keep], minlength=size).reshape(shape)
+        bads = np.bincount(
+            flat, weights=(perf * wgt)[keep], minlength=size
+        ).reshape(shape)
+
+        for axis, above in enumerate(approve_above):
+            counts = _cumulate(counts, axis, above)
+            bads = _cumulate(bads, axis, above)
+        self._approved = counts
+        self._bads = bads
+
+    def _frame(self, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            values,
+            index=pd.Index(self.cutoffs1, name=self.score1),
+            columns=pd.Index(self.cutoffs2, name=self.score2),
+        )
+
+    @property
+    def approved(self) -> pd.DataFrame:
+        """
+        Number of rows approved at each pair of cutoffs.
+        """
+        return self._frame(self._approved)
+
+    @property
+    def bads(self) -> pd.DataFrame:
+        """
+        Number of bads approved at each pair of cutoffs.
+        """
+        return self._frame(self._bads)
+
+    @property
+    def approval_rate(self) -> pd.DataFrame:
+        """
+        Share of all rows approved at each pair of cutoffs.
+        """
+        return self._frame(self._approved / self.total)
+
+    @property
+    def bad_rate(self) -> pd.DataFrame:
+        """
+        Bad rate of the approved rows at each pair of cutoffs.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._frame(self._bads / self._approved)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        All cutoff pairs as a long table, ready for TableWriter.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = self._bads / self._approved
+        idx = pd.MultiIndex.from_product(
+            [self.cutoffs1, self.cutoffs2], names=[self.score1, self.score2]
+        )
+        return pd.DataFrame(
+            {
+                "N Approved": self._approved.ravel(),
+                "Approval Rate": self._approved.ravel() / self.total,
+                "Bads": self._bads.ravel(),
+                "Bad Rate": rate.ravel(),
+            },
+            index=idx,
+        )
+
+    def solve(
+        self,
+        target_approval: Optional[float] = None,
+        max_bad_rate: Optional[float] = None,
+    ) -> pd.Series:
+        """
+        Find the best pair of cutoffs for a target.
+
+        Parameters
+        ----------
+        target_approval: float.
+            Find the pair with the lowest bad rate among those approving
+            at least this share of rows.
+
+        max_bad_rate: float.
+            Find the pair with the highest approval rate among those with
+            a bad rate at or below this value.
+
+        Returns
+        -------
+        strategy: pandas Series
+            The cutoffs, approved count, approval rate, bads and bad rate
+            of the pair found.
+        """
+        assert (target_approval is None) != (
+            max_bad_rate is None
+        ), "Specify one of target_approval or max_bad_rate"
+        tbl = self.to_frame()
+        if target_approval is not None:
+            cand = tbl[tbl["Approval Rate"] >= target_approval]
+            cand = cand.sort_values(
+                ["Bad Rate", "Approval Rate"], ascending=[True, False]
+            )
+        else:
+            cand = tbl[tbl["Bad Rate"] <= max_bad_rate]
+            cand = cand.sort_values(
+                ["Approval Rate", "Bad Rate"], ascending=[False, True]
+            )
+        assert cand.shape[0] > 0, "No pair of cutoffs meets the target"
+        best = cand.iloc[0]
+        cut1, cut2 = cand.index[0]
+        return pd.concat(
+            [pd.Series({self.score1: cut1, self.score2: cut2}), best]
+        )
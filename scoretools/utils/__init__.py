@@ -1,3 +1,8 @@
 from .utils import *
 from . import break_methods
 from .format_handler import FormatHandler
+from .sketch import QuantileSketch
+from .codes import BinnedCodes
+from .heavy_hitters import HeavyHitterSketch
+from .cache import enable_bin_cache, disable_bin_cache, bin_cache_info
+from .disk_cache import enable_disk_cache, disable_disk_cache, disk_cache_info
@@ -1,8 +1,11 @@
 import numpy as np
 import pandas as pd
+from .sketch import as_sketch
+from .cache import cached_binning
+from .codes import BinnedCodes
 
 
-def breaks(x, breaks, exceptions=None, **kwargs):
+def breaks(x, breaks, exceptions=None, codes=False, **kwargs):
     """
     Break variable at specific values
 
@@ -17,12 +20,16 @@ def breaks(x, breaks, exceptions=None, **kwargs):
     exceptions: iterable.
         Exception values to be held out from `x`.
 
+    codes: bool.
+        If True return the bins as `BinnedCodes`, compact integer codes
+        and a table of labels, rather than a categorical Series.
+
     Returns
     -------
-    x_cut: pandas Series
+    x_cut: pandas Series or BinnedCodes
     """
-    if exceptions:
-        assert any(
+    if exceptions is not None:
+        assert not any(
             [i in exceptions for i in breaks]
         ), "breaks present in exceptions"
     x_cut = pd.cut(
@@ -39,10 +46,13 @@ def breaks(x, breaks, exceptions=None, **kwargs):
         x_cut = x_cut.cat.add_categories(exceptions_sort)
         for excp in exceptions_sort:
             x_cut[x == excp] = excp
+    if codes:
+        return BinnedCodes.from_series(x_cut)
     return x_cut
 
 
-def bins(x, bins, exceptions=None, **kwargs):
+@cached_binning
+def bins(x, bins, exceptions=None, sketch=None, codes=False, **kwargs):
     """
     Break variable into even bins
 
@@ -56,20 +66,30 @@ def bins(x, bins, exceptions=None, **kwargs):
     exceptions: iterable.
         Exception values to be held out from `x`.
 
+    sketch: QuantileSketch or iterable of chunks.
+        If supplied, the bin edges are taken from this quantile sketch
+        instead of being computed from `x`.
+
+    codes: bool.
+        If True return `BinnedCodes` rather than a categorical Series.
+
     **kwargs: 
         Additional key-word arguments to pass to the pd.Cut 
         function that is used to bin the data.
         
     Returns
     -------
-    x_cut: pandas Series
+    x_cut: pandas Series or BinnedCodes
     """
     pctls = np.linspace(0, 1, bins + 1)
-    x_cut = percentile(x, pctls * 100, exceptions=exceptions, **kwargs)
+    x_cut = _percentile(
+        x, pctls * 100, exceptions=exceptions, sketch=sketch, codes=codes, **kwargs
+    )
     return x_cut
 
 
-def percentile(x, percentiles, exceptions=None, **kwargs):
+@cached_binning
+def percentile(x, percentiles, exceptions=None, sketch=None, codes=False, **kwargs):
     """
     Break variable by percentile
 
@@ -85,11 +105,234 @@ def percentile(x, percentiles, exceptions=None, **kwargs):
     exceptions: iterable.
         Exception values to be held out from `x`.
 
+    sketch: QuantileSketch or iterable of chunks.
+        If supplied, the percentiles are taken from this quantile sketch
+        instead of being computed from `x`.
+
+    codes: bool.
+        If True return `BinnedCodes` rather than a categorical Series.
+
+    Returns
+    -------
+    x_cut: pandas Series or BinnedCodes
+
+    """
+    return _percentile(
+        x, percentiles, exceptions=exceptions, sketch=sketch, codes=codes, **kwargs
+    )
+
+
+def _percentile(x, percentiles, exceptions=None, sketch=None, codes=False, **kwargs):
+    """
+    Uncached `percentile`, so `bins` keeps a single cache entry.
+    """
+    if sketch is not None:
+        sketch = as_sketch(sketch, exceptions=exceptions)
+        brks = sketch.quantile(np.asarray(percentiles, dtype=float) / 100)
+    else:
+        brks = np.nanpercentile(x, percentiles)
+    x_cut = breaks(x, breaks=brks, exceptions=exceptions, codes=codes, **kwargs)
+    return x_cut
+
+
+def _segment_iv(cuml_gd, cuml_bd):
+    """
+    Information value of every segment [a, b) of the pre-bins, from the
+    cumulative good and bad counts. A half count is added to empty
+    cells so every segment has a finite value.
+    """
+    gd = cuml_gd[None, :] - cuml_gd[:, None]
+    bd = cuml_bd[None, :] - cuml_bd[:, None]
+    pct_gd = (gd + 0.5) / cuml_gd[-1]
+    pct_bd = (bd + 0.5) / cuml_bd[-1]
+    return (pct_bd - pct_gd) * np.log(pct_bd / pct_gd)
+
+
+def _optimal_partition(gd, bd, max_bins, min_size, metric, monotone):
+    """
+    Dynamic program over the pre-bins, finding the partition into at most
+    `max_bins` contiguous segments that maximizes the metric.
+
+    f[c, a, b] is the best value of a partition of pre-bins [0, b) into c
+    segments whose last segment is [a, b). The cost is O(max_bins * m^3)
+    in the number of pre-bins m, and does not depend on the rows.
+    """
+    m = gd.size
+    cuml_gd = np.concatenate([[0], np.cumsum(gd)])
+    cuml_bd = np.concatenate([[0], np.cumsum(bd)])
+    cuml_n = cuml_gd + cuml_bd
+    with np.errstate(divide="ignore", invalid="ignore"):
+        seg_n = cuml_n[None, :] - cuml_n[:, None]
+        rates = (cuml_bd[None, :] - cuml_bd[:, None]) / seg_n
+    valid = np.triu(seg_n >= min_size, k=1)
+    if metric == "iv":
+        gain, combine = _segment_iv(cuml_gd, cuml_bd), np.add
+    else:
+        # The KS of a binning is the largest gap at any of its cut points,
+        # so a segment [a, b) contributes the gap at its start a.
+        ks_cut = np.abs(cuml_bd / cuml_bd[-1] - cuml_gd / cuml_gd[-1])
+        gain, combine = np.broadcast_to(ks_cut[:, None], (m + 1, m + 1)), np.maximum
+
+    f = np.full((max_bins + 1, m + 1, m + 1), -np.inf)
+    back = np.full((max_bins + 1, m + 1, m + 1), -1, dtype=int)
+    f[1, 0, :] = np.where(valid[0], gain[0], -np.inf)
+    for c in range(2, max_bins + 1):
+        for a in range(1, m):
+            prev = f[c - 1, :a, a]
+            if not np.isfinite(prev).any():
+                continue
+            cand = np.broadcast_to(prev[:, None], (a, m + 1))
+            if monotone == "increasing":
+                cand = np.where(rates[:a, a, None] <= rates[None, a, :], cand, -np.inf)
+            elif monotone == "decreasing":
+                cand = np.where(rates[:a, a, None] >= rates[None, a, :], cand, -np.inf)
+            best_k = np.argmax(cand, axis=0)
+            best = cand[best_k, np.arange(m + 1)]
+            ok = valid[a] & np.isfinite(best)
+            f[c, a, ok] = combine(best[ok], gain[a, ok])
+            back[c, a, ok] = best_k[ok]
+
+    c, a = np.unravel_index(np.argmax(f[:, :, m]), f[:, :, m].shape)
+    value = f[c, a, m]
+    assert np.isfinite(value), "No binning satisfies min_bin_size and monotone"
+    cuts, b = [m], m
+    while c > 1:
+        cuts.append(a)
+        a, b, c = back[c, a, b], a, c - 1
+    return sorted(cuts), value
+
+
+def optimal_breaks(
+    x,
+    y,
+    max_bins=10,
+    min_bin_size=0.05,
+    prebins=50,
+    metric="iv",
+    monotone="auto",
+    exceptions=None,
+):
+    """
+    Supervised optimal bin edges
+
+    `x` is first pre-binned into fine quantiles, and the good and bad
+    counts of each pre-bin are tallied. Adjacent pre-bins are then merged
+    by dynamic programming over those counts, maximizing the information
+    value or KS of the binning, subject to a minimum bin size and an
+    optional monotone bad rate. The cost of the search depends on the
+    number of pre-bins, not the number of rows.
+
+    Parameters
+    ----------
+    x: pandas Series
+    
+    y: pandas Series or array.
+        Binary performance field aligned with `x`, values in {1, 0}.
+
+    max_bins: int.
+        The maximum number of bins returned. Default is 10.
+
+    min_bin_size: float or int.
+        The minimum size of a bin. Values below one are a share of the
+        non missing, non exception rows, otherwise a count of rows.
+        Default is 0.05.
+
+    prebins: int.
+        Number of quantile pre-bins to start from. Default is 50.
+
+    metric: string {'iv', 'ks'}.
+        The metric to maximize. Default is "iv".
+
+    monotone: string {'auto', 'increasing', 'decreasing'} or None.
+        Constraint on the bad rate across bins. If `auto` both directions
+        are tried and the better is kept. If None the bad rate is not
+        constrained.
+
+    exceptions: iterable.
+        Exception values to be held out from `x`.
+
     Returns
     -------
-    x_cut: pandas Series
+    breaks: numpy array
+        Bin edges that can be passed to `breaks` or `cleancut`.
+    """
+    assert metric in ("iv", "ks"), "metric must be 'iv' or 'ks'"
+    assert monotone in (
+        "auto",
+        "increasing",
+        "decreasing",
+        None,
+    ), "monotone must be 'auto', 'increasing', 'decreasing' or None"
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    if exceptions is not None:
+        keep &= ~np.isin(x, np.asarray(exceptions, dtype=float))
+    x, y = x[keep], y[keep]
+
+    edges = np.unique(np.percentile(x, np.linspace(0, 100, prebins + 1)))
+    codes = np.clip(np.searchsorted(edges, x, side="left") - 1, 0, None)
+    n_pre = max(edges.size - 1, 1)
+    bd = np.bincount(codes, weights=y, minlength=n_pre)
+    gd = np.bincount(codes, minlength=n_pre) - bd
+    min_size = min_bin_size * x.size if min_bin_size < 1 else min_bin_size
 
+    directions = ["increasing", "decreasing"] if monotone == "auto" else [monotone]
+    results = [
+        _optimal_partition(gd, bd, max_bins, min_size, metric, d) for d in directions
+    ]
+    cuts, _ = max(results, key=lambda r: r[1])
+    return edges[[0] + cuts] if edges.size > 1 else edges
+
+
+def optimal(
+    x,
+    y,
+    max_bins=10,
+    min_bin_size=0.05,
+    prebins=50,
+    metric="iv",
+    monotone="auto",
+    exceptions=None,
+    codes=False,
+    **kwargs,
+):
     """
-    brks = np.nanpercentile(x, percentiles)
-    x_cut = breaks(x, breaks=brks, exceptions=exceptions, **kwargs)
+    Break variable into supervised optimal bins
+
+    Parameters
+    ----------
+    x: pandas Series
+
+    y: pandas Series or array.
+        Binary performance field aligned with `x`, values in {1, 0}.
+
+    max_bins, min_bin_size, prebins, metric, monotone:
+        See `optimal_breaks`.
+
+    exceptions: iterable.
+        Exception values to be held out from `x`.
+
+    codes: bool.
+        If True return `BinnedCodes` rather than a categorical Series.
+
+    **kwargs: 
+        Additional key-word arguments to pass to the pd.Cut 
+        function that is used to bin the data.
+
+    Returns
+    -------
+    x_cut: pandas Series or BinnedCodes
+    """
+    brks = optimal_breaks(
+        x,
+        y,
+        max_bins=max_bins,
+        min_bin_size=min_bin_size,
+        prebins=prebins,
+        metric=metric,
+        monotone=monotone,
+        exceptions=exceptions,
+    )
+    x_cut = breaks(x, breaks=brks, exceptions=exceptions, codes=codes, **kwargs)
     return x_cut
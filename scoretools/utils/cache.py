@@ -0,0 +1,228 @@
+import functools
+import hashlib
+import inspect
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Hashable
+from .codes import BinnedCodes
+
+
+class BinCache:
+    """
+    Least recently used cache of binned variables
+
+    Entries are evicted, least recently used first, when either the
+    number of entries or the total bytes held goes over its limit.
+
+    Parameters
+    ----------
+    max_entries: int.
+        Maximum number of binned variables to keep. Default is 128.
+
+    max_bytes: int.
+        Maximum number of bytes of codes and labels to keep.
+        Default is 256 MB.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 2 ** 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            try:
+                value, nbytes = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, old_bytes) = self._entries.popitem(last=False)
+                self.nbytes -= old_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_bin_cache: Optional[BinCache] = None
+
+
+def enable_bin_cache(max_entries: int = 128, max_bytes: int = 256 * 2 ** 20):
+    """
+    Turn on memoization of `cleancut`, `break_methods.bins` and
+    `break_methods.percentile`.
+
+    Repeated binning of the same column with the same parameters then
+    returns the cached bins instead of recomputing them. Columns are
+    matched on their length and a hash of their full contents, so any
+    change to a column's values is a miss.
+
+    Parameters
+    ----------
+    max_entries: int.
+        Maximum number of binned variables to keep. Default is 128.
+
+    max_bytes: int.
+        Maximum number of bytes of codes and labels to keep.
+        Default is 256 MB.
+    """
+    global _bin_cache
+    _bin_cache = BinCache(max_entries=max_entries, max_bytes=max_bytes)
+    return _bin_cache
+
+
+def disable_bin_cache():
+    """
+    Turn off memoization of binning, and drop any cached bins.
+    """
+    global _bin_cache
+    _bin_cache = None
+
+
+def bin_cache_info() -> Optional[Dict[str, int]]:
+    """
+    Hit, miss and size statistics of the bin cache, or None if the
+    cache is not enabled.
+    """
+    return None if _bin_cache is None else _bin_cache.info()
+
+
+def _hash_values(digest, values):
+    """
+    Add the full contents of a Series, array or BinnedCodes to a hash.
+    """
+    if isinstance(values, BinnedCodes):
+        digest.update(b"codes")
+        _hash_values(digest, values.codes)
+        _hash_values(digest, values.categories.to_numpy())
+        return
+    if isinstance(values, (pd.Series, pd.Index)) and isinstance(
+        values.dtype, pd.CategoricalDtype
+    ):
+        cat = pd.Categorical(values)
+        digest.update(b"category")
+        _hash_values(digest, cat.codes)
+        _hash_values(digest, cat.categories.to_numpy())
+        digest.update(str(cat.ordered).encode())
+        return
+    arr = np.asarray(values)
+    digest.update(f"{arr.dtype.str}{arr.shape}".encode())
+    if arr.dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(arr).view(np.uint8))
+    else:
+        hashed = pd.util.hash_pandas_object(pd.Series(arr, dtype=object), index=False)
+        digest.update(hashed.to_numpy())
+
+
+def fingerprint(x) -> tuple:
+    """
+    A fingerprint of a Series or array, from a hash of its full contents.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _hash_values(digest, x)
+    return (len(x), digest.hexdigest())
+
+
+def _normalize(value) -> Hashable:
+    """
+    Convert a binning parameter to a hashable key, raising TypeError if
+    the parameter can not be part of a key.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, np.generic)):
+        return value
+    if isinstance(value, (list, tuple, np.ndarray, pd.Index, pd.Series)):
+        return tuple(_normalize(v) for v in np.asarray(value).tolist())
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    raise TypeError(f"Can not cache on a {type(value)}")
+
+
+def cached_binning(func):
+    """
+    Decorate a binning function, whose first argument is the variable to
+    bin and which returns a categorical Series, or `BinnedCodes` when
+    called with codes=True, so its results are kept in the bin cache when
+    it is enabled. Both forms share a cache entry.
+    """
+    sig = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = _bin_cache
+        if cache is None:
+            return func(*args, **kwargs)
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        as_codes = bound.arguments.get("codes", False)
+        params = [(k, v) for k, v in bound.arguments.items() if k != "codes"]
+        variable = params[0][1]
+        try:
+            key = (
+                func.__module__,
+                func.__qualname__,
+                fingerprint(variable),
+                _normalize(dict(params[1:])),
+            )
+        except TypeError:
+            return func(*args, **kwargs)
+
+        cached = cache.get(key)
+        if cached is not None:
+            codes, dtype = cached
+            name = getattr(variable, "name", None)
+            if as_codes:
+                return BinnedCodes(
+                    codes.copy(), dtype.categories, name=name, ordered=dtype.ordered
+                )
+            return pd.Series(
+                pd.Categorical.from_codes(codes.copy(), dtype=dtype),
+                index=getattr(variable, "index", None),
+                name=name,
+            )
+
+        result = func(*args, **kwargs)
+        if isinstance(result, BinnedCodes):
+            codes, dtype = result.codes.copy(), result.dtype
+        elif isinstance(result, pd.Series) and result.dtype.name == "category":
+            codes, dtype = result.cat.codes.to_numpy(), result.dtype
+        else:
+            return result
+        cache.put(
+            key, (codes, dtype), codes.nbytes + dtype.categories.memory_usage(deep=True)
+        )
+        return result
+
+    return wrapper
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+
+def compact_dtype(n_categories: int) -> np.dtype:
+    """
+    The smallest signed integer type that holds codes for this many
+    categories, and the missing code of -1.
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class BinnedCodes:
+    """
+    A binned variable held as compact integer codes
+
+    The codes are an int8 array, or int16 when there are more than 127
+    bins, pointing into a separate table of labels in category order,
+    with -1 for a missing value. The tables in `smalltables` count the
+    codes directly with bincount, without building a pandas object per
+    row.
+
+    Parameters
+    ----------
+    codes: array of int.
+        The code of each row, -1 where the row is missing.
+
+    categories: iterable.
+        The labels of the codes, in category order.
+
+    name: str.
+        The name of the binned variable.
+
+    ordered: bool.
+        Whether the categories are ordered. Default is True.
+
+    Examples
+    --------
+    >>> binned = sts.cleancut(df["scr"], 10, codes=True)
+    >>> binned.labels
+    >>> binned.counts()
+    >>> sts.single_bivar(df, binned, "bad")
+    """
+
+    def __init__(
+        self,
+        codes,
+        categories: Iterable,
+        name: Optional[str] = None,
+        ordered: bool = True,
+    ):
+        self.categories = pd.Index(categories)
+        self.codes = np.asarray(codes).astype(
+            compact_dtype(len(self.categories)), copy=False
+        )
+        assert self.codes.ndim == 1, "codes must be one dimensional"
+        self.name = name
+        self.ordered = ordered
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "BinnedCodes":
+        """
+        Take the codes and categories of a categorical Series.
+        """
+        return cls(
+            series.cat.codes.to_numpy(),
+            series.cat.categories,
+            name=series.name,
+            ordered=series.cat.ordered,
+        )
+
+    @property
+    def dtype(self) -> pd.CategoricalDtype:
+        return pd.CategoricalDtype(self.categories, ordered=self.ordered)
+
+    @property
+    def labels(self) -> pd.DataFrame:
+        """
+        The label of each code, in category order.
+        """
+        return pd.DataFrame(
+            {"label": self.categories},
+            index=pd.RangeIndex(len(self.categories), name="code"),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + int(self.categories.memory_usage(deep=True))
+
+    def __len__(self) -> int:
+        return self.codes.size
+
+    def __repr__(self) -> str:
+        return (
+            f"BinnedCodes(name={self.name!r}, n={len(self)}, "
+            f"categories={len(self.categories)}, dtype={self.codes.dtype})"
+        )
+
+    def counts(self, weights=None) -> np.ndarray:
+        """
+        Count, or sum `weights` over, the rows of each category, leaving
+        out missing rows.
+        """
+        present = self.codes >= 0
+        if present.all():
+            idx = self.codes.astype(np.intp)
+        else:
+            idx = self.codes[present].astype(np.intp)
+            if weights is not None:
+                weights = np.asarray(weights)[present]
+        return np.bincount(idx, weights, len(self.categories))
+
+    def to_series(self, index=None) -> pd.Series:
+        """
+        The binned variable as a categorical Series.
+        """
+        return pd.Series(
+            pd.Categorical.from_codes(self.codes, dtype=self.dtype),
+            index=index,
+            name=self.name,
+        )
@@ -0,0 +1,341 @@
+import functools
+import hashlib
+import inspect
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Optional
+from .cache import _hash_values, _normalize
+from .codes import BinnedCodes
+from .utils import coerce_to_iterable
+
+_MISS = object()
+
+
+class DiskCache:
+    """
+    Content addressed cache of computed tables on disk
+
+    Each result is stored in its own NumPy .npz file, named by a hash of
+    the function, the values of its input columns and its parameters, so
+    a rerun over unchanged data finds its results whatever the names of
+    the inputs. Files are evicted, least recently used first, when the
+    directory grows over `max_bytes`. The directory is cleared when it was
+    written by another version of scoretools.
+
+    Tables are stored with their index and column labels pickled inside
+    the .npz file, so only use a cache directory you trust.
+
+    Parameters
+    ----------
+    path: str.
+        The cache directory, created if it does not exist.
+
+    max_bytes: int.
+        Maximum number of bytes of files to keep. Default is 1 GB.
+
+    version: str.
+        The version the entries are written by. Default is the installed
+        scoretools version.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int = 2 ** 30, version: Optional[str] = None
+    ):
+        if version is None:
+            from .. import __version__ as version
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(path, exist_ok=True)
+        version_file = os.path.join(path, "VERSION")
+        written_by = None
+        if os.path.isfile(version_file):
+            with open(version_file) as f:
+                written_by = f.read().strip()
+        if written_by != version:
+            self.clear()
+            with open(version_file, "w") as f:
+                f.write(version)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.path, key + ".npz")
+
+    def _entries(self):
+        with os.scandir(self.path) as it:
+            return [e for e in it if e.name.endswith(".npz") and e.is_file()]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def get(self, key: str) -> Any:
+        """
+        The arrays stored under key, or `_MISS` if there are none.
+        """
+        path = self._entry(key)
+        try:
+            with np.load(path, allow_pickle=True) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            # Loading marks the entry as recently used.
+            os.utime(path)
+        except (OSError, ValueError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return _MISS
+        with self._lock:
+            self.hits += 1
+        return arrays
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray]):
+        """
+        Store arrays under key, then evict entries over the size limit.
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            # Readers only ever see a complete file.
+            os.replace(tmp, self._entry(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove every entry from the cache directory.
+        """
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+
+    def info(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(e.stat().st_size for e in entries),
+            "max_bytes": self.max_bytes,
+            "path": self.path,
+            "version": self.version,
+        }
+
+
+_disk_cache: Optional[DiskCache] = None
+
+
+def enable_disk_cache(path: str, max_bytes: int = 2 ** 30) -> DiskCache:
+    """
+    Turn on the disk cache of `freq_tab`, `single_bivar`, `cleancut` and
+    `calc_ks` results.
+
+    A call whose input columns and parameters match an earlier call, in
+    this or an earlier session, reads the stored result instead of
+    computing it. Input columns are matched on a hash of their full
+    contents, so a rerun over unchanged data only costs the hashing and
+    a read.
+
+    Parameters
+    ----------
+    path: str.
+        The cache directory.
+
+    max_bytes: int.
+        Maximum number of bytes of files to keep. Default is 1 GB.
+
+    Examples
+    --------
+    >>> sts.enable_disk_cache("~/.cache/scoretools")
+    >>> sts.single_bivar(df, "scr_bin", "bad")  # computed and stored
+    >>> sts.single_bivar(df, "scr_bin", "bad")  # read from disk
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(os.path.expanduser(path), max_bytes=max_bytes)
+    return _disk_cache
+
+
+def disable_disk_cache():
+    """
+    Turn off the disk cache. Stored results are kept on disk.
+    """
+    global _disk_cache
+    _disk_cache = None
+
+
+def disk_cache_info() -> Optional[Dict[str, Any]]:
+    """
+    Hit, miss and size statistics of the disk cache, or None if the
+    cache is not enabled.
+    """
+    return None if _disk_cache is None else _disk_cache.info()
+
+
+def _cache_key(func, arguments, data_arg, column_args) -> str:
+    """
+    A hash of the function, its input columns and its parameters, raising
+    TypeError if a parameter can not be part of a key.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{func.__module__}.{func.__qualname__}".encode())
+    data = arguments.get(data_arg) if data_arg is not None else None
+    for name, value in arguments.items():
+        digest.update(name.encode())
+        if name == data_arg and isinstance(data, pd.DataFrame):
+            # Only the columns the call reads are part of the key.
+            for arg in column_args:
+                cols = arguments.get(arg)
+                if not isinstance(cols, (str, list, tuple)):
+                    continue
+                for col in coerce_to_iterable(cols):
+                    if isinstance(col, str) and col in data.columns:
+                        digest.update(col.encode())
+                        _hash_values(digest, data[col])
+        elif isinstance(value, (pd.Series, pd.Index, np.ndarray, BinnedCodes)):
+            _hash_values(digest, value)
+            digest.update(repr(getattr(value, "name", None)).encode())
+        else:
+            digest.update(repr(_normalize(value)).encode())
+    return digest.hexdigest()
+
+
+def _object_array(*values) -> np.ndarray:
+    arr = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        arr[i] = value
+    return arr
+
+
+def _to_arrays(result) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Arrays to store a result as, or None if it is not a type the cache
+    stores.
+    """
+    if isinstance(result, BinnedCodes):
+        return {
+            "kind": np.array("codes"),
+            "codes": result.codes,
+            "labels": _object_array(result.categories, result.name, result.ordered),
+        }
+    if isinstance(result, pd.Series) and isinstance(result.dtype, pd.CategoricalDtype):
+        return {
+            "kind": np.array("category"),
+            "codes": result.cat.codes.to_numpy(),
+            "labels": _object_array(
+                result.cat.categories, result.name, result.cat.ordered
+            ),
+        }
+    if isinstance(result, pd.DataFrame):
+        arrays = {"kind": np.array("frame")}
+        arrays["labels"] = _object_array(result.index, result.columns)
+        for i in range(result.shape[1]):
+            col = result.iloc[:, i]
+            arrays[f"c{i}"] = (
+                col.to_numpy()
+                if col.dtype.kind in "biufcmM"
+                else _object_array(*col.tolist())
+            )
+        return arrays
+    if isinstance(result, (float, int, np.number)) and not isinstance(result, bool):
+        return {"kind": np.array("scalar"), "value": np.asarray(result)}
+    return None
+
+
+def _from_arrays(arrays: Dict[str, np.ndarray], variable):
+    kind = str(arrays["kind"])
+    if kind == "scalar":
+        return arrays["value"][()]
+    labels = arrays["labels"]
+    if kind == "frame":
+        index, columns = labels
+        cols = {i: arrays[f"c{i}"] for i in range(len(columns))}
+        tbl = pd.DataFrame(cols, index=index)
+        tbl.columns = columns
+        return tbl
+    categories, name, ordered = labels
+    dtype = pd.CategoricalDtype(categories, ordered=ordered)
+    if kind == "codes":
+        return BinnedCodes(arrays["codes"], categories, name=name, ordered=ordered)
+    # A binned Series keeps the index and name of the variable binned.
+    return pd.Series(
+        pd.Categorical.from_codes(arrays["codes"], dtype=dtype),
+        index=getattr(variable, "index", None),
+        name=getattr(variable, "name", name),
+    )
+
+
+def disk_cached(data_arg: Optional[str] = None, column_args: Iterable[str] = ()):
+    """
+    Decorate a function so its results are kept in the disk cache when it
+    is enabled.
+
+    Parameters
+    ----------
+    data_arg: str.
+        The name of the argument holding a DataFrame. Only the columns
+        named by `column_args` are hashed into the key, not the whole
+        DataFrame.
+
+    column_args: iterable of str.
+        The names of arguments that hold column names of `data_arg`.
+
+    A categorical Series result takes the index of the first argument
+    of the call, as the binning functions return.
+    """
+    column_args = tuple(column_args)
+
+    def decorate(func):
+        sig = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = _disk_cache
+            if cache is None:
+                return func(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                key = _cache_key(func, bound.arguments, data_arg, column_args)
+            except TypeError:
+                return func(*args, **kwargs)
+            variable = next(iter(bound.arguments.values()))
+            arrays = cache.get(key)
+            if arrays is not _MISS:
+                return _from_arrays(arrays, variable)
+            result = func(*args, **kwargs)
+            arrays = _to_arrays(result)
+            if arrays is not None:
+                cache.put(key, arrays)
+            return result
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+
+class HeavyHitterSketch:
+    """
+    Mergeable sketch of the most frequent levels of a column
+
+    A Misra-Gries summary that keeps counts for at most `capacity`
+    levels of a high cardinality column, such as a ZIP code or merchant
+    ID, read in chunks. Each chunk is counted exactly and added to the
+    kept counts. When more than `capacity` levels are held, the count of
+    the level just past capacity is taken off every level, and levels
+    left with no count are dropped.
+
+    A kept count is never more than the true count, and is short of it
+    by at most `error`, which is no more than n / (capacity + 1). Any
+    level with a share of the rows above 1 / (capacity + 1) is kept.
+    Missing values are counted separately and exactly.
+
+    Parameters
+    ----------
+    capacity: int.
+        The most levels kept. Default is set to 1000.
+
+    name: str.
+        The name of the column, taken from the first Series added if
+        not given.
+
+    Examples
+    --------
+    >>> sketch = sts.HeavyHitterSketch(capacity=1000)
+    >>> for chunk in pd.read_csv("big.csv", usecols=["zip"], chunksize=10**6):
+    ...     sketch.update(chunk["zip"])
+    >>> sts.freq_tab(sketch, top=50, sort_by="frequency")
+    """
+
+    def __init__(self, capacity: int = 1000, name: Optional[str] = None):
+        assert capacity >= 1, "capacity must be at least 1"
+        self.capacity = capacity
+        self.name = name
+        self.n = 0
+        self.n_missing = 0
+        self.error = 0
+        self._counts = pd.Series(dtype=np.int64)
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable, capacity: int = 1000, name: Optional[str] = None
+    ) -> "HeavyHitterSketch":
+        """
+        Build a sketch from an iterable of array like chunks.
+        """
+        sketch = cls(capacity=capacity, name=name)
+        for chunk in chunks:
+            sketch.update(chunk)
+        return sketch
+
+    def update(self, values, weights=None):
+        """
+        Add values to the sketch.
+
+        Parameters
+        ----------
+        values: array like, or pandas Series.
+
+        weights: array like.
+            Frequency weight of each value. If None, each value has a
+            weight of one.
+        """
+        if isinstance(values, pd.Series):
+            if self.name is None:
+                self.name = values.name
+        else:
+            values = pd.Series(np.asarray(values).ravel())
+        missing = values.isna().to_numpy()
+        if weights is None:
+            counts = values.value_counts(dropna=True, sort=False)
+            n_missing = int(missing.sum())
+        else:
+            wgt = np.asarray(weights).ravel()
+            counts = (
+                pd.Series(wgt, index=values.index)
+                .groupby(values, dropna=True, observed=True, sort=False)
+                .sum()
+            )
+            n_missing = wgt[missing].sum()
+        self.n += counts.sum() + n_missing
+        self.n_missing += n_missing
+        self._add(counts)
+        return self
+
+    def merge(self, other: "HeavyHitterSketch"):
+        """
+        Merge another sketch into this one.
+        """
+        assert isinstance(other, HeavyHitterSketch), (
+            "Can only merge a HeavyHitterSketch"
+        )
+        self.n += other.n
+        self.n_missing += other.n_missing
+        self.error += other.error
+        self._add(other._counts)
+        return self
+
+    def _add(self, counts: pd.Series):
+        counts = pd.Series(counts.to_numpy(), index=pd.Index(counts.index, dtype=object))
+        if self._counts.size:
+            counts = pd.concat([self._counts, counts]).groupby(level=0, sort=False).sum()
+        if counts.size > self.capacity:
+            threshold = counts.nlargest(self.capacity + 1).iloc[-1]
+            counts = counts[counts > threshold] - threshold
+            self.error += threshold
+        self._counts = counts
+
+    def counts(self) -> pd.Series:
+        """
+        The kept counts, most frequent first.
+        """
+        counts = self._counts.sort_values(ascending=False, kind="stable")
+        return counts.rename_axis(self.name).rename("count")
+
+    def top(self, k: Optional[int] = None) -> pd.Series:
+        """
+        The counts of the k most frequent levels kept.
+        """
+        return self.counts().iloc[:k]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._counts.memory_usage(deep=True))
+
+    def __len__(self) -> int:
+        return self._counts.size
+
+    def __repr__(self) -> str:
+        return (
+            f"HeavyHitterSketch(name={self.name!r}, capacity={self.capacity}, "
+            f"n={self.n}, kept={len(self)}, error={self.error})"
+        )
@@ -0,0 +1,92 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Optional, Any
+
+logger = logging.getLogger("scoretools")
+
+
+class TaskGraph:
+    """
+    A dependency graph of tasks, run on a pool of worker threads
+
+    Each task is a callable that receives the results of its
+    dependencies as positional arguments, in the order they were
+    given. A task is started as soon as all of its dependencies have
+    finished, so independent tasks run concurrently, and every task
+    runs exactly once however many tasks depend on it.
+
+    Examples
+    --------
+    >>> graph = TaskGraph()
+    >>> graph.add("data", lambda: pd.read_csv("scores.csv"))
+    >>> graph.add("bins", lambda d: sts.cleancut(d["scr"], 10), ["data"])
+    >>> results = graph.run(max_workers=4)
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, tuple] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, func: Callable, deps: Iterable[str] = ()):
+        assert name not in self._tasks, f"Task {name} is already in the graph"
+        self._tasks[name] = (func, list(deps))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tasks
+
+    def _check(self):
+        for name, (_, deps) in self._tasks.items():
+            missing = [d for d in deps if d not in self._tasks]
+            assert not missing, f"Task {name} depends on unknown tasks {missing}"
+
+    def _timed(self, name: str, func: Callable, args: list):
+        start = time.perf_counter()
+        result = func(*args)
+        self.timings[name] = time.perf_counter() - start
+        logger.info("%s finished in %.3fs", name, self.timings[name])
+        return result
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run every task, returning a dict of task name to result.
+
+        Parameters
+        ----------
+        max_workers: int or None.
+            Number of worker threads. If 1, tasks run one after another
+            in the calling thread.
+        """
+        self._check()
+        results: Dict[str, Any] = {}
+        pending = dict(self._tasks)
+
+        def ready():
+            return [
+                name
+                for name, (_, deps) in pending.items()
+                if all(d in results for d in deps)
+            ]
+
+        if max_workers == 1:
+            while pending:
+                names = ready()
+                assert names, f"Tasks {list(pending)} have a cyclic dependency"
+                for name in names:
+                    func, deps = pending.pop(name)
+                    results[name] = self._timed(name, func, [results[d] for d in deps])
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in ready():
+                    func, deps = pending.pop(name)
+                    fut = pool.submit(self._timed, name, func, [results[d] for d in deps])
+                    running[fut] = name
+                assert running, f"Tasks {list(pending)} have a cyclic dependency"
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    # Raises the error of a failed task in the calling thread.
+                    results[running.pop(fut)] = fut.result()
+        return results
@@ -0,0 +1,179 @@
+import numpy as np
+from typing import Iterable, Optional, Union
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch
+
+    A KLL style sketch that summarizes a numeric stream with a bounded
+    number of retained values. Values can be added incrementally from
+    chunks, and sketches built on separate chunks can be merged. The
+    rank error of a quantile is on the order of 1/k, while the state
+    kept grows only with log(n).
+
+    Missing values, and optionally exception values, are dropped when
+    the sketch is updated. The minimum and maximum are tracked exactly.
+
+    Parameters
+    ----------
+    k: int.
+        Accuracy parameter, the capacity of the top level compactor.
+        Default is set to 200.
+
+    seed: int or None.
+        Seed for the random compaction offsets.
+
+    Examples
+    --------
+    >>> sketch = sts.QuantileSketch()
+    >>> for chunk in pd.read_csv("big.csv", usecols=["score"], chunksize=10**6):
+    ...     sketch.update(chunk["score"])
+    >>> sketch.quantile([0.25, 0.5, 0.75])
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        assert k >= 8, "k must be at least 8"
+        self.k = k
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: Iterable,
+        k: int = 200,
+        exceptions: Optional[Iterable] = None,
+        seed: Optional[int] = None,
+    ) -> "QuantileSketch":
+        """
+        Build a sketch from an iterable of array like chunks.
+        """
+        sketch = cls(k=k, seed=seed)
+        for chunk in chunks:
+            sketch.update(chunk, exceptions=exceptions)
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values, exceptions: Optional[Iterable] = None):
+        """
+        Add values to the sketch.
+
+        Parameters
+        ----------
+        values: array like of numeric values.
+
+        exceptions: iterable.
+            Exception values to leave out of the sketch.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if exceptions is not None:
+            values = values[~np.isin(values, np.asarray(exceptions, dtype=float))]
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Merge another sketch into this one.
+        """
+        assert isinstance(other, QuantileSketch), "Can only merge a QuantileSketch"
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, buf in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], buf])
+        self.n += other.n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        """
+        Compact every level above its capacity, promoting every other
+        sorted value to the level above, until all levels fit.
+        """
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self._levels)):
+                buf = self._levels[level]
+                if buf.size <= self._capacity(level):
+                    continue
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                buf = np.sort(buf)
+                # An odd value stays behind so total weight is exact.
+                keep = buf[:1] if buf.size % 2 else buf[:0]
+                buf = buf[keep.size :]
+                promote = buf[self._rng.integers(2) :: 2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate(
+                    [self._levels[level + 1], promote]
+                )
+                compacted = True
+
+    def quantile(self, q: Union[float, Iterable[float]]) -> np.ndarray:
+        """
+        Approximate quantiles of the values seen.
+
+        Parameters
+        ----------
+        q: float or iterable of floats in the range [0,1].
+
+        Returns
+        -------
+        quantiles: numpy array, or a float if q is a float.
+        """
+        q_arr = np.atleast_1d(np.asarray(q, dtype=float))
+        assert ((q_arr >= 0) & (q_arr <= 1)).all(), "q must be in range [0,1]"
+        if self.n == 0:
+            res = np.full(q_arr.shape, np.nan)
+        else:
+            items = np.concatenate(self._levels)
+            weights = np.concatenate(
+                [np.full(buf.size, 2.0 ** lvl) for lvl, buf in enumerate(self._levels)]
+            )
+            order = np.argsort(items, kind="stable")
+            items, cuml_w = items[order], np.cumsum(weights[order])
+            idx = np.searchsorted(cuml_w, q_arr * cuml_w[-1], side="left")
+            res = items[np.clip(idx, 0, items.size - 1)]
+            res = np.where(q_arr == 0, self.min, np.where(q_arr == 1, self.max, res))
+        return res if np.ndim(q) else float(res[0])
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used by the retained values.
+        """
+        return sum(buf.nbytes for buf in self._levels)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(k={self.k}, n={self.n}, retained={sum(b.size for b in self._levels)})"
+
+
+def as_sketch(
+    source, k: int = 200, exceptions: Optional[Iterable] = None
+) -> QuantileSketch:
+    """
+    Return source if it is a QuantileSketch, otherwise treat source as
+    an iterable of chunks and build a sketch from it.
+    """
+    if isinstance(source, QuantileSketch):
+        return source
+    return QuantileSketch.from_chunks(source, k=k, exceptions=exceptions)
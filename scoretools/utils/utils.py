@@ -25,3 +25,17 @@ def all_integers_or_character(x):
     except TypeError:
         return None
     return np.sum(decimals) > 0
+
+
+def get_weight(weight, data=None) -> pd.Series:
+    """
+    Return the frequency weight as a Series. weight may be the name of a
+    field in data, or a Series or array aligned with data.
+    """
+    if isinstance(weight, str):
+        assert data is not None, "data must be supplied if weight is a name"
+        return data[weight]
+    if isinstance(weight, pd.Series):
+        return weight
+    index = data.index if data is not None else None
+    return pd.Series(np.asarray(weight), index=index)
@@ -8,5 +8,6 @@ setuptools.setup(
     description="Tools for testing the value of credit scores.",
     packages=setuptools.find_packages(),
     install_requires=["pandas", "numpy", "matplotlib", "xlsxwriter"],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
+    entry_points={"console_scripts": ["scoretools=scoretools.cli:main"]},
 )
@@ -0,0 +1,89 @@
+import scoretools as sts
+import pandas as pd
+import json
+import os
+import pytest
+
+
+@pytest.fixture
+def small_table():
+    stbl = pd.DataFrame(
+        {"A": ["a", "b"], "B": [1, 2], "B Pct": [0.25, 0.75]},
+        index=["Small", "Large"],
+    ).rename_axis("Value")
+    return stbl
+
+
+def test_xlsx_stream(small_table):
+    wb = sts.TableWriter(backend="xlsx_stream")
+    wb.write_table(small_table)
+    wb.write_table(small_table, sheetname="Other")
+    path = wb._workbook.filename
+    wb.close()
+    assert wb.worksheet_names() == ["Sheet1", "Other"]
+    file_read: pd.DataFrame = pd.read_excel(
+        path, engine="openpyxl", sheet_name=None
+    )
+    small_table = small_table.reset_index()
+    assert file_read["Sheet1"].equals(small_table)
+    assert file_read["Other"].equals(small_table)
+
+
+def test_xlsx_stream_writes_rows_out(small_table):
+    wb = sts.TableWriter(backend="xlsx_stream")
+    for _ in range(3):
+        wb.write_table(small_table)
+    # A table beside the last one shares its rows.
+    wb.write_table(small_table, row=10, col=6)
+    # Only the rows of the last tables are held, the rest are written out.
+    assert sorted(wb._workbook._rows["Sheet1"]) == [10, 11, 12]
+    with pytest.raises(AssertionError, match="already written"):
+        wb.write_table(small_table, row=0, col=10)
+    wb.close()
+    file_read = pd.read_excel(wb._workbook.filename, engine="openpyxl", header=None)
+    assert file_read.shape == (13, 10)
+    assert file_read.iloc[10, 6:].tolist() == ["Value", "A", "B", "B Pct"]
+    wb.cleanup()
+
+
+def test_backend_is_abstract():
+    class Incomplete(sts.backends.TableBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_csv_bundle(small_table, tmp_path):
+    path = str(tmp_path / "bundle")
+    wb = sts.TableWriter(path, backend="csv")
+    wb.write_table(small_table)
+    wb.write_table(small_table, index=False)
+    wb.close()
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    assert [m["row"] for m in manifest] == [0, 5]
+    assert manifest[0]["pct_columns"] == ["B Pct"]
+    file_read = pd.read_csv(os.path.join(path, manifest[0]["file"]))
+    assert file_read.equals(small_table.reset_index())
+
+
+def test_parquet_bundle(small_table, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "bundle")
+    wb = sts.TableWriter(path, backend="parquet")
+    wb.write_table(small_table)
+    wb.close()
+    file_read = pd.read_parquet(os.path.join(path, "Sheet1_001.parquet"))
+    assert file_read.equals(small_table.reset_index())
+
+
+def test_html(small_table, tmp_path):
+    path = str(tmp_path / "report.html")
+    wb = sts.TableWriter(path, backend="html")
+    wb.write_table(small_table)
+    wb.close()
+    with open(path) as f:
+        html = f.read()
+    assert "<h2>Sheet1</h2>" in html
+    assert "75.00%" in html
@@ -0,0 +1,145 @@
+import scoretools as sts
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from scoretools.utils import break_methods
+
+
+@pytest.fixture
+def score_data():
+    rng = np.random.default_rng(123)
+    scr = rng.integers(300, 850, size=20_000)
+    flag = (rng.uniform(size=scr.size) < 1 / (1 + np.exp((scr - 500) / 60))).astype(int)
+    scr[:500] = 9999
+    return pd.DataFrame({"scr": scr, "flag": flag})
+
+
+def test_optimal_breaks(score_data):
+    brks = break_methods.optimal_breaks(
+        score_data["scr"], score_data["flag"], max_bins=6, exceptions=[9999]
+    )
+    assert 2 < brks.size <= 7
+    x_cut = break_methods.breaks(score_data["scr"], brks, exceptions=[9999])
+    rates = score_data.groupby(x_cut, observed=True)["flag"].mean()
+    assert rates.iloc[:-1].is_monotonic_decreasing
+    assert (x_cut.value_counts().iloc[:-1] / score_data.shape[0] >= 0.05).all()
+    # Edges are consumed by cleancut directly.
+    cc = sts.cleancut(score_data["scr"], brks, exceptions=[9999])
+    assert cc.value_counts()[9999] == 500
+
+
+def test_optimal_matches_brute_force(score_data):
+    x, y = score_data["scr"].iloc[500:], score_data["flag"].iloc[500:]
+    brks = break_methods.optimal_breaks(
+        x, y, max_bins=3, prebins=8, monotone=None, min_bin_size=1
+    )
+    edges = np.unique(np.percentile(x, np.linspace(0, 100, 9)))
+
+    def iv(cut):
+        tab = pd.crosstab(pd.cut(x, cut, include_lowest=True), y) + 0.5
+        pct = tab / (tab.sum() - 0.5 * tab.shape[0])
+        return ((pct[1] - pct[0]) * np.log(pct[1] / pct[0])).sum()
+
+    best = max(
+        (iv(edges[[0, *c, -1]]), c)
+        for n in range(3)
+        for c in itertools.combinations(range(1, edges.size - 1), n)
+    )
+    assert iv(brks) == pytest.approx(best[0])
+
+
+def test_bin_cache(score_data):
+    cache = sts.enable_bin_cache(max_entries=2)
+    try:
+        first = sts.cleancut(score_data["scr"], 5, exceptions=[9999])
+        second = sts.cleancut(score_data["scr"], 5, exceptions=[9999])
+        assert cache.info()["hits"] == 1
+        pd.testing.assert_series_equal(first, second)
+
+        # Changing a parameter or the data is a miss.
+        sts.cleancut(score_data["scr"], 4, exceptions=[9999])
+        sts.cleancut(score_data["scr"] + 1, 5, exceptions=[9999])
+        info = sts.bin_cache_info()
+        assert (info["hits"], info["misses"]) == (1, 3)
+        assert info["entries"] == 2 and info["evictions"] == 1
+
+        pctl = break_methods.percentile(score_data["scr"], [0, 50, 100])
+        pd.testing.assert_series_equal(
+            pctl, break_methods.percentile(score_data["scr"], [0, 50, 100])
+        )
+
+        # bins keeps one entry, not one for itself and one for percentile.
+        cache.clear()
+        break_methods.bins(score_data["scr"], 4)
+        assert cache.info()["entries"] == 1
+    finally:
+        sts.disable_bin_cache()
+    assert sts.bin_cache_info() is None
+
+
+def test_binned_codes(score_data):
+    score_data["wgt"] = np.arange(score_data.shape[0]) % 3 + 1
+    series = sts.cleancut(score_data["scr"], 8, exceptions=[9999])
+    binned = sts.cleancut(score_data["scr"], 8, exceptions=[9999], codes=True)
+    assert binned.codes.dtype == np.int8
+    assert list(binned.labels["label"]) == list(series.cat.categories)
+    pd.testing.assert_series_equal(binned.to_series(), series)
+    for weight in [None, score_data["wgt"]]:
+        pd.testing.assert_frame_equal(
+            sts.freq_tab(binned, weight=weight),
+            sts.freq_tab(series, weight=weight),
+            check_index_type=False,
+        )
+        pd.testing.assert_frame_equal(
+            sts.single_bivar(score_data, binned, "flag", weight=weight),
+            sts.single_bivar(score_data.assign(scr=series), "scr", "flag", weight=weight),
+            check_dtype=False,
+        )
+    wide = break_methods.bins(score_data["scr"], 200, codes=True)
+    assert wide.codes.dtype == np.int16
+    # Missing values are code -1 and are left out of the counts.
+    x = score_data["scr"].where(score_data["scr"] < 800)
+    brk = break_methods.breaks(x, [300, 500, 800], codes=True)
+    assert (brk.codes == -1).sum() == x.isna().sum()
+    assert brk.counts().sum() == x.notna().sum()
+    assert sts.freq_tab(brk).loc["Missing", "Frequency"] == x.isna().sum()
+
+
+def test_bin_cache_codes(score_data):
+    sts.enable_bin_cache()
+    try:
+        series = sts.cleancut(score_data["scr"], 5)
+        binned = sts.cleancut(score_data["scr"], 5, codes=True)
+        assert sts.bin_cache_info()["hits"] == 1
+        assert isinstance(binned, sts.BinnedCodes)
+        pd.testing.assert_series_equal(binned.to_series(), series)
+    finally:
+        sts.disable_bin_cache()
+
+
+
+def test_bin_cache_full_contents():
+    from scoretools.utils.cache import fingerprint
+
+    # Columns that differ only at rows a strided sample would skip.
+    grade = pd.Series(np.tile(["A", "B"], 5_000))
+    other = grade.copy()
+    other.iloc[[1, 2]] = "C"
+    assert fingerprint(grade) != fingerprint(other)
+    assert fingerprint(grade.astype("category")) != fingerprint(other.astype("category"))
+    # The same values in another order, with the same sum.
+    scr = pd.Series(np.arange(10_000, dtype=float))
+    swapped = scr.copy()
+    swapped.iloc[[1, 9_998]] = swapped.iloc[[9_998, 1]].to_numpy()
+    assert fingerprint(scr) != fingerprint(swapped)
+    assert fingerprint(scr) == fingerprint(scr.copy())
+
+    sts.enable_bin_cache()
+    try:
+        sts.cleancut(scr, 4)
+        cut = sts.cleancut(swapped, 4)
+        assert sts.bin_cache_info()["hits"] == 0
+    finally:
+        sts.disable_bin_cache()
+    pd.testing.assert_series_equal(cut, sts.cleancut(swapped, 4))
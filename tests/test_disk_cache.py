@@ -0,0 +1,79 @@
+import scoretools as sts
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scoretools.plots import calc_ks
+from scoretools.utils.disk_cache import DiskCache, _MISS
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(2)
+    n = 20_000
+    dat = pd.DataFrame({"scr": rng.integers(300, 851, n).astype(float)})
+    dat["bad"] = (rng.uniform(size=n) < 1 / (1 + np.exp((dat["scr"] - 550) / 60))).astype(int)
+    dat["scr_bin"] = sts.cleancut(dat["scr"], 5)
+    return dat
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield sts.enable_disk_cache(str(tmp_path / "cache"))
+    sts.disable_disk_cache()
+
+
+def test_disk_cache(data, cache):
+    first = (
+        sts.single_bivar(data, "scr_bin", "bad"),
+        sts.freq_tab("scr_bin", data=data),
+        sts.cleancut(data["scr"], 5),
+        sts.cleancut(data["scr"], 5, codes=True),
+        calc_ks(data, "bad", "scr", True),
+    )
+    assert sts.disk_cache_info()["entries"] == 5
+    # A renamed frame with the same values reads every result back.
+    renamed = data.copy()
+    renamed.index = renamed.index + 100
+    second = (
+        sts.single_bivar(renamed, "scr_bin", "bad"),
+        sts.freq_tab("scr_bin", data=renamed),
+        sts.cleancut(renamed["scr"], 5),
+        sts.cleancut(renamed["scr"], 5, codes=True),
+        calc_ks(renamed, "bad", "scr", True),
+    )
+    assert sts.disk_cache_info()["hits"] == 5
+    pd.testing.assert_frame_equal(first[0], second[0])
+    pd.testing.assert_frame_equal(first[1], second[1])
+    assert second[2].index.equals(renamed.index)
+    assert (second[2].cat.codes.to_numpy() == first[2].cat.codes.to_numpy()).all()
+    assert second[2].dtype == first[2].dtype
+    assert (second[3].codes == first[3].codes).all()
+    assert second[3].categories.equals(first[3].categories)
+    assert second[4] == first[4]
+
+    # Changed values or parameters are computed again.
+    changed = data.copy()
+    changed.loc[0, "bad"] = 1 - changed.loc[0, "bad"]
+    sts.single_bivar(changed, "scr_bin", "bad")
+    sts.single_bivar(data, "scr_bin", "bad", na_last=True)
+    assert sts.disk_cache_info()["hits"] == 5
+    assert sts.disk_cache_info()["entries"] == 7
+
+
+def test_disk_cache_eviction_and_version(tmp_path):
+    path = str(tmp_path / "cache")
+    cache = DiskCache(path, max_bytes=3_500, version="1")
+    for key in "abcd":
+        cache.put(key, {"value": np.zeros(100)})
+        os.utime(os.path.join(path, key + ".npz"), (0, ord(key)))
+    # Each entry is about 1 KB, so only three fit.
+    assert cache.info()["entries"] == 3
+    assert cache.get("a") is _MISS and cache.evictions == 1
+    cache.get("b")
+    cache.put("e", {"value": np.zeros(100)})
+    remaining = sorted(e.name for e in cache._entries())
+    assert remaining == ["b.npz", "d.npz", "e.npz"]
+
+    assert DiskCache(path, version="1").info()["entries"] == 3
+    assert DiskCache(path, version="2").info()["entries"] == 0
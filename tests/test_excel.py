@@ -1,6 +1,13 @@
 import scoretools as sts
+import asyncio
+import gc
+import io
+import os
+import zipfile
+import numpy as np
 import pandas as pd
 import pytest
+from xlsxwriter.exceptions import FileCreateError
 
 
 @pytest.fixture
@@ -67,3 +74,90 @@ def test_worksheet_names(small_table):
     wb.add_worksheet("newsheet2")
     wb.add_worksheet("newsheet3")
     assert wb.worksheet_names() == ["newsheet1", "newsheet2", "newsheet3"]
+
+
+def test_gains_chart(tmp_path, small_table):
+    rng = np.random.default_rng(3)
+    n = 200_000
+    dat = pd.DataFrame({"scr1": rng.normal(size=n), "scr2": rng.normal(size=n)})
+    dat["bad"] = (rng.uniform(size=n) < 1 / (1 + np.exp(2 * dat["scr1"]))).astype(int)
+    path = tmp_path / "gains.xlsx"
+    wb = sts.TableWriter(str(path))
+    wb.write_table(small_table, sheetname="Gains")
+    wb.write_gains_chart(dat, "bad", ["scr1", "scr2"], points=100, sheetname="Gains")
+    wb.write_gains_chart(dat, "bad", "scr1", kind="ks", dof=0.5, sheetname="Gains")
+    wb.write_table(small_table, sheetname="Gains")
+    wb.close()
+
+    assert path.stat().st_size < 100_000
+    with zipfile.ZipFile(path) as zf:
+        charts = [f for f in zf.namelist() if f.startswith("xl/charts/chart")]
+        workbook_xml = zf.read("xl/workbook.xml").decode()
+    assert len(charts) == 2
+    assert 'name="ChartData" sheetId="2" state="hidden"' in workbook_xml
+    chart_data = pd.read_excel(path, sheet_name="ChartData", engine="openpyxl")
+    assert chart_data["scr1<>bad pct_file"].count() == 101
+    assert chart_data["scr1<>bad pct_file"].max() == pytest.approx(1)
+    # Tables written after a chart go below it.
+    gains = pd.read_excel(path, sheet_name="Gains", header=None, engine="openpyxl")
+    assert gains.shape[0] > 2 * 15
+
+
+def test_in_memory(small_table):
+    with sts.TableWriter(in_memory=True) as wb:
+        wb.write_table(small_table)
+    content = wb.close()
+    assert isinstance(content, bytes)
+    file_read = pd.read_excel(io.BytesIO(content), engine="openpyxl")
+    assert file_read.equals(small_table.reset_index())
+
+
+def test_close_async(small_table, tmp_path):
+    wb = sts.TableWriter(in_memory=True)
+    wb.write_table(small_table)
+    future = wb.close_async()
+    assert wb.closed and wb.close_async() is future
+    with pytest.raises(AssertionError):
+        wb.write_table(small_table)
+    content = future.result()
+    assert wb.close() == content
+    file_read = pd.read_excel(io.BytesIO(content), engine="openpyxl")
+    assert file_read.equals(small_table.reset_index())
+
+    path = tmp_path / "async.xlsx"
+    wb = sts.TableWriter(str(path))
+    wb.write_table(small_table)
+    assert asyncio.run(wb.aclose()) is None
+    assert zipfile.is_zipfile(path)
+
+    # Errors closing the workbook are raised when the result is taken.
+    wb = sts.TableWriter(str(tmp_path / "missing" / "bad.xlsx"))
+    wb.write_table(small_table)
+    future = wb.close_async()
+    with pytest.raises(FileCreateError):
+        future.result()
+    with pytest.raises(FileCreateError):
+        wb.close()
+
+
+def test_temporary_file_cleanup(small_table):
+    wb = sts.TableWriter()
+    wb.write_table(small_table)
+    wb.close()
+    path = wb._workbook.filename
+    assert os.path.exists(path)
+    wb.cleanup()
+    assert not os.path.exists(path)
+
+    wb = sts.TableWriter(backend="csv")
+    wb.write_table(small_table)
+    wb.close()
+    path = wb._workbook.filename
+    del wb
+    gc.collect()
+    assert not os.path.exists(path)
+
+    with sts.TableWriter() as wb:
+        wb.write_table(small_table)
+        path = wb._workbook.filename
+    assert not os.path.exists(path)
@@ -0,0 +1,95 @@
+import scoretools as sts
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+from scoretools import plots
+
+
+@pytest.fixture(scope="module")
+def big_data():
+    rng = np.random.default_rng(123)
+    n = 500_000
+    dat = pd.DataFrame(
+        {
+            "scr": rng.normal(size=n),
+            "bad": (rng.uniform(size=n) < 0.1).astype(int),
+            "wgt": rng.integers(1, 5, size=n),
+        }
+    )
+    dat["scr_bin"] = sts.cleancut(dat["scr"], 10, digits=2)
+    dat.loc[:100, "scr"] = np.nan
+    return dat
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("weight", [None, "wgt"])
+def test_low_memory_results_match(big_data, weight):
+    pd.testing.assert_frame_equal(
+        sts.single_bivar(big_data, "scr_bin", "bad", weight=weight),
+        sts.single_bivar(big_data, "scr_bin", "bad", weight=weight, low_memory=True),
+        check_dtype=False,
+        check_index_type=False,
+    )
+    for ascending in [True, False]:
+        full = plots._prep_data_gplot(
+            big_data, None, None, "bad", "scr", ascending, weight=weight
+        )
+        lowm = plots._prep_data_gplot(
+            big_data, None, None, "bad", "scr", ascending, weight=weight, low_memory=True
+        )
+        assert np.allclose(full["pct_file"], lowm["pct_file"], atol=1e-6)
+        assert np.allclose(full["cuml_perf"], lowm["cuml_perf"], atol=1e-6)
+        assert plots.calc_ks(
+            big_data, "bad", "scr", ascending, weight=weight, low_memory=True
+        ) == pytest.approx(plots.calc_ks(big_data, "bad", "scr", ascending, weight=weight))
+
+
+def test_low_memory_peak(big_data):
+    calls = [
+        lambda lm: sts.single_bivar(big_data, "scr_bin", "bad", low_memory=lm),
+        lambda lm: plots._prep_data_gplot(
+            big_data, None, None, "bad", "scr", True, low_memory=lm
+        ),
+        lambda lm: plots.calc_ks(big_data, "bad", "scr", True, low_memory=lm),
+    ]
+    for call in calls:
+        full = _peak_memory(lambda: call(False))
+        lowm = _peak_memory(lambda: call(True))
+        assert lowm < 0.8 * full
+
+
+@pytest.mark.parametrize("weight", [None, "wgt"])
+def test_low_memory_blocks(big_data, weight):
+    from scoretools.smalltables import _bivar_low_memory
+
+    dat = big_data.assign(
+        bad_f=big_data["bad"].astype(float).where(big_data.index % 7 != 0),
+        bad_b=big_data["bad"].astype(bool),
+    )
+    binned = sts.cleancut(dat["scr"], 10, digits=2, codes=True)
+    for bivar in ["bad", "bad_f", "bad_b"]:
+        exp = sts.single_bivar(
+            dat.assign(scr_bin=binned.to_series()), "scr_bin", bivar, weight=weight
+        )
+        whole, whole_rate = _bivar_low_memory(dat, binned, bivar, "Missing", weight)
+        parts, parts_rate = _bivar_low_memory(
+            dat, binned, bivar, "Missing", weight, block=30_000
+        )
+        pd.testing.assert_frame_equal(whole, parts)
+        assert whole_rate == pytest.approx(parts_rate)
+        exp = exp.loc[whole.index.astype(str)]
+        assert np.allclose(whole.to_numpy(dtype=float), exp.to_numpy(dtype=float))
+    # Unweighted counts of a 0/1 bivar are exact integers.
+    if weight is None:
+        assert whole["N"].dtype.kind == "i"
+        tbl, _ = _bivar_low_memory(dat, binned, "bad", "Missing", None)
+        assert tbl["bad sum"].dtype.kind == "i"
@@ -0,0 +1,61 @@
+import scoretools as sts
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scoretools.plots import calc_ks
+
+
+@pytest.fixture
+def daily_batches():
+    rng = np.random.default_rng(11)
+    days = pd.date_range("2024-01-01", periods=10)
+    frames = []
+    for day in days:
+        scr = rng.integers(300, 851, size=2_000)
+        bad = (rng.uniform(size=scr.size) < 1 / (1 + np.exp((scr - 550) / 50))).astype(int)
+        frames.append(pd.DataFrame({"day": day, "scr": scr, "bad": bad}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_monitor_window(daily_batches, tmp_path):
+    mon = sts.ScoreMonitor(range(300, 851), window=7)
+    for day, batch in daily_batches.groupby("day"):
+        mon.update(day, batch["scr"], batch["bad"])
+    assert len(mon.days) == 7
+    recent = daily_batches[daily_batches["day"] >= mon.days[0]]
+
+    counts = mon.counts()
+    assert counts["N"].sum() == recent.shape[0]
+    assert counts["Bads"].sum() == recent["bad"].sum()
+    # KS at score value boundaries is at most the KS of any row ordering.
+    for asc in [True, False]:
+        assert mon.ks(ascending=asc) == pytest.approx(
+            calc_ks(recent, "bad", "scr", asc), abs=0.01
+        )
+
+    dist = mon.distribution(bands=[300, 500, 650, 850])
+    band = pd.cut(recent["scr"], [300, 500, 650, 850, np.inf], right=False)
+    assert dist["Frequency"].tolist() == band.value_counts(sort=False).tolist()
+    assert dist["bad Rate"].tolist() == pytest.approx(
+        recent.groupby(band, observed=False)["bad"].mean().tolist()
+    )
+    last3 = mon.counts(days=3)
+    assert last3["N"].sum() == (daily_batches["day"] >= mon.days[-3]).sum()
+
+    # Days before the window are rejected.
+    with pytest.raises(AssertionError):
+        mon.update("2024-01-02", [500], [1])
+
+    mon.save(tmp_path / "monitor.npz")
+    loaded = sts.ScoreMonitor.load(tmp_path / "monitor.npz")
+    pd.testing.assert_frame_equal(loaded.counts(), counts)
+    assert loaded.ks() == mon.ks()
+    loaded.update("2024-01-11", [500], [1])
+    assert len(loaded.days) == 7
+
+    # A path without the .npz suffix is written and read as given.
+    mon.save(str(tmp_path / "monitor_state"))
+    assert os.listdir(tmp_path).count("monitor_state") == 1
+    loaded = sts.ScoreMonitor.load(str(tmp_path / "monitor_state"))
+    pd.testing.assert_frame_equal(loaded.counts(), counts)
@@ -0,0 +1,96 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+import pickle
+from scoretools.parallel import SharedFrame, _partial_grid_counts, _partial_ks_counts
+from scoretools.plots import calc_ks
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    dat = pd.DataFrame(
+        {"scr": rng.integers(300, 851, n).astype(float), "w": rng.integers(1, 4, n)}
+    )
+    dat["bad"] = (rng.uniform(size=n) < 1 / (1 + np.exp((dat["scr"] - 550) / 60))).astype(int)
+    dat.loc[:50, "scr"] = np.nan
+    dat["scr_bin"] = sts.cleancut(dat["scr"], 5)
+    return dat
+
+
+def _ks_between_values(data, performance, score, ascending):
+    bad = data[performance].eq(1)
+    grp = data.assign(bd=bad, gd=~bad).groupby(score, dropna=False, sort=False)
+    counts = grp[["bd", "gd"]].sum()
+    # Missing scores are last in either order, as in calc_ks.
+    counts = pd.concat(
+        [
+            counts.loc[counts.index.notna()].sort_index(ascending=ascending),
+            counts.loc[counts.index.isna()],
+        ]
+    )
+    cuml = counts.cumsum() / counts.sum()
+    return (cuml["bd"] - cuml["gd"]).max()
+
+
+def test_shared_frame(data):
+    with SharedFrame(data) as shared:
+        assert shared.columns == ["scr", "w", "bad", "scr_bin"]
+        part = shared.frame(100, 200)
+        pd.testing.assert_frame_equal(
+            part, data.iloc[100:200].reset_index(drop=True), check_index_type=False
+        )
+        assert not part["scr"].to_numpy().flags.writeable
+        # The view shares the block, so no rows were copied.
+        assert np.shares_memory(part["scr"].to_numpy(), shared._array("scr"))
+
+
+def test_partition_executor(data):
+    with sts.PartitionExecutor(data, n_workers=2, min_rows=5_000) as ex:
+        assert ex.n_workers == 2 and not ex.serial
+        pd.testing.assert_frame_equal(
+            ex.freq_tab("scr_bin"), sts.freq_tab("scr_bin", data=data)
+        )
+        pd.testing.assert_frame_equal(
+            ex.single_bivar("scr_bin", "bad", weight="w"),
+            sts.single_bivar(data, "scr_bin", "bad", weight="w"),
+            check_dtype=False,
+        )
+        # KS is taken between score values, so ties are never split.
+        for ascending in (True, False):
+            assert ex.calc_ks("bad", "scr", ascending) == pytest.approx(
+                _ks_between_values(data, "bad", "scr", ascending)
+            )
+        binned = ex.cleancut("scr", 5)
+        assert isinstance(binned, sts.BinnedCodes)
+        assert len(binned) == data.shape[0]
+        assert binned.categories[-1] == "Missing"
+        assert (binned.codes[:51] == len(binned.categories) - 1).all()
+        assert binned.counts()[:-1] == pytest.approx(data.shape[0] / 5, rel=0.1)
+
+
+def test_partition_executor_serial(data):
+    with sts.PartitionExecutor(data, n_workers=4, min_rows=10 ** 6) as ex:
+        assert ex.serial and ex._shared is None
+        pd.testing.assert_frame_equal(
+            ex.freq_tab("scr_bin"), sts.freq_tab("scr_bin", data=data)
+        )
+        exact = sts.cleancut(data["scr"], 5, codes=True)
+        assert (ex.cleancut("scr", 5).codes == exact.codes).all()
+
+
+def test_partition_executor_bounded_payload(data):
+    cont = data.assign(scr=data["scr"] + np.random.default_rng(1).uniform(size=data.shape[0]))
+    with sts.PartitionExecutor(cont, n_workers=2, min_rows=5_000, max_levels=500) as ex:
+        # A continuous score has too many values to send back per value.
+        assert ex.map(_partial_ks_counts, "bad", "scr", None, 500) == [None, None]
+        edges = np.linspace(300, 852, 501)
+        for part in ex.map(_partial_grid_counts, "bad", "scr", None, edges):
+            assert len(pickle.dumps(part)) < 10_000
+        assert ex.calc_ks("bad", "scr", True) == pytest.approx(
+            calc_ks(cont, "bad", "scr", True), abs=0.01
+        )
+        with pytest.raises(AssertionError, match="levels in a partition"):
+            ex.single_bivar("scr", "bad")
@@ -0,0 +1,54 @@
+import scoretools as sts
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def score_data():
+    return pd.read_csv(
+        os.path.join(os.path.dirname(__file__), "..", "data", "score_test_dat.csv")
+    )
+
+
+def test_render_gplots(score_data, tmp_path):
+    specs = [
+        {"performance": "Survived", "score": scr, "query": f"Sex == {sex}"}
+        for scr in ["scr1", "scr2"]
+        for sex in [0, 1]
+    ]
+    specs[0]["filename"] = "first.png"
+    files = sts.render_gplots(score_data, specs, path=str(tmp_path), n_jobs=2)
+    assert len(files) == 4
+    assert os.path.basename(files[0]) == "first.png"
+    assert all(os.path.getsize(f) > 0 for f in files)
+
+    pages = sts.render_gplots(
+        score_data, specs, path=str(tmp_path), fmt="pdf", layout=(1, 3), n_jobs=1
+    )
+    assert [os.path.basename(p) for p in pages] == [
+        "gplot_page_0000.pdf",
+        "gplot_page_0001.pdf",
+    ]
+    assert all(os.path.getsize(p) > 0 for p in pages)
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_dof_partial_selection(ascending):
+    rng = np.random.default_rng(123)
+    dat = pd.DataFrame({"scr": rng.normal(size=10_000)})
+    p_bad = 1 / (1 + np.exp(3 * dat["scr"]))
+    dat["bad"] = (rng.uniform(size=dat.shape[0]) < p_bad).astype(int)
+    part = sts.plots._prep_data_gplot(dat, 0.1, None, "bad", "scr", ascending)
+    full = sts.plots._prep_data_gplot(dat, None, None, "bad", "scr", ascending)
+    full = full[full["pct_file"] <= 0.1]
+    pd.testing.assert_frame_equal(part, full)
+
+    ks = full["cuml_perf"] - (1 - full["bad"]).cumsum() / dat["bad"].eq(0).sum()
+    assert sts.plots.calc_ks(
+        dat, "bad", "scr", ascending, dof=0.1
+    ) == pytest.approx(ks.max())
+    assert sts.plots.calc_capture(
+        dat, "bad", "scr", ascending, 0.1
+    ) == pytest.approx(full["cuml_perf"].iloc[-1])
@@ -0,0 +1,71 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+from scoretools.profiling import _approx_distinct, _mix64
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(11)
+    n = 50_000
+    dat = pd.DataFrame(
+        {
+            "x": rng.normal(size=n),
+            "uniform": rng.integers(0, 1000, n).astype(float),
+            "mths": np.where(rng.uniform(size=n) < 0.05, 9999, rng.integers(0, 60, n)),
+            "grade": pd.Categorical(rng.choice(list("ABCD"), n)),
+            "zip": pd.Series(rng.integers(0, 3000, n)).astype(str),
+        }
+    )
+    dat.loc[:99, "x"] = np.nan
+    dat.loc[:9, "zip"] = None
+    return dat
+
+
+def test_profile(data):
+    summary = sts.profile(data)
+    assert summary.index.tolist() == data.columns.tolist()
+    assert summary.loc["x", "Missing"] == 100
+    assert summary.loc["zip", "Missing"] == 10
+    assert summary["Distinct"].tolist() == data.nunique().tolist()
+    assert summary.loc["x", "Mean"] == pytest.approx(data["x"].mean())
+    assert summary.loc["x", "Std"] == pytest.approx(data["x"].std())
+    assert summary.loc["mths", "Max"] == 9999
+    exp = data["x"].quantile([0.01, 0.25, 0.5, 0.75, 0.99]).tolist()
+    assert summary.loc["x", ["P1", "P25", "P50", "P75", "P99"]].tolist() == pytest.approx(exp)
+    # Only the code held apart from the other values is flagged.
+    assert summary.attrs["exceptions"] == {"mths": [9999]}
+    assert summary.loc["mths", "Exception Candidates"] == "9999"
+    assert summary.loc["mths", "Pct Exceptions"] == pytest.approx(
+        (data["mths"] == 9999).mean()
+    )
+    # Statistics that do not apply to a column are written as blanks.
+    tw = sts.TableWriter(in_memory=True)
+    tw.write_table(summary)
+    assert tw.close()
+
+
+def test_profile_large(data):
+    summary = sts.profile(data, exact_limit=10_000, seed=1)
+    exact = data.nunique()
+    assert summary["Distinct"].to_numpy() == pytest.approx(exact.to_numpy(), rel=0.05)
+    assert summary.loc["x", "P50"] == pytest.approx(data["x"].median(), abs=0.05)
+    assert summary.loc["mths", "Missing"] == 0
+
+
+def test_approx_distinct():
+    keys = np.arange(200_000, dtype=np.int64).reshape(-1, 2) % 30_000
+    est = _approx_distinct(_mix64(keys), np.ones(keys.shape, dtype=bool))
+    assert est == pytest.approx([15_000, 15_000], rel=0.05)
+
+
+def test_profile_chunks(data, monkeypatch):
+    whole = sts.profile(data)
+    whole_large = sts.profile(data, exact_limit=10_000, seed=1)
+    monkeypatch.setattr(sts.profiling, "_CHUNK_ROWS", 7_000)
+    chunked = sts.profile(data)
+    pd.testing.assert_frame_equal(chunked, whole, check_exact=False, rtol=1e-9)
+    assert chunked.attrs["exceptions"] == whole.attrs["exceptions"]
+    chunked_large = sts.profile(data, exact_limit=10_000, seed=1)
+    pd.testing.assert_frame_equal(chunked_large, whole_large, check_exact=False, rtol=1e-9)
@@ -0,0 +1,118 @@
+import scoretools as sts
+import os
+import json
+import pandas as pd
+import pytest
+from scoretools.cli import main
+from scoretools.utils.scheduler import TaskGraph
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "score_test_dat.csv")
+
+
+@pytest.fixture
+def spec(tmp_path):
+    return {
+        "output": str(tmp_path / "report.xlsx"),
+        "workers": 3,
+        "datasets": {"scores": {"path": DATA}},
+        "binnings": {
+            "scr1_bins": {"dataset": "scores", "column": "scr1", "args": {"bins": 5}}
+        },
+        "tables": {
+            "scr1_bivar": {
+                "dataset": "scores",
+                "kind": "single_bivar",
+                "binnings": ["scr1_bins"],
+                "args": {"main_var": "scr1_bins", "bivar": "Survived"},
+            },
+            "scr1_freq": {
+                "dataset": "scores",
+                "kind": "freq_tab",
+                "binnings": ["scr1_bins"],
+                "args": {"variable": "scr1_bins"},
+            },
+            "gains": {
+                "dataset": "scores",
+                "kind": "gains_table",
+                "args": {"performance": "Survived", "score": "scr2"},
+            },
+        },
+        "charts": {
+            "scr_gplot": {
+                "dataset": "scores",
+                "path": str(tmp_path / "charts" / "gplot.png"),
+                "args": {"performance": "Survived", "score": ["scr1", "scr2"]},
+            }
+        },
+        "sheets": {
+            "Bivars": ["scr1_bivar", {"table": "scr1_freq", "row": 1, "col": 8}],
+            "Gains": ["gains"],
+        },
+    }
+
+
+def test_run_report(spec, tmp_path):
+    results, timings = sts.run_report(spec)
+    assert results["write"] == spec["output"]
+    assert results["chart:scr_gplot"] == str(tmp_path / "charts" / "gplot.png")
+    assert os.path.isfile(tmp_path / "charts" / "gplot.png")
+    assert set(timings) == set(results)
+    assert set(timings) >= {"dataset:scores", "binning:scr1_bins", "write"}
+    sheets = pd.read_excel(spec["output"], sheet_name=None, engine="openpyxl")
+    assert list(sheets) == ["Bivars", "Gains"]
+
+
+def test_run_report_requires_output(spec):
+    del spec["output"]
+    with pytest.raises(AssertionError, match="output"):
+        sts.run_report(spec)
+
+
+def test_run_report_concurrent_charts(spec, tmp_path):
+    # Charts of different datasets rendered at once must each see their own data.
+    renamed = tmp_path / "renamed.csv"
+    pd.read_csv(DATA).rename(columns={"scr1": "other_scr", "Survived": "bad"}).to_csv(
+        renamed, index=False
+    )
+    spec["datasets"]["renamed"] = {"path": str(renamed)}
+    spec["charts"] = {}
+    for i in range(3):
+        spec["charts"][f"scores_{i}"] = {
+            "dataset": "scores",
+            "path": str(tmp_path / "charts" / f"scores_{i}.png"),
+            "args": {"performance": "Survived", "score": "scr1", "query": "Sex == 1"},
+        }
+        spec["charts"][f"renamed_{i}"] = {
+            "dataset": "renamed",
+            "path": str(tmp_path / "charts" / f"renamed_{i}.png"),
+            "args": {"performance": "bad", "score": "other_scr"},
+        }
+    for _ in range(5):
+        results, _ = sts.run_report(spec, workers=6)
+        for name, chart in spec["charts"].items():
+            assert results[f"chart:{name}"] == chart["path"]
+            assert os.path.isfile(chart["path"])
+
+
+def test_cli(spec, tmp_path, capsys):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(spec))
+    out = str(tmp_path / "bundle")
+    assert main(["run", str(path), "-o", out, "-w", "1", "-q"]) == 0
+    assert capsys.readouterr().out.strip() == out
+
+
+def test_task_graph_runs_shared_tasks_once():
+    calls = []
+    graph = TaskGraph()
+    graph.add("a", lambda: calls.append("a") or 1)
+    graph.add("b", lambda a: a + 1, ["a"])
+    graph.add("c", lambda a: a + 2, ["a"])
+    graph.add("d", lambda b, c: b * c, ["b", "c"])
+    assert graph.run(max_workers=2)["d"] == 6
+    assert calls == ["a"]
+
+    graph.add("e", lambda f: f, ["f"])
+    graph.add("f", lambda e: e, ["e"])
+    with pytest.raises(AssertionError, match="cyclic"):
+        graph.run(max_workers=2)
@@ -0,0 +1,59 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+from scoretools.plots import calc_ks
+from scoretools.sampling import _allocate
+
+
+@pytest.fixture(scope="module")
+def big_data():
+    rng = np.random.default_rng(5)
+    n = 300_000
+    dat = pd.DataFrame(
+        {"scr": rng.integers(300, 851, n), "seg": rng.choice(["a", "b"], n)}
+    )
+    dat["bad"] = (rng.uniform(size=n) < 0.1 / (1 + np.exp((dat["scr"] - 600) / 60))).astype(int)
+    dat["scr_bin"] = sts.cleancut(dat["scr"], 5)
+    return dat
+
+
+def test_allocate():
+    assert _allocate(np.array([5, 100, 1000]), 300).tolist() == [5, 100, 195]
+    assert _allocate(np.array([5, 100, 1000]), 10 ** 6).tolist() == [5, 100, 1000]
+    assert _allocate(np.array([3, 3, 3]), 7).sum() == 7
+
+
+def test_sample(big_data):
+    est = sts.SampleEstimator(big_data, "bad", strata="seg", seed=1)
+    small, large = est.sample(2_000), est.sample(10_000)
+    assert small.index.isin(large.index).all()
+    assert small["_sample_weight"].sum() == pytest.approx(big_data.shape[0])
+    strata = small.groupby(["bad", "seg"])["_sample_weight"].sum()
+    assert strata.tolist() == pytest.approx(
+        big_data.groupby(["bad", "seg"]).size().tolist()
+    )
+    # Bads are sampled as often as goods.
+    assert small["bad"].mean() == pytest.approx(0.5, abs=0.01)
+
+
+def test_estimates(big_data):
+    est = sts.SampleEstimator(big_data, "bad", strata="seg", seed=2, replicates=30)
+    exact = calc_ks(big_data, "bad", "scr", True)
+    ks = est.ks("scr", sample_size=20_000)
+    assert abs(ks.value - exact) < 4 * ks.se
+    assert ks.lower < ks.value < ks.upper
+
+    tight = est.ks("scr", target_se=ks.se / 2)
+    assert tight.se <= ks.se / 2 or tight.n == est.n_rows
+    assert tight.n > ks.n
+
+    bivar = est.bivar("scr_bin", sample_size=20_000)
+    full = sts.single_bivar(big_data, "scr_bin", "bad")
+    assert list(bivar.value.index) == list(full.index)
+    err = (bivar.value["bad Rate"] - full["bad Rate"]).abs()
+    assert (err < 4 * bivar.se["bad Rate"] + 1e-9).all()
+
+    curve = est.curve("scr", points=20, sample_size=20_000)
+    assert curve.value.shape == (21, 1)
+    assert curve.se["cuml_perf"].iloc[[0, -1]].tolist() == pytest.approx([0, 0])
@@ -0,0 +1,98 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(4)
+    n = 10_000
+    dat = pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "age": rng.integers(18, 90, n).astype(float),
+            "util": rng.uniform(0, 100, n).round(1),
+            "grade": rng.choice(list("ABCDE"), n),
+        }
+    )
+    dat.loc[::50, "util"] = 9999
+    dat.loc[::97, "age"] = np.nan
+    dat.loc[::89, "grade"] = None
+    return dat
+
+
+@pytest.fixture
+def scorecard(data):
+    sc = sts.Scorecard()
+    sc.add("age", sts.cut_edges(data["age"], 5), [-10, 0, 5, 10, 20], missing=-5)
+    sc.add("util", [0, 30, 60, 100], [25, 10, -15], exceptions={9999: 3})
+    sc.add_levels("grade", {"A": 30, "B": 15, "C": 0}, other=-10, missing=1)
+    return sc
+
+
+def test_scorecard_points(data, scorecard):
+    pts = scorecard.points(data)
+    # Bins are those of cleancut with the same edges.
+    binned = sts.cleancut(data["age"], 5)
+    exp_age = np.array([-10, 0, 5, 10, 20, -5])[
+        np.where(binned.cat.codes < 0, 5, binned.cat.codes)
+    ]
+    assert (pts["age"].to_numpy() == exp_age).all()
+    assert (pts.loc[data["util"].eq(9999), "util"] == 3).all()
+    assert (pts.loc[data["util"].between(30.05, 60), "util"] == 10).all()
+    assert (pts.loc[data["grade"].isin(["D", "E"]), "grade"] == -10).all()
+    assert (pts.loc[data["grade"].isna(), "grade"] == 1).all()
+    assert (scorecard.score(data) == pts.sum(axis=1)).all()
+    # Values beyond the edges get the points of the end bins.
+    new = pd.DataFrame({"age": [5.0, 120.0], "util": [-1.0, 150.0], "grade": ["A", "Z"]})
+    assert scorecard.points(new).to_numpy().tolist() == [[-10, 25, 30], [20, -15, -10]]
+    assert scorecard.table.loc[("util", "9999"), "Points"] == 3
+
+
+def test_scorecard_scaling(data, scorecard):
+    scorecard.scale = "range"
+    scorecard.score_range = (300, 850)
+    scr = scorecard.score(data)
+    assert scr.dtype.kind == "i"
+    assert scr.min() >= 300 and scr.max() <= 850
+    best = pd.DataFrame({"age": [89.0], "util": [0.0], "grade": ["A"]})
+    assert scorecard.score(best).iloc[0] == 850
+
+    odds = sts.Scorecard(scale="odds", base_score=600, base_odds=50, pdo=20, digits=2)
+    odds.add("x", [0, 1, 2], [np.log(50), np.log(100)])
+    assert odds.score(pd.DataFrame({"x": [0.5, 1.5]})).tolist() == [600, 620]
+
+
+def test_score_file(data, scorecard, tmp_path):
+    path, out_path = tmp_path / "in.csv", tmp_path / "out.csv"
+    data.to_csv(path, index=False)
+    rows = scorecard.score_file(
+        str(path), str(out_path), id_cols=["id"], chunksize=3_000, keep_points=True
+    )
+    assert rows == data.shape[0]
+    out = pd.read_csv(out_path)
+    assert out.columns.tolist() == ["id", "age_points", "util_points", "grade_points", "score"]
+    assert (out["id"] == data["id"]).all()
+    assert (out["score"] == scorecard.score(data)).all()
+
+
+def test_score_file_numeric_levels(tmp_path):
+    sc = sts.Scorecard()
+    sc.add_levels("grade", {1: 30, 2: 15, 3: 0}, missing=-98, other=-99)
+    sc.add_levels("region", {"N": 1, "S": 2}, other=5)
+    data = pd.DataFrame({"grade": [1, 2, 4, None], "region": ["N", "S", "N", "E"]})
+    path, out_path = tmp_path / "in.csv", tmp_path / "out.csv"
+    data.to_csv(path, index=False)
+    sc.score_file(str(path), str(out_path))
+    out = pd.read_csv(out_path)
+    assert out["score"].tolist() == sc.score(data).tolist() == [31, 17, -98, -93]
+
+
+def test_score_file_parquet(data, scorecard, tmp_path):
+    pytest.importorskip("pyarrow")
+    path, out_path = tmp_path / "in.parquet", tmp_path / "out.parquet"
+    data.to_parquet(path, index=False)
+    assert scorecard.score_file(str(path), str(out_path), chunksize=3_000) == data.shape[0]
+    out = pd.read_parquet(out_path)
+    assert (out["score"] == scorecard.score(data)).all()
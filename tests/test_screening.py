@@ -0,0 +1,83 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def screen_data():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    scr = rng.integers(300, 850, size=n).astype(float)
+    bad = (rng.uniform(size=n) < 1 / (1 + np.exp((scr - 550) / 60))).astype(int)
+    dat = pd.DataFrame(
+        {
+            "scr": scr,
+            "noise": rng.integers(0, 100, size=n).astype(float),
+            "grade": rng.choice(["A", "B", None], size=n),
+            "const": 1.0,
+            "bad": bad,
+        }
+    )
+    dat.loc[:199, "scr"] = 9999
+    dat.loc[200:399, "scr"] = np.nan
+    return dat
+
+
+def test_screen(screen_data):
+    summary, details = sts.screen(
+        screen_data, "bad", exceptions={"scr": [9999]}, n_jobs=2
+    )
+    # The constant column can not be binned, and is listed last.
+    assert list(summary.index) == ["scr", "noise", "grade", "const"]
+    assert summary.loc["const", "Error"] == "ValueError: no rows fall in any bin"
+    assert summary["Error"].iloc[:3].isna().all()
+    assert list(details) == ["scr", "noise", "grade"]
+    assert summary.loc["scr", "Pct Missing"] == pytest.approx(0.01)
+
+    # WOE and IV match a table built from single_bivar.
+    binned = sts.cleancut(screen_data["scr"], 10, exceptions=[9999])
+    biv = sts.single_bivar(screen_data.assign(scr=binned), "scr", "bad")
+    detail = details["scr"].drop("Total")
+    biv = biv.reindex(detail.index)
+    bd, gd = biv["bad sum"], biv["N"] - biv["bad sum"]
+    adj_gd, adj_bd = (gd + 0.5) / gd.sum(), (bd + 0.5) / bd.sum()
+    woe = np.log(adj_gd / adj_bd)
+    assert np.allclose(detail["WOE"], woe)
+    assert summary.loc["scr", "IV"] == pytest.approx(((adj_gd - adj_bd) * woe).sum())
+
+    # Gini is that of the column scored by its WOE.
+    score = -screen_data.assign(scr=binned)["scr"].map(woe).astype(float)
+    ranks = score.rank()
+    bads = screen_data["bad"] == 1
+    auc = (ranks[bads].sum() - bads.sum() * (bads.sum() + 1) / 2) / (
+        bads.sum() * (~bads).sum()
+    )
+    assert summary.loc["scr", "Gini"] == pytest.approx(2 * auc - 1)
+
+    serial, _ = sts.screen(screen_data, "bad", exceptions={"scr": [9999]}, n_jobs=1)
+    pd.testing.assert_frame_equal(summary, serial)
+
+
+def test_screen_weighted(screen_data):
+    # Quantile bins are not weighted, so fixed edges are used.
+    edges = {"scr": [300, 400, 500, 600, 700, 849]}
+    counts = sts.collapse_counts(screen_data, ["scr", "bad"])
+    weighted, _ = sts.screen(
+        counts, "bad", columns=["scr"], bins=edges, weight="count"
+    )
+    full, _ = sts.screen(screen_data, "bad", columns=["scr"], bins=edges)
+    pd.testing.assert_frame_equal(weighted, full)
+
+
+def test_screen_weighted_quantiles(screen_data):
+    # Quantile bins of collapsed counts are those of the expanded rows.
+    counts = sts.collapse_counts(screen_data, ["scr", "noise", "bad"])
+    weighted, w_details = sts.screen(
+        counts, "bad", exceptions={"scr": [9999]}, weight="count"
+    )
+    expanded = counts.loc[counts.index.repeat(counts["count"])].drop(columns="count")
+    full, f_details = sts.screen(expanded, "bad", exceptions={"scr": [9999]})
+    pd.testing.assert_frame_equal(weighted, full)
+    for col in ["scr", "noise"]:
+        pd.testing.assert_frame_equal(w_details[col], f_details[col])
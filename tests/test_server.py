@@ -0,0 +1,117 @@
+import scoretools as sts
+import os
+import json
+import asyncio
+import socket
+import threading
+import urllib.request
+import pandas as pd
+import pytest
+from scoretools.server import ReportServer, DatasetStore
+
+
+@pytest.fixture
+def score_data():
+    return pd.read_csv(
+        os.path.join(os.path.dirname(__file__), "..", "data", "score_test_dat.csv")
+    )
+
+
+@pytest.fixture
+def server(score_data):
+    srv = ReportServer(port=0, max_workers=2)
+    srv.store.load("scores", frame=score_data, prebin={"scr1": 5})
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(srv.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield srv
+    loop.call_soon_threadsafe(srv.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def _post(srv, route, body):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{srv.port}/{route}",
+        data=json.dumps(body).encode(),
+        method="POST",
+    )
+    with urllib.request.urlopen(req) as resp:
+        return resp.headers["Content-Type"], resp.read()
+
+
+def test_server_requests(server, score_data):
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/datasets") as resp:
+        assert json.load(resp)["scores"]["rows"] == score_data.shape[0]
+
+    _, raw = _post(
+        server,
+        "table",
+        {
+            "dataset": "scores",
+            "kind": "single_bivar",
+            "args": {"main_var": "scr1_bin", "bivar": "Survived"},
+        },
+    )
+    tbl = json.loads(raw)
+    assert tbl["index"][-1] == "Total"
+    assert tbl["data"][-1][0] == score_data.shape[0]
+
+    _, raw = _post(
+        server,
+        "metric",
+        {
+            "dataset": "scores",
+            "args": {"performance": "Survived", "score": "scr1", "ascending": True},
+        },
+    )
+    assert json.loads(raw)["value"] == pytest.approx(
+        sts.plots.calc_ks(score_data, "Survived", "scr1", True)
+    )
+
+    ctype, png = _post(
+        server,
+        "chart",
+        {"dataset": "scores", "args": {"performance": "Survived", "score": "scr1"}},
+    )
+    assert ctype == "image/png" and png[:4] == b"\x89PNG"
+
+
+def _raw_request(srv, request: bytes) -> str:
+    with socket.create_connection(("127.0.0.1", srv.port), timeout=5) as sock:
+        sock.sendall(request)
+        sock.shutdown(socket.SHUT_WR)
+        return sock.makefile("rb").read().decode("latin-1")
+
+
+def test_server_bad_requests(server):
+    for request in [
+        b"GARBAGE\r\n\r\n",
+        b"POST /table HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+        b"POST /table HTTP/1.1\r\nContent-Length: 5\r\n\r\n{bad}",
+    ]:
+        response = _raw_request(server, request)
+        assert response.startswith("HTTP/1.1 400 Bad Request")
+        assert "error" in json.loads(response.split("\r\n\r\n", 1)[1])
+    # The server still answers good requests.
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/datasets") as resp:
+        assert "scores" in json.load(resp)
+
+
+def test_store_evicts_lru(score_data):
+    store = DatasetStore(max_memory=int(score_data.memory_usage(deep=True).sum() * 3.5))
+    for name in ["a", "b", "c"]:
+        store.load(name, frame=score_data)
+    store.acquire("a")
+    store.release("a")
+    store.load("d", frame=score_data)
+    assert sorted(store.describe()) == ["a", "c", "d"]
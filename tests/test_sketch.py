@@ -0,0 +1,56 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def normal_values():
+    return np.random.default_rng(123).normal(loc=600, scale=50, size=500_000)
+
+
+def _rank_error(values, est, qs):
+    return np.abs(np.searchsorted(np.sort(values), est) / values.size - qs).max()
+
+
+def test_sketch_chunks_and_merge(normal_values):
+    qs = np.linspace(0, 1, 11)
+    chunks = np.array_split(normal_values, 10)
+    sketch = sts.QuantileSketch.from_chunks(chunks, seed=1)
+    assert sketch.n == normal_values.size
+    assert sketch.quantile(0) == normal_values.min()
+    assert sketch.quantile(1) == normal_values.max()
+    assert _rank_error(normal_values, sketch.quantile(qs), qs) < 0.02
+    assert sketch.nbytes < 64_000
+
+    merged = sts.QuantileSketch(seed=2).update(chunks[0])
+    for chunk in chunks[1:]:
+        merged.merge(sts.QuantileSketch(seed=3).update(chunk))
+    assert merged.n == normal_values.size
+    assert _rank_error(normal_values, merged.quantile(qs), qs) < 0.02
+
+
+def test_cleancut_with_sketch(normal_values):
+    x = pd.Series(normal_values).round()
+    x[:100] = -1
+    sketch = sts.QuantileSketch.from_chunks(
+        np.array_split(x.to_numpy(), 5), exceptions=[-1], seed=1
+    )
+    chunk_cuts = [
+        sts.cleancut(chunk, 4, exceptions=[-1], sketch=sketch)
+        for chunk in (x.iloc[i : i + 100_000] for i in range(0, x.size, 100_000))
+    ]
+    # Every chunk is cut on the same bins.
+    cats = chunk_cuts[0].cat.categories
+    assert all(c.cat.categories.equals(cats) for c in chunk_cuts)
+    counts = pd.concat(chunk_cuts).value_counts(sort=False)
+    assert counts[-1] == 100
+    assert (counts.iloc[:4] / x.size).between(0.23, 0.27).all()
+
+
+def test_percentile_with_sketch(normal_values):
+    x = pd.Series(normal_values)
+    sketch = sts.QuantileSketch(seed=1).update(x)
+    x_cut = sts.utils.break_methods.bins(x, 4, sketch=sketch)
+    assert x_cut.isna().sum() == 0
+    assert (x_cut.value_counts() / x.size).between(0.23, 0.27).all()
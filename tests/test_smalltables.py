@@ -0,0 +1,155 @@
+import scoretools as sts
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def score_data():
+    return pd.read_csv(
+        os.path.join(os.path.dirname(__file__), "..", "data", "score_test_dat.csv")
+    )
+
+
+def test_gains_table(score_data):
+    gtab = sts.gains_table(
+        score_data, ["Survived", "Survived2"], "scr1", groups=4, exceptions=[999]
+    )
+    dat = score_data[score_data["scr1"].ne(999)].sort_values("scr1", kind="stable")
+    band = np.arange(dat.shape[0]) * 4 // dat.shape[0]
+    exp = dat.groupby(band)["Survived"].agg(["count", "sum"])
+    assert gtab["N"].iloc[:4].tolist() == exp["count"].tolist()
+    assert gtab["Survived sum"].iloc[:4].tolist() == exp["sum"].tolist()
+    assert gtab.loc["Total", "N"] == dat.shape[0]
+    assert gtab["Survived Cuml Pct"].iloc[3] == pytest.approx(1)
+    assert gtab.loc["Total", "Survived KS Pct"] >= gtab["Survived KS Pct"].iloc[:4].max()
+    # With no ties in the score the row order is fixed, and the Total KS
+    # is that of calc_ks.
+    untied = score_data.assign(scr=score_data["scr1"] + score_data.index / 10_000)
+    for ascending in (True, False):
+        utab = sts.gains_table(untied, "Survived", "scr", ascending=ascending)
+        assert utab.loc["Total", "Survived KS Pct"] == pytest.approx(
+            sts.plots.calc_ks(untied, "Survived", "scr", ascending)
+        )
+    assert gtab.loc["Total", "Survived Rate"] == pytest.approx(
+        dat["Survived"].mean()
+    )
+    assert (
+        gtab["Survived Lift"].iloc[:4] * gtab.loc["Total", "Survived Rate"]
+    ).tolist() == pytest.approx(gtab["Survived Rate"].iloc[:4].tolist())
+
+
+def test_gains_table_missing_performance(score_data):
+    dat = score_data.assign(scr=score_data["scr1"] + score_data.index / 10_000)
+    dat.loc[dat.index % 7 == 0, "Survived"] = np.nan
+    gtab = sts.gains_table(dat, "Survived", "scr", groups=4)
+    dat = dat.sort_values("scr")
+    band = np.arange(dat.shape[0]) * 4 // dat.shape[0]
+    exp = dat.groupby(band)["Survived"].agg(["size", "count", "sum", "mean"])
+    goods = exp["count"] - exp["sum"]
+    assert gtab["N"].iloc[:4].tolist() == exp["size"].tolist()
+    assert gtab["Survived Rate"].iloc[:4].tolist() == pytest.approx(exp["mean"].tolist())
+    assert gtab["Survived KS Pct"].iloc[:4].tolist() == pytest.approx(
+        (exp["sum"].cumsum() / exp["sum"].sum() - goods.cumsum() / goods.sum()).tolist()
+    )
+    assert gtab.loc["Total", "Survived Rate"] == pytest.approx(dat["Survived"].mean())
+    known = dat.dropna(subset=["Survived"])
+    assert gtab.loc["Total", "Survived KS Pct"] == pytest.approx(
+        sts.plots.calc_ks(known, "Survived", "scr", True)
+    )
+
+
+def test_gains_table_weighted(score_data):
+    collapsed = sts.collapse_counts(score_data, ["scr1", "Survived"])
+    gtab = sts.gains_table(score_data, "Survived", "scr1", groups=5)
+    wtab = sts.gains_table(collapsed, "Survived", "scr1", groups=5, weight="count")
+    assert wtab.loc["Total"].tolist() == pytest.approx(gtab.loc["Total"].tolist())
+    assert wtab["N"].sum() == gtab["N"].sum()
+
+    untied = score_data.assign(
+        scr=score_data["scr1"] + score_data.index / 10_000,
+        wgt=np.random.default_rng(3).integers(1, 5, size=score_data.shape[0]),
+    )
+    for ascending in (True, False):
+        utab = sts.gains_table(untied, "Survived", "scr", ascending, weight="wgt")
+        assert utab.loc["Total", "Survived KS Pct"] == pytest.approx(
+            sts.plots.calc_ks(untied, "Survived", "scr", ascending, weight="wgt")
+        )
+
+
+def test_vintage_table():
+    rng = np.random.default_rng(9)
+    rows = []
+    for acct in range(3_000):
+        cohort = rng.integers(0, 6)
+        for m in range(1, 13 - 2 * cohort):
+            rows.append((acct, f"2023-{cohort + 1:02d}", m, int(rng.uniform() < 0.02)))
+    panel = pd.DataFrame(rows, columns=["acct", "cohort", "mob", "bad"])
+    vint = sts.vintage_table(panel, "cohort", "mob", "bad", account="acct")
+
+    # Reference from a pivot table of each account's first bad month.
+    first = panel[panel["bad"] == 1].groupby("acct")[["cohort", "mob"]].first()
+    events = first.pivot_table(
+        index="cohort", columns="mob", aggfunc="size", fill_value=0
+    ).reindex(index=vint.index, columns=range(1, 13), fill_value=0)
+    accounts = panel.groupby("cohort")["acct"].nunique()
+    expected = events.cumsum(axis=1).div(accounts, axis=0)
+    assert vint["Accounts"].tolist() == accounts.tolist()
+    got = vint.drop(columns="Accounts").to_numpy()
+    reached = ~np.isnan(got)
+    assert np.allclose(got[reached], expected.to_numpy()[reached])
+    # A cohort has missing rates after the months it has reached.
+    assert reached.sum(axis=1).tolist() == [12, 10, 8, 6, 4, 2]
+    assert vint.columns[1] == "MOB 1 Rate"
+
+    # Without accounts every bad row is an event over the first month's rows.
+    rows_only = sts.vintage_table(panel, "cohort", "mob", "bad", cumulative=False)
+    rate = panel.groupby(["cohort", "mob"])["bad"].sum().unstack() / accounts.to_numpy()[:, None]
+    assert np.allclose(
+        rows_only.drop(columns="Accounts").to_numpy()[reached], rate.to_numpy()[reached]
+    )
+
+    # A float months on book column, with a missing value and no rows at
+    # month 5, keeps the gap month like an integer column.
+    gappy = panel[panel["mob"] != 5].astype({"mob": float})
+    gappy.loc[gappy.index[0], "mob"] = np.nan
+    as_float = sts.vintage_table(gappy, "cohort", "mob", "bad", account="acct")
+    as_int = sts.vintage_table(
+        gappy.dropna(subset=["mob"]).astype({"mob": int}),
+        "cohort",
+        "mob",
+        "bad",
+        account="acct",
+    )
+    assert "MOB 5 Rate" in as_float.columns
+    pd.testing.assert_frame_equal(as_float, as_int)
+
+
+def test_freq_tab_top():
+    rng = np.random.default_rng(3)
+    zips = pd.Series((rng.zipf(1.5, 50_000) % 5_000).astype(str), name="zip")
+    zips.iloc[:10] = None
+    exact = zips.value_counts()
+
+    ftab = sts.freq_tab(zips, top=5, sort_by="frequency")
+    assert ftab.index.tolist() == ["Missing"] + exact.index[:5].tolist() + ["Other"]
+    assert ftab["Frequency"].iloc[1:6].tolist() == exact.iloc[:5].tolist()
+    assert ftab.loc["Other", "Frequency"] == exact.iloc[5:].sum()
+    assert ftab["Cumulative Frequency"].iloc[-1] == zips.size
+
+    by_level = sts.freq_tab(zips, top=5, na_last=True)
+    assert by_level.index.tolist() == sorted(exact.index[:5]) + ["Other", "Missing"]
+
+    sketch = sts.HeavyHitterSketch(capacity=100)
+    for i in range(0, zips.size, 10_000):
+        sketch.update(zips.iloc[i : i + 10_000])
+    assert sketch.name == "zip" and len(sketch) <= 100
+    assert sketch.n == zips.size and sketch.n_missing == 10
+    assert sketch.error <= zips.size / 101
+    kept = sketch.counts()
+    assert (kept <= exact[kept.index]).all()
+    assert (kept >= exact[kept.index] - sketch.error).all()
+    stab = sts.freq_tab(sketch, top=5, sort_by="frequency")
+    assert stab.index[1:6].tolist() == exact.index[:5].tolist()
+    assert stab["Frequency"].sum() == zips.size
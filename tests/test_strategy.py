@@ -0,0 +1,41 @@
+import scoretools as sts
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def score_data():
+    return pd.read_csv(
+        os.path.join(os.path.dirname(__file__), "..", "data", "score_test_dat.csv")
+    )
+
+
+@pytest.mark.parametrize("approve_above", [True, (True, False)])
+def test_cutoff_grid_matches_masks(score_data, approve_above):
+    grid = sts.CutoffGrid(
+        score_data, "scr1", "scr2", "Survived", 8, 6, approve_above=approve_above
+    )
+    above = grid.approve_above
+    for c1 in grid.cutoffs1:
+        for c2 in grid.cutoffs2:
+            m1 = score_data["scr1"].ge(c1) if above[0] else score_data["scr1"].le(c1)
+            m2 = score_data["scr2"].ge(c2) if above[1] else score_data["scr2"].le(c2)
+            sub = score_data.loc[m1 & m2, "Survived"]
+            assert grid.approved.loc[c1, c2] == sub.size
+            assert grid.bads.loc[c1, c2] == sub.sum()
+
+
+def test_cutoff_grid_solve(score_data):
+    grid = sts.CutoffGrid(score_data, "scr1", "scr2", "Survived", 20, 20)
+    best = grid.solve(target_approval=0.5)
+    tbl = grid.to_frame()
+    feasible = tbl[tbl["Approval Rate"] >= 0.5]
+    assert best["Approval Rate"] >= 0.5
+    assert best["Bad Rate"] == pytest.approx(feasible["Bad Rate"].min())
+    best = grid.solve(max_bad_rate=0.2)
+    assert best["Bad Rate"] <= 0.2
+    assert best["Approval Rate"] == pytest.approx(
+        tbl.loc[tbl["Bad Rate"] <= 0.2, "Approval Rate"].max()
+    )
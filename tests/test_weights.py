@@ -0,0 +1,48 @@
+import scoretools as sts
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def raw_data():
+    rng = np.random.default_rng(123)
+    n = 5_000
+    scr = rng.integers(300, 320, size=n).astype(float)
+    flag = (rng.uniform(size=n) < (330 - scr) / 40).astype(int)
+    seg = rng.choice(["A", "B", None], size=n)
+    scr[:50] = np.nan
+    return pd.DataFrame({"scr": scr, "flag": flag, "seg": seg})
+
+
+@pytest.fixture
+def collapsed(raw_data):
+    return sts.collapse_counts(raw_data, ["scr", "flag", "seg"])
+
+
+def test_collapse_counts(raw_data, collapsed):
+    assert collapsed["count"].sum() == raw_data.shape[0]
+    assert collapsed.shape[0] < raw_data.shape[0] / 10
+
+
+def test_weighted_freq_tab(raw_data, collapsed):
+    for var in ["scr", "seg"]:
+        expected = sts.freq_tab(var, data=raw_data)
+        weighted = sts.freq_tab(var, data=collapsed, weight="count")
+        pd.testing.assert_frame_equal(expected, weighted, check_dtype=False)
+
+
+def test_weighted_single_bivar(raw_data, collapsed):
+    expected = sts.single_bivar(raw_data, "seg", "flag")
+    weighted = sts.single_bivar(collapsed, "seg", "flag", weight="count")
+    pd.testing.assert_frame_equal(expected, weighted, check_dtype=False)
+
+
+def test_weighted_ks(raw_data, collapsed):
+    # Tied scores are ordered differently in the collapsed frame, so
+    # compare with the ties sorted the same way.
+    raw = raw_data.dropna().sort_values(["scr", "flag"])
+    cmp = collapsed.dropna().sort_values(["scr", "flag"])
+    expected = sts.plots.calc_ks(raw, "flag", "scr", True)
+    weighted = sts.plots.calc_ks(cmp, "flag", "scr", True, weight="count")
+    assert weighted == pytest.approx(expected)